@@ -11,6 +11,60 @@ from app.config import Development as Config
 
 WEB_HOST = Config.WEB_HOST
 WEB_PORT = Config.WEB_PORT
+WEB_WORKERS = Config.WEB_WORKERS
 
 OLLAMA_URL = Config.OLLAMA_URL
-OLLAMA_MODEL = Config.OLLAMA_MODEL
\ No newline at end of file
+OLLAMA_URLS = Config.OLLAMA_URLS
+OLLAMA_MODEL = Config.OLLAMA_MODEL
+OLLAMA_STREAM = Config.OLLAMA_STREAM
+OLLAMA_OPTIONS = Config.OLLAMA_OPTIONS
+OLLAMA_KEEP_ALIVE = Config.OLLAMA_KEEP_ALIVE
+OLLAMA_WARMUP = Config.OLLAMA_WARMUP
+OLLAMA_WARMUP_TIMEOUT = Config.OLLAMA_WARMUP_TIMEOUT
+OLLAMA_MODEL_CHECK_INTERVAL = Config.OLLAMA_MODEL_CHECK_INTERVAL
+OLLAMA_CONNECT_TIMEOUT = Config.OLLAMA_CONNECT_TIMEOUT
+OLLAMA_READ_TIMEOUT = Config.OLLAMA_READ_TIMEOUT
+OLLAMA_TOTAL_TIMEOUT = Config.OLLAMA_TOTAL_TIMEOUT
+OLLAMA_MAX_CONNECTIONS = Config.OLLAMA_MAX_CONNECTIONS
+OLLAMA_HEALTH_INTERVAL = Config.OLLAMA_HEALTH_INTERVAL
+OLLAMA_CIRCUIT_FAILURES = Config.OLLAMA_CIRCUIT_FAILURES
+OLLAMA_CIRCUIT_RESET = Config.OLLAMA_CIRCUIT_RESET
+OLLAMA_SLOW_FACTOR = Config.OLLAMA_SLOW_FACTOR
+OLLAMA_HEDGE_PERCENTILE = Config.OLLAMA_HEDGE_PERCENTILE
+
+CHECK_FRAUD_WORKERS = Config.CHECK_FRAUD_WORKERS
+CHECK_FRAUD_QUEUE_SIZE = Config.CHECK_FRAUD_QUEUE_SIZE
+CHECK_FRAUD_ADMISSION = Config.CHECK_FRAUD_ADMISSION
+CHECK_FRAUD_ADMISSION_MARGIN = Config.CHECK_FRAUD_ADMISSION_MARGIN
+CHECK_FRAUD_BACKEND = Config.CHECK_FRAUD_BACKEND
+CHECK_FRAUD_BACKEND_URL = Config.CHECK_FRAUD_BACKEND_URL
+CHECK_FRAUD_BACKEND_PREFIX = Config.CHECK_FRAUD_BACKEND_PREFIX
+CHECK_FRAUD_BACKEND_POLL = Config.CHECK_FRAUD_BACKEND_POLL
+CHECK_FRAUD_JOURNAL_DIR = Config.CHECK_FRAUD_JOURNAL_DIR
+CHECK_FRAUD_JOURNAL_FLUSH = Config.CHECK_FRAUD_JOURNAL_FLUSH
+CHECK_FRAUD_JOURNAL_SEGMENT_SIZE = Config.CHECK_FRAUD_JOURNAL_SEGMENT_SIZE
+CHECK_FRAUD_TIMEOUT = Config.CHECK_FRAUD_TIMEOUT
+CHECK_FRAUD_BATCH_SIZE = Config.CHECK_FRAUD_BATCH_SIZE
+CHECK_FRAUD_BATCH_WAIT = Config.CHECK_FRAUD_BATCH_WAIT
+CHECK_FRAUD_LIVE_DEBOUNCE = Config.CHECK_FRAUD_LIVE_DEBOUNCE
+CHECK_FRAUD_RESULT_SIZE = Config.CHECK_FRAUD_RESULT_SIZE
+CHECK_FRAUD_RESULT_TTL = Config.CHECK_FRAUD_RESULT_TTL
+CHECK_FRAUD_CACHE_SIZE = Config.CHECK_FRAUD_CACHE_SIZE
+CHECK_FRAUD_CACHE_TTL = Config.CHECK_FRAUD_CACHE_TTL
+CHECK_FRAUD_CONVERSATION_SIZE = Config.CHECK_FRAUD_CONVERSATION_SIZE
+CHECK_FRAUD_CONVERSATION_TTL = Config.CHECK_FRAUD_CONVERSATION_TTL
+CHECK_FRAUD_CONVERSATION_TURNS = Config.CHECK_FRAUD_CONVERSATION_TURNS
+CHECK_FRAUD_CONVERSATION_TOKENS = Config.CHECK_FRAUD_CONVERSATION_TOKENS
+CHECK_FRAUD_KEYWORD_LEXICON = Config.CHECK_FRAUD_KEYWORD_LEXICON
+CHECK_FRAUD_KEYWORD_MIN_CONFIDENCE = Config.CHECK_FRAUD_KEYWORD_MIN_CONFIDENCE
+CHECK_FRAUD_FEWSHOT_EXAMPLES = Config.CHECK_FRAUD_FEWSHOT_EXAMPLES
+CHECK_FRAUD_FEWSHOT_K = Config.CHECK_FRAUD_FEWSHOT_K
+CHECK_FRAUD_FEWSHOT_TOKENS = Config.CHECK_FRAUD_FEWSHOT_TOKENS
+CHECK_FRAUD_SIMILAR_SIZE = Config.CHECK_FRAUD_SIMILAR_SIZE
+CHECK_FRAUD_SIMILAR_DIM = Config.CHECK_FRAUD_SIMILAR_DIM
+CHECK_FRAUD_SIMILAR_THRESHOLD = Config.CHECK_FRAUD_SIMILAR_THRESHOLD
+CHECK_FRAUD_SIMILAR_MIN_CONFIDENCE = Config.CHECK_FRAUD_SIMILAR_MIN_CONFIDENCE
+CHECK_FRAUD_VERDICT_LOG = Config.CHECK_FRAUD_VERDICT_LOG
+CHECK_FRAUD_CLASSIFIER_PATH = Config.CHECK_FRAUD_CLASSIFIER_PATH
+CHECK_FRAUD_CLASSIFIER_SAFE_THRESHOLD = Config.CHECK_FRAUD_CLASSIFIER_SAFE_THRESHOLD
+CHECK_FRAUD_CLASSIFIER_RISK_THRESHOLD = Config.CHECK_FRAUD_CLASSIFIER_RISK_THRESHOLD
\ No newline at end of file
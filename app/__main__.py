@@ -4,16 +4,27 @@ from fastapi import FastAPI
 from contextlib import asynccontextmanager
 from starlette.middleware.cors import CORSMiddleware
 
-from app import WEB_HOST, WEB_PORT
+from app import LOGGER, WEB_HOST, WEB_PORT, WEB_WORKERS, CHECK_FRAUD_BACKEND
 from app.api import routers
+from app.api.endpoints import metrics, health
 from app.services.check_fraud import start_processing
+from app.services.ollama_client import ollama_client
+from app.services.ollama_model import model_manager
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """애플리케이션 시작 시 백그라운드 태스크 시작"""
-    await start_processing()
+    ollama_client.start()
+    # 모델 예열은 기다리지 않음 (끝나기 전까지 /health/ready가 503)
+    warmup = model_manager.start()
+    tasks = await start_processing()
+    if warmup is not None:
+        tasks.append(warmup)
     yield
+    for task in tasks:
+        task.cancel()
+    await ollama_client.close()
 
 app = FastAPI(
     title="9oormthon Keyboard Backend",
@@ -32,11 +43,26 @@ app.add_middleware(
 )
 
 app.include_router(routers.router, prefix="/api")
+# Prometheus 수집 경로는 /metrics 고정
+app.include_router(metrics.router, tags=["metrics"])
+# 로드 밸런서 헬스 체크 경로는 /health/ready 고정
+app.include_router(health.router, tags=["health"])
 
 if __name__ == "__main__":
-    uvicorn.run(
-        "app.__main__:app",
-        host=WEB_HOST,
-        port=WEB_PORT,
-        reload=True
-    )
\ No newline at end of file
+    if WEB_WORKERS > 1:
+        # 프로세스마다 대기열이 따로 생기므로 공유 대기열 필요
+        if CHECK_FRAUD_BACKEND == "local":
+            LOGGER.warning("WEB_WORKERS가 2 이상이면 CHECK_FRAUD_BACKEND를 'redis' 또는 'sqlite'로 설정해야 함")
+        uvicorn.run(
+            "app.__main__:app",
+            host=WEB_HOST,
+            port=WEB_PORT,
+            workers=WEB_WORKERS
+        )
+    else:
+        uvicorn.run(
+            "app.__main__:app",
+            host=WEB_HOST,
+            port=WEB_PORT,
+            reload=True
+        )
\ No newline at end of file
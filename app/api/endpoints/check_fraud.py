@@ -1,10 +1,29 @@
 import asyncio
-import datetime
-from fastapi import APIRouter
+from collections import defaultdict
+from fastapi import APIRouter, HTTPException, status
+from fastapi.responses import StreamingResponse
 
-from app.schemas.check_fraud import ChatRequest, ChatResponse
-from app.services.check_fraud_queue import CheckFraudQueue
-from app.services.check_fraud_result_dict import CheckFraudResultDict
+from app import CHECK_FRAUD_TIMEOUT
+
+from app.schemas.check_fraud import (
+    ChatRequest,
+    ChatResponse,
+    BatchChatRequest,
+    BatchChatResponse,
+    BatchChatItem
+)
+from app.services.check_fraud import (
+    lookup_verdict,
+    lookup_conversation,
+    submit_check,
+    submit_batch,
+    degraded_verdict,
+    pop_late_result,
+    pipeline_stats
+)
+from app.services.check_fraud_admission import CheckFraudOverloaded
+from app.services.check_fraud_text import normalize_message
+from app.services import metrics
 
 router = APIRouter()
 
@@ -17,6 +36,8 @@ router = APIRouter()
     ```
         Request:
             message: 메시지
+            priority: "interactive"(기본값, 전송 전 확인) or "background"(재검사, 나중에 처리)
+            conversation_id: 대화 ID (선택, 같은 대화의 이전 메시지를 함께 고려해 분석)
 
         Response:
             result: {
@@ -26,29 +47,174 @@ router = APIRouter()
                 explanation: 사용자에게 제공할 간단한 설명
                 recommended_action: "전송 전 확인" 같은게 들어감
             } | None
+            tier: "cache" or "keyword" or "similar" or "classifier" or "llm" (결과를 만든 단계)
+            degraded: 과부하로 LLM 대신 키워드 사전 결과(확신도 기준 없이)를 전달한 경우 true
         
         실패했을 경우:
             result: null
+
+        제한 시간 안에 결과가 나오지 않은 경우:
+            result: null
+            job_id: 작업 ID (GET /result/{job_id}로 나중에 도착한 결과 조회)
+
+        대기열이 가득 찬 경우, 또는 예상 대기 시간이 제한 시간을 넘는데 키워드 사전에도 걸리지 않는 경우:
+            503 Service Unavailable (Retry-After 헤더)
     """
 )
 async def check_fraud(data: ChatRequest):
-    # 큐에 삽입
-    CheckFraudQueue().push(data.message)
-    # 응답 대기
-    start_time = datetime.datetime.now()
-    
-    res: ChatResponse = None
+    # 캐시/키워드 사전으로 판별되면 바로 응답 (대화 중 메시지는 키워드 사전의 위험 판별만 사용)
+    if data.conversation_id is not None:
+        res = lookup_conversation(data.conversation_id, data.message)
+    else:
+        res = lookup_verdict(data.message)
+    if res is not None:
+        return res
     
-    # 매 초마다 확인, 최대 20초 대기
-    while (datetime.datetime.now() - start_time).seconds < 20:
-        response = CheckFraudResultDict().get(data.message)
-        if response is False:
-            response = None
-            break
-        if response is not None:
-            break
-        await asyncio.sleep(1)
+    # 큐에 삽입 (같은 메시지가 처리 중이면 합류)
+    try:
+        job = submit_check(
+            data.message,
+            priority=data.priority,
+            timeout=CHECK_FRAUD_TIMEOUT,
+            conversation_id=data.conversation_id
+        )
+    except CheckFraudOverloaded as e:
+        # 제한 시간 안에 처리할 수 없으므로 기다리지 않고 바로 응답
+        res = degraded_verdict(data.message)
+        if res is not None:
+            return res
+        metrics.QUEUE_REJECTED.inc(endpoint="single")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="요청이 많아 처리할 수 없음, 잠시 후 다시 시도",
+            headers={"Retry-After": str(e.retry_after)}
+        )
+    except asyncio.QueueFull:
+        metrics.QUEUE_REJECTED.inc(endpoint="single")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="요청이 많아 처리할 수 없음, 잠시 후 다시 시도",
+            headers={"Retry-After": "1"}
+        )
     
-    res = ChatResponse(result=response)
+    # 결과가 나오는 즉시 응답, 최대 CHECK_FRAUD_TIMEOUT초 대기
+    try:
+        res = await job.wait(CHECK_FRAUD_TIMEOUT)
+    except asyncio.TimeoutError:
+        metrics.TIMEOUTS.inc(endpoint="single")
+        res = ChatResponse(result=None, job_id=job.id)
     
-    return res
\ No newline at end of file
+    return res
+
+@router.get(
+    "/result/{job_id}",
+    response_model=ChatResponse,
+    summary="늦게 도착한 사기 탐지 결과 조회",
+    description="""
+    ```
+        제한 시간 안에 결과를 받지 못한 요청의 job_id로 이후에 도착한 결과 조회 (한 번만 조회 가능)
+        CHECK_FRAUD_RESULT_TTL초가 지나면 삭제됨
+
+        Response:
+            단일 검사와 같은 형식
+
+        결과가 없는 경우 (아직 처리 중, 처리하지 않고 버림, 만료, 이미 조회):
+            404 Not Found
+    """
+)
+async def check_fraud_result(job_id: str):
+    res = pop_late_result(job_id)
+    if res is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="결과 없음")
+    return res
+
+@router.get(
+    "/stats",
+    summary="사기 탐지 파이프라인 상태",
+    description="대기열 길이, 캐시/키워드/유사 메시지/분류기 통계, 단계별 판별 수, Ollama 서버 상태"
+)
+async def check_fraud_stats():
+    return pipeline_stats()
+
+@router.post(
+    "/batch",
+    response_model=BatchChatResponse,
+    summary="메시지 여러 개 사기 탐지",
+    description="""
+    ```
+        Request:
+            messages: ["메시지", ...] (최대 100개, 중복은 한 번만 검사)
+            priority: "background"(기본값) or "interactive"
+            stream: false(기본값) or true
+
+        Response (stream: false):
+            results: [
+                {
+                    index: 요청 messages에서의 위치
+                    message: 메시지
+                    result: 단일 검사와 같은 형식 | None
+                    tier: "cache" or "keyword" or "similar" or "classifier" or "llm" or "degraded"
+                    degraded: 과부하로 LLM 분석 없이 응답한 경우 true (키워드 사전에도 걸리지 않으면 result: null, tier: "degraded")
+                }
+            ]  (요청 순서)
+
+        Response (stream: true):
+            application/x-ndjson, 위 results 항목을 끝나는 순서대로 한 줄씩 전송
+
+        대기열에 모두 넣을 수 없는 경우:
+            503 Service Unavailable
+    """
+)
+async def check_fraud_batch(data: BatchChatRequest):
+    # 캐시/키워드 사전 확인 후 나머지는 한 번에 큐에 삽입
+    try:
+        ready, jobs = submit_batch(data.messages, priority=data.priority, timeout=CHECK_FRAUD_TIMEOUT)
+    except asyncio.QueueFull:
+        metrics.QUEUE_REJECTED.inc(endpoint="batch")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="요청이 많아 처리할 수 없음, 잠시 후 다시 시도",
+            headers={"Retry-After": "1"}
+        )
+
+    # 정규화된 메시지 -> 요청 messages에서의 위치 목록
+    indexes = defaultdict(list)
+    for index, message in enumerate(data.messages):
+        indexes[normalize_message(message)].append(index)
+
+    def items(key: str, res: ChatResponse) -> list[BatchChatItem]:
+        return [
+            BatchChatItem(index=index, message=data.messages[index], result=res.result, tier=res.tier, job_id=res.job_id, degraded=res.degraded)
+            for index in indexes[key]
+        ]
+
+    async def wait(key: str, job) -> tuple[str, ChatResponse]:
+        try:
+            return key, await job.wait(CHECK_FRAUD_TIMEOUT)
+        except asyncio.TimeoutError:
+            metrics.TIMEOUTS.inc(endpoint="batch")
+            return key, ChatResponse(result=None, job_id=job.id)
+
+    if not data.stream:
+        results = dict(ready)
+        results.update(await asyncio.gather(*(wait(key, job) for key, job in jobs.items())))
+        merged = [item for key, res in results.items() for item in items(key, res)]
+        merged.sort(key=lambda item: item.index)
+        return BatchChatResponse(results=merged)
+
+    async def stream():
+        tasks = [asyncio.create_task(wait(key, job)) for key, job in jobs.items()]
+        try:
+            for key, res in ready.items():
+                for item in items(key, res):
+                    yield item.model_dump_json() + "\n"
+            for task in asyncio.as_completed(tasks):
+                key, res = await task
+                for item in items(key, res):
+                    yield item.model_dump_json() + "\n"
+        finally:
+            # 클라이언트 연결이 끊긴 경우 남은 대기 취소
+            for task in tasks:
+                task.cancel()
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
\ No newline at end of file
@@ -0,0 +1,26 @@
+from fastapi import APIRouter, status
+from fastapi.responses import JSONResponse
+
+from app.services.ollama_model import model_manager
+
+router = APIRouter()
+
+@router.get(
+    "/health/ready",
+    summary="트래픽 수신 가능 여부 (readiness probe)",
+    description="""
+    ```
+        Ollama 모델이 예열되어 메모리에 올라가 있는 서버가 하나라도 있으면 200, 아니면 503
+        (OLLAMA_WARMUP이 False면 항상 200)
+
+        Response:
+            ready: true or false
+            model: 모델 이름
+            backends: [{url, warm, warmup_seconds}]
+    """
+)
+async def ready():
+    stats = model_manager.stats()
+    if not stats["ready"]:
+        return JSONResponse(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, content=stats)
+    return stats
@@ -0,0 +1,41 @@
+from fastapi import APIRouter, WebSocket, WebSocketDisconnect
+from pydantic import ValidationError
+
+from app.schemas.check_fraud import LiveCheckRequest
+from app.services.check_fraud_live import LiveCheckSession
+
+router = APIRouter()
+
+@router.websocket("/check_fraud")
+async def live_check_fraud(websocket: WebSocket):
+    """
+    입력 중인 메시지 실시간 사기 탐지
+
+    Client -> Server:
+        {"message": "입력 중인 초안", "id": 초안 번호(선택)}
+
+    Server -> Client:
+        {"type": "verdict", "id": 초안 번호, "message": 초안, "result": {...} | null, "tier": ..., "provisional": false}
+        - provisional: true면 앞부분이 같은 이전 초안의 결과 (최종 결과가 뒤따름)
+        {"type": "risk_level", "id": 초안 번호, "message": 초안, "risk_level": "정상" or "주의" or "위험", "provisional": true}
+        - LLM이 설명을 생성하기 전에 먼저 확인된 위험도 (배치로 묶여 분석된 경우에는 오지 않음)
+        {"type": "error", "detail": ...}
+        - 잘못된 형식의 요청 (JSON이 아니거나 바이너리 프레임)
+
+    새 초안이 오면 이전 초안 검사는 취소되며, 입력이 멈춘 뒤에만 검사함
+    """
+    await websocket.accept()
+    session = LiveCheckSession(websocket.send_json)
+    try:
+        while True:
+            try:
+                data = LiveCheckRequest.model_validate(await websocket.receive_json())
+            except (ValidationError, ValueError, KeyError):
+                # 바이너리 프레임은 receive_json에서 KeyError
+                await websocket.send_json({"type": "error", "detail": "잘못된 요청 형식"})
+                continue
+            session.update(data.message, data.id)
+    except WebSocketDisconnect:
+        pass
+    finally:
+        await session.close()
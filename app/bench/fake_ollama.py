@@ -0,0 +1,235 @@
+"""
+로컬 테스트용 가짜 Ollama 서버 (/api/generate, /api/tags, /api/ps)
+
+실제 모델 없이 check_fraud 파이프라인의 처리량/지연 시간을 측정하기 위해 사용
+    python -m app.bench.fake_ollama --port 11434 --latency-mean 1.5 --concurrency 2
+--load-time를 지정하면 모델이 내려가 있을 때 첫 요청이 그만큼 더 걸림 (keep_alive가 지나거나 keep_alive: 0이면 내려감)
+"""
+import json
+import math
+import time
+import random
+import asyncio
+import argparse
+import hashlib
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+# 메시지 해시로 고르는 응답 (같은 메시지에는 항상 같은 결과)
+VERDICTS = [
+    {"risk_level": "정상", "confidence": 0.99, "detected_patterns": [], "explanation": "일상적인 대화입니다.", "recommended_action": "없음"},
+    {"risk_level": "정상", "confidence": 0.95, "detected_patterns": [], "explanation": "일상적인 대화입니다.", "recommended_action": "없음"},
+    {"risk_level": "주의", "confidence": 0.75, "detected_patterns": ["직접적인 금전 요구"], "explanation": "금전 요구는 주의가 필요합니다.", "recommended_action": "전송 전 확인"},
+    {"risk_level": "위험", "confidence": 0.92, "detected_patterns": ["송금 재촉"], "explanation": "급한 송금 요구는 사기의 전형적인 수법입니다.", "recommended_action": "전송 중단 권고"},
+]
+
+def parse_keep_alive(value) -> float:
+    """
+    keep_alive 값을 초 단위로 변환 (숫자는 초, "30s"/"5m"/"1h", 음수는 계속 유지, 없으면 Ollama 기본값 5분)
+    """
+    if value is None:
+        return 300.0
+    if isinstance(value, str):
+        units = {"s": 1, "m": 60, "h": 3600}
+        if value and value[-1] in units:
+            seconds = float(value[:-1]) * units[value[-1]]
+        else:
+            seconds = float(value)
+    else:
+        seconds = float(value)
+    return math.inf if seconds < 0 else seconds
+
+class FakeOllama:
+    def __init__(
+        self,
+        latency_dist: str = "lognormal",
+        latency_mean: float = 1.0,
+        latency_jitter: float = 0.3,
+        concurrency: int = 1,
+        malformed_rate: float = 0.0,
+        token_delay: float = 0.01,
+        model: str = "gemma3:4b",
+        load_time: float = 0.0,
+        seed: int | None = None
+    ):
+        self.latency_dist = latency_dist
+        self.latency_mean = latency_mean
+        self.latency_jitter = latency_jitter
+        self.malformed_rate = malformed_rate
+        self.token_delay = token_delay
+        self.model = model
+        self.load_time = load_time
+        self.loaded_until: float | None = None  # 모델이 메모리에 남아 있는 기한 (None이면 내려감)
+        self.loads = 0
+        self._load_lock = asyncio.Lock()
+        self.random = random.Random(seed)
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self.requests = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.malformed = 0
+        self.prompt_chars = 0
+
+    def latency(self) -> float:
+        """설정한 분포에서 생성 시간 샘플링 (초)"""
+        mean, jitter = self.latency_mean, self.latency_jitter
+        if self.latency_dist == "fixed":
+            return mean
+        if self.latency_dist == "uniform":
+            return max(0.0, self.random.uniform(mean - jitter, mean + jitter))
+        if self.latency_dist == "exponential":
+            return self.random.expovariate(1 / mean) if mean > 0 else 0.0
+        # lognormal: 평균이 mean이 되도록 mu 조정
+        sigma = max(jitter, 1e-6)
+        mu = -sigma ** 2 / 2
+        return mean * self.random.lognormvariate(mu, sigma)
+
+    @property
+    def loaded(self) -> bool:
+        return self.loaded_until is not None and time.monotonic() < self.loaded_until
+
+    async def load(self):
+        """모델이 내려가 있으면 load_time 동안 불러옴 (동시 요청은 한 번만 불러옴)"""
+        async with self._load_lock:
+            if not self.loaded:
+                await asyncio.sleep(self.load_time)
+                self.loads += 1
+                self.loaded_until = math.inf
+
+    def touch(self, keep_alive):
+        """요청이 끝난 뒤 keep_alive만큼 모델 유지 (0이면 바로 내림)"""
+        seconds = parse_keep_alive(keep_alive)
+        self.loaded_until = None if seconds == 0 else time.monotonic() + seconds
+
+    def verdict_text(self, prompt: str, format) -> str:
+        """프롬프트에 맞는 응답 텍스트 (배열 스키마면 배열로 응답)"""
+        if self.random.random() < self.malformed_rate:
+            self.malformed += 1
+            return self.random.choice(['{"risk_level": "위험", "confidence": ', 'Sorry, I cannot help with that.', '```json\n{}\n```'])
+        digest = hashlib.md5(prompt.rsplit("=====", 1)[-1].encode()).digest()
+        if isinstance(format, dict) and format.get("type") == "array":
+            size = format.get("minItems", 1)
+            return json.dumps([VERDICTS[digest[i % len(digest)] % len(VERDICTS)] for i in range(size)], ensure_ascii=False)
+        return json.dumps(VERDICTS[digest[0] % len(VERDICTS)], ensure_ascii=False)
+
+    def app(self) -> FastAPI:
+        app = FastAPI(title="Fake Ollama")
+
+        @app.get("/api/tags")
+        async def tags():
+            return {"models": [{"name": self.model, "model": self.model}]}
+
+        @app.get("/api/ps")
+        async def ps():
+            if not self.loaded:
+                return {"models": []}
+            return {"models": [{"name": self.model, "model": self.model}]}
+
+        @app.get("/stats")
+        async def stats():
+            return {
+                "loaded": self.loaded,
+                "loads": self.loads,
+                "requests": self.requests,
+                "in_flight": self.in_flight,
+                "max_in_flight": self.max_in_flight,
+                "malformed": self.malformed,
+                "prompt_chars": self.prompt_chars,
+            }
+
+        @app.post("/api/generate")
+        async def generate(request: Request):
+            data = await request.json()
+            await self.load()
+            if not data.get("prompt"):
+                # 프롬프트가 없으면 모델만 불러오고 keep_alive 갱신 (keep_alive: 0이면 내림)
+                self.touch(data.get("keep_alive"))
+                return JSONResponse({"model": self.model, "response": "", "done": True})
+            prompt = data.get("prompt", "")
+            self.requests += 1
+            self.prompt_chars += len(prompt)
+            text = self.verdict_text(prompt, data.get("format"))
+            latency = self.latency()
+            # 토큰 수는 대략 글자 수로 계산
+            eval_count = len(text)
+            metadata = {
+                "model": self.model,
+                "done": True,
+                "prompt_eval_count": len(prompt),
+                "eval_count": eval_count,
+                "eval_duration": int(latency * 1e9),
+                "total_duration": int(latency * 1e9),
+                # 실제 Ollama처럼 이전 context에 이번 프롬프트/응답 토큰을 이어 붙여 반환
+                "context": list(data.get("context") or []) + [ord(ch) for ch in prompt + text],
+            }
+
+            if not data.get("stream", True):
+                async with self.semaphore:
+                    self._enter()
+                    try:
+                        await asyncio.sleep(latency)
+                    finally:
+                        self._leave()
+                self.touch(data.get("keep_alive"))
+                return JSONResponse({"response": text, **metadata})
+
+            async def stream():
+                async with self.semaphore:
+                    self._enter()
+                    try:
+                        # 첫 토큰 전까지 prefill 시간, 이후 토큰마다 token_delay
+                        await asyncio.sleep(max(0.0, latency - self.token_delay * len(text) / 4))
+                        for i in range(0, len(text), 4):
+                            yield json.dumps({"model": self.model, "response": text[i:i + 4], "done": False}, ensure_ascii=False) + "\n"
+                            await asyncio.sleep(self.token_delay)
+                        # 실제 모델처럼 JSON 뒤에 공백을 계속 생성
+                        for _ in range(20):
+                            yield json.dumps({"model": self.model, "response": "\n", "done": False}) + "\n"
+                            await asyncio.sleep(self.token_delay)
+                        yield json.dumps({"response": "", **metadata}) + "\n"
+                    finally:
+                        self._leave()
+                        self.touch(data.get("keep_alive"))
+
+            return StreamingResponse(stream(), media_type="application/x-ndjson")
+
+        return app
+
+    def _enter(self):
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+
+    def _leave(self):
+        self.in_flight -= 1
+
+def main():
+    parser = argparse.ArgumentParser(description="가짜 Ollama 서버")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=11434)
+    parser.add_argument("--latency-dist", choices=["fixed", "uniform", "exponential", "lognormal"], default="lognormal")
+    parser.add_argument("--latency-mean", type=float, default=1.0, help="평균 생성 시간 (초)")
+    parser.add_argument("--latency-jitter", type=float, default=0.3, help="uniform: 범위, lognormal: sigma")
+    parser.add_argument("--concurrency", type=int, default=1, help="동시에 생성하는 요청 수 (OLLAMA_NUM_PARALLEL)")
+    parser.add_argument("--malformed-rate", type=float, default=0.0, help="잘못된 형식으로 응답할 확률")
+    parser.add_argument("--token-delay", type=float, default=0.01, help="스트리밍 토큰 사이 간격 (초)")
+    parser.add_argument("--model", default="gemma3:4b")
+    parser.add_argument("--load-time", type=float, default=0.0, help="모델을 불러오는 시간 (초, 내려간 뒤 첫 요청에 추가)")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    fake = FakeOllama(
+        latency_dist=args.latency_dist,
+        latency_mean=args.latency_mean,
+        latency_jitter=args.latency_jitter,
+        concurrency=args.concurrency,
+        malformed_rate=args.malformed_rate,
+        token_delay=args.token_delay,
+        model=args.model,
+        load_time=args.load_time,
+        seed=args.seed
+    )
+    uvicorn.run(fake.app(), host=args.host, port=args.port, log_level="warning")
+
+if __name__ == "__main__":
+    main()
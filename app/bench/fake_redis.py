@@ -0,0 +1,123 @@
+"""
+로컬 테스트용 Redis 호환 서버 (공유 대기열에서 사용하는 리스트 명령만 지원)
+
+redis-server 없이 CHECK_FRAUD_BACKEND = 'redis' 구성을 확인하기 위해 사용
+    python -m app.bench.fake_redis --port 6379
+"""
+import time
+import asyncio
+import argparse
+
+from app.services.redis_client import read_reply
+
+class FakeRedis:
+    def __init__(self):
+        self.lists: dict[bytes, list[bytes]] = {}
+        self.expires: dict[bytes, float] = {}
+        self.changed = asyncio.Condition()
+        self.commands = 0
+
+    def _list(self, key: bytes) -> list[bytes]:
+        expires_at = self.expires.get(key)
+        if expires_at is not None and expires_at <= time.monotonic():
+            self.lists.pop(key, None)
+            self.expires.pop(key, None)
+        return self.lists.setdefault(key, [])
+
+    def _pop(self, key: bytes, left: bool, count: int | None):
+        items = self._list(key)
+        if not items:
+            return None
+        n = 1 if count is None else min(count, len(items))
+        popped = [items.pop(0 if left else -1) for _ in range(n)]
+        return popped[0] if count is None else popped
+
+    async def _blocking_pop(self, keys: list[bytes], timeout: float, left: bool):
+        deadline = time.monotonic() + timeout if timeout > 0 else None
+        async with self.changed:
+            while True:
+                for key in keys:
+                    item = self._pop(key, left, None)
+                    if item is not None:
+                        return [key, item]
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return None
+                try:
+                    await asyncio.wait_for(self.changed.wait(), timeout=remaining)
+                except asyncio.TimeoutError:
+                    return None
+
+    async def execute(self, args: list[bytes]):
+        self.commands += 1
+        name = args[0].upper()
+        if name == b"PING":
+            return "PONG"
+        if name in (b"AUTH", b"SELECT"):
+            return "OK"
+        if name in (b"LPUSH", b"RPUSH"):
+            items = self._list(args[1])
+            for value in args[2:]:
+                if name == b"LPUSH":
+                    items.insert(0, value)
+                else:
+                    items.append(value)
+            async with self.changed:
+                self.changed.notify_all()
+            return len(items)
+        if name in (b"LPOP", b"RPOP"):
+            return self._pop(args[1], name == b"LPOP", int(args[2]) if len(args) > 2 else None)
+        if name in (b"BLPOP", b"BRPOP"):
+            return await self._blocking_pop(args[1:-1], float(args[-1]), name == b"BLPOP")
+        if name == b"LLEN":
+            return len(self._list(args[1]))
+        if name == b"EXPIRE":
+            self.expires[args[1]] = time.monotonic() + int(args[2])
+            return 1
+        if name == b"DEL":
+            return sum(self.lists.pop(key, None) is not None for key in args[1:])
+        if name == b"FLUSHALL":
+            self.lists.clear()
+            self.expires.clear()
+            return "OK"
+        return Exception(f"ERR unknown command '{args[0].decode()}'")
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                args = await read_reply(reader)
+                writer.write(encode_reply(await self.execute(args)))
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+def encode_reply(value) -> bytes:
+    if value is None:
+        return b"$-1\r\n"
+    if isinstance(value, Exception):
+        return b"-" + str(value).encode() + b"\r\n"
+    if isinstance(value, str):
+        return b"+" + value.encode() + b"\r\n"
+    if isinstance(value, int):
+        return b":%d\r\n" % value
+    if isinstance(value, bytes):
+        return b"$%d\r\n%s\r\n" % (len(value), value)
+    return b"*%d\r\n" % len(value) + b"".join(encode_reply(item) for item in value)
+
+async def serve(host: str, port: int):
+    fake = FakeRedis()
+    server = await asyncio.start_server(fake.handle, host, port)
+    async with server:
+        await server.serve_forever()
+
+def main():
+    parser = argparse.ArgumentParser(description="가짜 Redis 서버")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=6379)
+    args = parser.parse_args()
+    asyncio.run(serve(args.host, args.port))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+대기열 저널 성능 측정
+
+메모리 대기열과 저널을 켠 대기열에서 같은 수의 작업을 넣고(push) 꺼내(pop_batch) 완료하면서
+처리량과 push 지연 시간(p50/p99)을 비교
+    python -m app.bench.journal_bench --jobs 20000 --flush 0.05
+"""
+import time
+import asyncio
+import argparse
+import tempfile
+
+from app.services.check_fraud_queue import CheckFraudQueue, CheckFraudJob
+from app.services.check_fraud_journal import CheckFraudJournal
+from app.bench.load_test import percentile
+
+async def run(jobs: int, batch_size: int, journal: CheckFraudJournal | None) -> dict:
+    cfq = CheckFraudQueue()
+    cfq.journal = journal
+    tasks = [journal.start()] if journal is not None else []
+    done = 0
+    finished = asyncio.Event()
+
+    async def worker():
+        nonlocal done
+        while True:
+            for job in await cfq.pop_batch(batch_size, 0.0):
+                job.set_result(None)
+                done += 1
+            if done >= jobs:
+                finished.set()
+
+    tasks.append(asyncio.create_task(worker()))
+    latencies = []
+    started_at = time.perf_counter()
+    for i in range(jobs):
+        job = CheckFraudJob(f"메시지 {i}", timeout=60)
+        t = time.perf_counter()
+        cfq.push(job)
+        latencies.append(time.perf_counter() - t)
+        if i % batch_size == 0:
+            # 요청이 들어오는 사이 워커가 처리할 수 있도록 양보
+            await asyncio.sleep(0)
+    await finished.wait()
+    elapsed = time.perf_counter() - started_at
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    return {
+        "jobs_per_sec": jobs / elapsed,
+        "push_p50_us": percentile(latencies, 0.5) * 1e6,
+        "push_p99_us": percentile(latencies, 0.99) * 1e6,
+        "journal": journal.stats() if journal is not None else None,
+    }
+
+async def main_async(args):
+    memory = await run(args.jobs, args.batch_size, None)
+    with tempfile.TemporaryDirectory() as directory:
+        journal = CheckFraudJournal(directory, flush_interval=args.flush, segment_size=args.segment_size)
+        journaled = await run(args.jobs, args.batch_size, journal)
+
+    print(f"{'mode':<10}{'jobs/s':>12}{'push p50(us)':>15}{'push p99(us)':>15}")
+    for name, result in (("memory", memory), ("journal", journaled)):
+        print(f"{name:<10}{result['jobs_per_sec']:>12.0f}{result['push_p50_us']:>15.1f}{result['push_p99_us']:>15.1f}")
+    stats = journaled["journal"]
+    print(
+        f"journal: {stats['appended']}개 기록, flush {stats['flushes']}회 "
+        f"(평균 {stats['avg_flush_seconds'] * 1000:.2f}ms), compaction {stats['compactions']}회"
+    )
+
+def main():
+    parser = argparse.ArgumentParser(description="대기열 저널 성능 측정")
+    parser.add_argument("--jobs", type=int, default=20000)
+    parser.add_argument("--batch-size", type=int, default=4)
+    parser.add_argument("--flush", type=float, default=0.05, help="저널 group commit 주기 (초)")
+    parser.add_argument("--segment-size", type=int, default=1024 * 1024)
+    args = parser.parse_args()
+    asyncio.run(main_async(args))
+
+if __name__ == "__main__":
+    main()
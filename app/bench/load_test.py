@@ -0,0 +1,174 @@
+"""
+check_fraud API 부하 테스트
+
+고정 RPS(open loop) 또는 고정 동시 요청 수(closed loop)로 /api/check_fraud/를 호출하고
+처리량, p50/p95/p99 지연 시간, 타임아웃(result: null) 비율, 대기열 길이를 출력
+    python -m app.bench.load_test --url http://localhost:5000 --rps 10 --duration 30
+    python -m app.bench.load_test --url http://localhost:5000 --concurrency 16 --duration 30 --unique
+"""
+import json
+import time
+import logging
+import random
+import asyncio
+import argparse
+import statistics
+from collections import Counter
+
+import httpx
+
+DEFAULT_MESSAGES = [
+    "내일 학식 뭐야?",
+    "롤이나 하자",
+    "얼마 보내면 돼요?",
+    "지금 바로 이체하라고?",
+    "수익률이 200% 라구요?",
+    "링크에 들어가라고요?",
+    "무슨 부탁인데?",
+    "대출이 가능한거에요?",
+    "오늘 저녁 같이 먹을래?",
+    "카드 정보/인증서만 입력하면 되죠?",
+]
+
+def percentile(values: list[float], p: float) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(int(len(values) * p), len(values) - 1)]
+
+def load_messages(path: str | None) -> list[str]:
+    """메시지 파일 읽기 (한 줄에 하나, 또는 {"text": ...} 형식의 JSONL)"""
+    if path is None:
+        return DEFAULT_MESSAGES
+    messages = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            if line.startswith("{"):
+                line = json.loads(line)["text"]
+            messages.append(line)
+    return messages
+
+class LoadTest:
+    def __init__(self, url: str, messages: list[str], unique: bool, timeout: float):
+        self.url = url.rstrip("/")
+        self.messages = messages
+        self.unique = unique
+        self.timeout = timeout
+        self.latencies: list[float] = []
+        self.outcomes = Counter()  # ok, null, degraded, rejected, error
+        self.tiers = Counter()
+        self.queue_depths: list[int] = []
+        self._seq = 0
+
+    def next_message(self) -> str:
+        message = random.choice(self.messages)
+        if self.unique:
+            # 캐시/중복 합치기를 피하기 위해 메시지마다 다른 꼬리 추가
+            self._seq += 1
+            message = f"{message} #{self._seq}"
+        return message
+
+    async def one(self, client: httpx.AsyncClient):
+        started_at = time.perf_counter()
+        try:
+            response = await client.post(f"{self.url}/api/check_fraud/", json={"message": self.next_message()})
+        except httpx.HTTPError:
+            self.outcomes["error"] += 1
+            return
+        self.latencies.append(time.perf_counter() - started_at)
+        if response.status_code in (429, 503):
+            self.outcomes["rejected"] += 1
+        elif response.status_code != 200:
+            self.outcomes["error"] += 1
+        else:
+            body = response.json()
+            if body.get("degraded"):
+                self.outcomes["degraded"] += 1
+            else:
+                self.outcomes["ok" if body.get("result") is not None else "null"] += 1
+            self.tiers[body.get("tier")] += 1
+
+    async def sample_queue(self, client: httpx.AsyncClient, interval: float = 0.5):
+        while True:
+            try:
+                response = await client.get(f"{self.url}/api/check_fraud/stats")
+                self.queue_depths.append(response.json()["queue"]["depth"])
+            except (httpx.HTTPError, KeyError, ValueError):
+                pass
+            await asyncio.sleep(interval)
+
+    async def run_rps(self, client: httpx.AsyncClient, rps: float, duration: float):
+        """고정 RPS (포아송 도착)"""
+        tasks = []
+        loop = asyncio.get_running_loop()
+        end = loop.time() + duration
+        while loop.time() < end:
+            tasks.append(asyncio.create_task(self.one(client)))
+            await asyncio.sleep(random.expovariate(rps))
+        await asyncio.gather(*tasks)
+
+    async def run_concurrency(self, client: httpx.AsyncClient, concurrency: int, duration: float):
+        """고정 동시 요청 수"""
+        loop = asyncio.get_running_loop()
+        end = loop.time() + duration
+
+        async def user():
+            while loop.time() < end:
+                await self.one(client)
+
+        await asyncio.gather(*(user() for _ in range(concurrency)))
+
+    async def run(self, rps: float | None, concurrency: int | None, duration: float) -> dict:
+        limits = httpx.Limits(max_connections=None, max_keepalive_connections=None)
+        async with httpx.AsyncClient(timeout=self.timeout, limits=limits) as client:
+            sampler = asyncio.create_task(self.sample_queue(client))
+            started_at = time.perf_counter()
+            if rps is not None:
+                await self.run_rps(client, rps, duration)
+            else:
+                await self.run_concurrency(client, concurrency, duration)
+            wall = time.perf_counter() - started_at
+            sampler.cancel()
+        return self.report(wall)
+
+    def report(self, wall: float) -> dict:
+        total = sum(self.outcomes.values())
+        return {
+            "requests": total,
+            "wall_time": round(wall, 3),
+            "throughput": round(total / wall, 3) if wall else 0.0,
+            "latency_p50": round(percentile(self.latencies, 0.50), 4),
+            "latency_p95": round(percentile(self.latencies, 0.95), 4),
+            "latency_p99": round(percentile(self.latencies, 0.99), 4),
+            "latency_mean": round(statistics.fmean(self.latencies), 4) if self.latencies else 0.0,
+            "timeout_rate": round(self.outcomes["null"] / total, 4) if total else 0.0,
+            "outcomes": dict(self.outcomes),
+            "tiers": {str(tier): count for tier, count in self.tiers.items()},
+            "queue_depth_max": max(self.queue_depths, default=0),
+            "queue_depth_mean": round(statistics.fmean(self.queue_depths), 2) if self.queue_depths else 0.0,
+        }
+
+def main():
+    parser = argparse.ArgumentParser(description="check_fraud 부하 테스트")
+    parser.add_argument("--url", default="http://localhost:5000")
+    mode = parser.add_mutually_exclusive_group(required=True)
+    mode.add_argument("--rps", type=float, help="초당 요청 수 (open loop)")
+    mode.add_argument("--concurrency", type=int, help="동시 요청 수 (closed loop)")
+    parser.add_argument("--duration", type=float, default=30, help="테스트 시간 (초)")
+    parser.add_argument("--messages", default=None, help="메시지 파일 (한 줄에 하나 또는 JSONL)")
+    parser.add_argument("--unique", action="store_true", help="메시지마다 꼬리를 붙여 캐시를 우회")
+    parser.add_argument("--timeout", type=float, default=60, help="HTTP 요청 제한 시간 (초)")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    test = LoadTest(args.url, load_messages(args.messages), args.unique, args.timeout)
+    result = asyncio.run(test.run(args.rps, args.concurrency, args.duration))
+    print(json.dumps(result, ensure_ascii=False, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,216 @@
+"""
+가짜 Ollama를 프로세스 안에서 띄워 check_fraud 경로를 빠르게 확인하는 스모크 테스트 (배포 전, CI용)
+
+실제 모델이나 외부 서버 없이 몇 초 안에 끝나며, 실패한 검사가 있으면 종료 코드 1
+    python -m app.bench.smoke
+    python -m app.bench.smoke --only pipeline
+"""
+import sys
+import time
+import asyncio
+import logging
+import argparse
+from contextlib import asynccontextmanager
+
+import httpx
+import uvicorn
+
+from app.bench.fake_ollama import FakeOllama
+from app.services.ollama_client import OllamaClient, OllamaBackend, ollama_client
+
+# 키워드 사전/유사 메시지에 걸리지 않아 LLM까지 가는 메시지
+LLM_MESSAGE = "오늘 저녁 같이 먹을래?"
+
+@asynccontextmanager
+async def running(app, lifespan: str = "off"):
+    """
+    빈 포트로 uvicorn 서버를 시작하고 주소 반환 (블록을 나가면 종료)
+    """
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=0, log_level="warning", lifespan=lifespan))
+    task = asyncio.create_task(server.serve())
+    while not server.started:
+        if task.done():
+            task.result()
+            raise RuntimeError("서버를 시작하지 못함")
+        await asyncio.sleep(0.01)
+    port = server.servers[0].sockets[0].getsockname()[1]
+    try:
+        yield f"http://127.0.0.1:{port}"
+    finally:
+        server.should_exit = True
+        await task
+
+def fake_ollama(latency: float, **kwargs) -> FakeOllama:
+    return FakeOllama(latency_dist="fixed", latency_mean=latency, token_delay=0.001, seed=0, **kwargs)
+
+async def wait_ready(client: httpx.AsyncClient, timeout: float = 10.0) -> bool:
+    """/health/ready가 200이 될 때까지 대기 (모델 예열)"""
+    loop = asyncio.get_running_loop()
+    end = loop.time() + timeout
+    while loop.time() < end:
+        if (await client.get("/health/ready")).status_code == 200:
+            return True
+        await asyncio.sleep(0.05)
+    return False
+
+async def check_pipeline(count: int) -> list[str]:
+    """
+    API 서버 전체(lifespan 포함)를 가짜 Ollama에 연결해 요청을 보내고 /stats 카운터 확인
+    """
+    from app.__main__ import app
+
+    failures = []
+    fake = fake_ollama(0.05, concurrency=2)
+    async with running(fake.app()) as ollama_url:
+        ollama_client.backends = [OllamaBackend(ollama_url)]
+        async with running(app, lifespan="on") as url:
+            async with httpx.AsyncClient(base_url=url, timeout=30) as client:
+                if not await wait_ready(client):
+                    failures.append("/health/ready가 200이 되지 않음")
+                responses = await asyncio.gather(*(
+                    client.post("/api/check_fraud/", json={"message": f"{LLM_MESSAGE} #{i}"})
+                    for i in range(count)
+                ))
+                stats = (await client.get("/api/check_fraud/stats")).json()
+        async with httpx.AsyncClient(base_url=ollama_url) as client:
+            fake_stats = (await client.get("/stats")).json()
+
+    bodies = [response.json() for response in responses if response.status_code == 200]
+    if len(bodies) != count:
+        failures.append(f"200 응답 {len(bodies)}/{count}개")
+    if any(body["result"] is None for body in bodies):
+        failures.append("결과 없는 응답 (result: null)")
+    llm = sum(1 for body in bodies if body["tier"] == "llm")
+    if llm == 0 or stats["tiers"].get("llm", 0) != llm:
+        failures.append(f"/api/check_fraud/stats tiers.llm {stats['tiers'].get('llm')} != 응답 {llm}개")
+    if stats["queue"]["depth"] != 0 or stats["inflight"] != 0:
+        failures.append(f"대기열이 비지 않음: depth {stats['queue']['depth']}, inflight {stats['inflight']}")
+    backend = stats["ollama"]["backends"][0]
+    # 가짜 Ollama의 요청 수에는 예열 생성이 포함됨 (배치로 묶이면 LLM 호출이 응답 수보다 적음)
+    if not 0 < backend["requests"] <= fake_stats["requests"]:
+        failures.append(f"Ollama 요청 수 불일치: 클라이언트 {backend['requests']}, 가짜 Ollama {fake_stats['requests']}")
+    if backend["errors"] or fake_stats["in_flight"]:
+        failures.append(f"Ollama 오류 {backend['errors']}개, 남은 요청 {fake_stats['in_flight']}개")
+    if fake_stats["loads"] != 1:
+        failures.append(f"모델을 {fake_stats['loads']}번 불러옴 (예열 1번이어야 함)")
+    return failures
+
+async def check_eject() -> list[str]:
+    """
+    응답 시간이 크게 다른 가짜 Ollama 두 대 중 느린 서버만 제외되는지 확인
+    """
+    failures = []
+    async with running(fake_ollama(0.05).app()) as fast_url, running(fake_ollama(0.5).app()) as slow_url:
+        client = OllamaClient()
+        client.backends = [OllamaBackend(fast_url), OllamaBackend(slow_url)]
+        fast, slow = client.backends
+        client.start()
+        try:
+            data = client._payload(LLM_MESSAGE, None)
+            for backend in (fast, slow, fast, slow):
+                await client._call(backend, data, None)
+            client._eject_slow()
+        finally:
+            await client.close()
+    if not slow.ejected_until > time.monotonic():
+        failures.append(f"느린 서버가 제외되지 않음 (응답 시간 {slow.stats()})")
+    if fast.ejected_until > time.monotonic():
+        failures.append("빠른 서버가 제외됨")
+    if client._pick() is not fast:
+        failures.append("제외된 서버가 선택됨")
+    return failures
+
+async def check_hedge() -> list[str]:
+    """
+    첫 요청이 느리면 다른 서버로 헤징하는지, 헤징 중 호출한 쪽이 취소되면 두 요청이 모두 정리되는지 확인
+    """
+    failures = []
+    async with running(fake_ollama(0.3).app()) as fast_url, running(fake_ollama(2.0).app()) as slow_url:
+        client = OllamaClient()
+        client.backends = [OllamaBackend(fast_url), OllamaBackend(slow_url)]
+        fast, slow = client.backends
+        client.hedge_percentile = 0.5
+        client._latencies.extend([0.1] * 20)
+        # 모델을 불러오는 중인 것으로 표시해 첫 요청은 항상 느린 서버로 보냄
+        fast.warm = False
+        client.start()
+        try:
+            started_at = time.monotonic()
+            await client.generate(LLM_MESSAGE)
+            elapsed = time.monotonic() - started_at
+            if client.hedged != 1 or elapsed > 1.0:
+                failures.append(f"헤징 {client.hedged}회, {elapsed:.2f}초 (빠른 서버 결과를 사용하지 않음)")
+
+            # 헤징 전(첫 요청만 진행 중)과 헤징 후(두 요청 진행 중)에 각각 취소
+            for cancel_after, expected in ((0.05, (0, 1)), (0.2, (1, 1))):
+                task = asyncio.create_task(client.generate(LLM_MESSAGE))
+                await asyncio.sleep(cancel_after)
+                if (fast.outstanding, slow.outstanding) != expected:
+                    failures.append(f"{cancel_after}초 후 outstanding {fast.outstanding}, {slow.outstanding} != {expected}")
+                task.cancel()
+                await asyncio.gather(task, return_exceptions=True)
+                await asyncio.sleep(0.1)
+                if fast.outstanding or slow.outstanding:
+                    failures.append(f"{cancel_after}초 후 취소했는데 남은 요청: outstanding {fast.outstanding}, {slow.outstanding}")
+        finally:
+            await client.close()
+    return failures
+
+async def check_eval() -> list[str]:
+    """
+    프롬프트 예시 코퍼스로 오프라인 평가(app.eval)를 가짜 Ollama에 돌려 보고서 항목 확인
+    (가짜 Ollama는 메시지 해시로 답하므로 정확도는 보지 않음)
+    """
+    from app.eval import NONE_LABEL, Evaluation, default_corpus
+
+    failures = []
+    items = default_corpus()
+    async with running(fake_ollama(0.02, concurrency=4).app()) as ollama_url:
+        ollama_client.backends = [OllamaBackend(ollama_url)]
+        for tier in ("llm", "pipeline"):
+            report = await Evaluation(items, tier, concurrency=4, timeout=10).run()
+            decided = sum(count for row in report["confusion"].values() for label, count in row.items() if label != NONE_LABEL)
+            if report["items"] != len(items) or report["coverage"] != 1.0 or decided != len(items):
+                failures.append(f"{tier}: {report['items']}/{len(items)}개 평가, coverage {report['coverage']}")
+            if sum(values["count"] for values in report["tiers"].values()) != len(items):
+                failures.append(f"{tier}: 단계별 지연 시간 개수 불일치 {report['tiers']}")
+            # 스트리밍은 JSON이 완성되면 끊으므로 prompt_tokens는 0일 수 있음
+            if "llm" in report["tiers"] and not report["llm"]["eval_tokens"]:
+                failures.append(f"{tier}: LLM을 호출했는데 토큰 수가 0 {report['llm']}")
+            if tier == "llm" and set(report["tiers"]) != {"llm"}:
+                failures.append(f"llm: LLM 외 단계가 사용됨 {set(report['tiers'])}")
+    return failures
+
+CHECKS = {
+    "pipeline": lambda args: check_pipeline(args.requests),
+    "eject": lambda args: check_eject(),
+    "hedge": lambda args: check_hedge(),
+    # 과부하 제어를 끄므로 마지막에 실행
+    "eval": lambda args: check_eval(),
+}
+
+async def main_async(args) -> bool:
+    ok = True
+    for name in args.only or CHECKS:
+        try:
+            failures = await CHECKS[name](args)
+        except Exception as e:
+            failures = [f"예외 발생: {e!r}"]
+        ok = ok and not failures
+        print(f"[{'통과' if not failures else '실패'}] {name}")
+        for failure in failures:
+            print(f"    {failure}")
+    return ok
+
+def main():
+    parser = argparse.ArgumentParser(description="가짜 Ollama 스모크 테스트")
+    parser.add_argument("--only", action="append", choices=list(CHECKS), help="이 검사만 실행 (여러 번 지정 가능)")
+    parser.add_argument("--requests", type=int, default=8, help="pipeline 검사에서 보낼 요청 수")
+    args = parser.parse_args()
+
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    if not asyncio.run(main_async(args)):
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
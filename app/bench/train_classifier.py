@@ -0,0 +1,85 @@
+"""
+경량 분류기 학습
+
+CHECK_FRAUD_VERDICT_LOG에 쌓인 LLM 판별 결과로 학습하고, 남겨둔 평가 데이터로 임계값별 판별 비율/오류 출력
+    python -m app.bench.train_classifier --log verdicts.jsonl --out classifier.npz
+학습한 모델은 CHECK_FRAUD_CLASSIFIER_PATH로 지정
+"""
+import json
+import random
+import argparse
+
+from app import CHECK_FRAUD_VERDICT_LOG, CHECK_FRAUD_CLASSIFIER_PATH
+from app.schemas.check_fraud import RISK_LEVELS
+from app.services.check_fraud_classifier import LinearModel, SAFE, RISK
+from app.services.check_fraud_features import np
+from app.services.check_fraud_text import normalize_message
+
+def load_verdict_log(path: str, min_confidence: float = 0.0) -> tuple[list[str], list[int]]:
+    """
+    판별 결과 기록을 (메시지 목록, 위험도 번호 목록)으로 변환
+    같은 메시지는 마지막 결과만 사용
+    """
+    samples: dict[str, int] = {}
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+                risk_level = RISK_LEVELS.index(record["risk_level"])
+                confidence = float(record.get("confidence", 1.0))
+                message = normalize_message(record["message"])
+            except (ValueError, KeyError, TypeError):
+                continue
+            if message and confidence >= min_confidence:
+                samples[message] = risk_level
+    return list(samples), list(samples.values())
+
+def main():
+    parser = argparse.ArgumentParser(description="경량 분류기 학습")
+    parser.add_argument("--log", default=CHECK_FRAUD_VERDICT_LOG, help="판별 결과 기록 (JSONL)")
+    parser.add_argument("--out", default=CHECK_FRAUD_CLASSIFIER_PATH or "classifier.npz")
+    parser.add_argument("--dim", type=int, default=2048, help="문자 n-gram 해싱 벡터 차원")
+    parser.add_argument("--epochs", type=int, default=500)
+    parser.add_argument("--lr", type=float, default=10.0)
+    parser.add_argument("--l2", type=float, default=1e-4)
+    parser.add_argument("--min-confidence", type=float, default=0.7, help="이 확신도 미만인 LLM 결과는 학습에서 제외")
+    parser.add_argument("--holdout", type=float, default=0.1, help="평가용으로 남겨둘 비율")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    if np is None:
+        parser.error("numpy가 필요합니다")
+    if not args.log:
+        parser.error("--log 또는 CHECK_FRAUD_VERDICT_LOG가 필요합니다")
+
+    texts, labels = load_verdict_log(args.log, args.min_confidence)
+    if not texts:
+        parser.error(f"학습할 데이터가 없습니다: {args.log}")
+    order = list(range(len(texts)))
+    random.Random(args.seed).shuffle(order)
+    n_eval = int(len(order) * args.holdout)
+    eval_idx, train_idx = order[:n_eval], order[n_eval:]
+
+    model = LinearModel.train(
+        [texts[i] for i in train_idx],
+        [labels[i] for i in train_idx],
+        dim=args.dim,
+        epochs=args.epochs,
+        lr=args.lr,
+        l2=args.l2
+    )
+    model.save(args.out)
+    print(f"학습 {len(train_idx)}개, 평가 {len(eval_idx)}개 -> {args.out}")
+
+    # 임계값별로 LLM 없이 판별하는 비율과 그중 LLM 결과와 다른 비율 출력
+    if eval_idx:
+        probs = model.predict_proba([texts[i] for i in eval_idx])
+        truth = np.asarray([labels[i] for i in eval_idx])
+        for threshold in (0.8, 0.9, 0.95, 0.97, 0.99):
+            decided = (probs[:, SAFE] >= threshold) | (probs[:, RISK] >= threshold)
+            predicted = np.where(probs[:, SAFE] >= threshold, SAFE, RISK)
+            errors = int((decided & (predicted != truth)).sum())
+            print(f"임계값 {threshold:.2f}: 바로 판별 {decided.mean():.1%}, 오류 {errors}/{int(decided.sum())}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,272 @@
+"""
+사기 탐지 오프라인 평가 (정확도, 처리량)
+
+정답이 있는 JSONL 코퍼스를 파이프라인(또는 단계 하나)에 통과시켜
+혼동 행렬, 위험도별 정밀도/재현율, 패턴별 재현율, 토큰/초, 전체 시간, 단계별 지연 시간 출력
+    python -m app.eval --corpus labeled.jsonl --concurrency 8
+    python -m app.eval --corpus labeled.jsonl --tier llm --json report.json --min-accuracy 0.8
+
+코퍼스 한 줄 형식 (patterns는 선택):
+    {"text": "메시지", "risk_level": "정상" or "주의" or "위험", "patterns": ["과도한 수익 보장"]}
+--corpus를 지정하지 않으면 프롬프트 예시(check_fraud_examples.DEFAULT_EXAMPLES)로 평가 (동작 확인용)
+가짜 Ollama로도 실행 가능 (OLLAMA_URL을 python -m app.bench.fake_ollama 주소로 설정)
+"""
+import sys
+import json
+import time
+import asyncio
+import logging
+import argparse
+import statistics
+import unicodedata
+from collections import Counter, defaultdict
+
+from app import CHECK_FRAUD_TIMEOUT, CHECK_FRAUD_WORKERS, CHECK_FRAUD_QUEUE_SIZE
+from app.schemas.check_fraud import RISK_LEVELS, ChatResponse
+from app.services.check_fraud import lookup_verdict, submit_check, analyze_message, start_processing
+from app.services.check_fraud_admission import CheckFraudAdmission
+from app.services.check_fraud_keyword import CheckFraudKeyword
+from app.services.check_fraud_classifier import CheckFraudClassifier
+from app.services.check_fraud_examples import DEFAULT_EXAMPLES
+from app.services.check_fraud_text import normalize_message
+from app.services.ollama_client import ollama_client
+from app.bench.load_test import percentile
+
+# 평가할 단계
+# pipeline: 캐시 -> 키워드 사전 -> 유사 메시지 -> 경량 분류기 -> LLM (API와 같은 경로)
+# keyword, classifier: 해당 단계만 (판별하지 못한 메시지는 "없음")
+# llm: 대기열/캐시 없이 메시지마다 LLM 호출 (프롬프트/모델 변경 비교용)
+TIERS = ("pipeline", "keyword", "classifier", "llm")
+NONE_LABEL = "없음"  # 결과가 없는 경우 (실패, 시간 초과, 단계에서 판별하지 못함)
+
+def load_corpus(path: str) -> list[dict]:
+    items = []
+    with open(path, encoding="utf-8") as f:
+        for lineno, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            record = json.loads(line)
+            risk_level = record.get("risk_level", record.get("expected"))
+            if risk_level not in RISK_LEVELS:
+                raise ValueError(f"{path}:{lineno} risk_level이 올바르지 않음: {risk_level!r}")
+            patterns = [pattern for pattern in record.get("patterns", []) if pattern]
+            items.append({"text": record["text"], "risk_level": risk_level, "patterns": patterns})
+    return items
+
+def default_corpus() -> list[dict]:
+    return [
+        {
+            "text": example["input"],
+            "risk_level": example["output"]["risk_level"],
+            "patterns": [pattern for pattern in example["output"]["detected_patterns"] if pattern],
+        }
+        for example in DEFAULT_EXAMPLES
+    ]
+
+async def check_one(text: str, tier: str, timeout: float) -> ChatResponse:
+    if tier == "keyword":
+        return ChatResponse(result=CheckFraudKeyword().check(normalize_message(text)), tier="keyword")
+    if tier == "classifier":
+        return ChatResponse(result=CheckFraudClassifier().classify(normalize_message(text)), tier="classifier")
+    if tier == "llm":
+        return ChatResponse(result=await analyze_message(text), tier="llm")
+
+    res = lookup_verdict(text)
+    if res is not None:
+        return res
+    job = submit_check(text, priority="background", timeout=timeout)
+    try:
+        return await job.wait(timeout)
+    except asyncio.TimeoutError:
+        return ChatResponse(result=None, tier="timeout")
+
+class Evaluation:
+    def __init__(self, items: list[dict], tier: str, concurrency: int, timeout: float):
+        self.items = items
+        self.tier = tier
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self.records: list[dict] = []
+
+    async def run(self) -> dict:
+        tasks = []
+        if self.tier in ("pipeline", "llm"):
+            ollama_client.start()
+        if self.tier == "pipeline":
+            # 정확도를 재는 것이 목적이므로 과부하 제어로 LLM을 건너뛰지 않음
+            CheckFraudAdmission().enabled = False
+            tasks = await start_processing()
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def one(item: dict):
+            async with semaphore:
+                started_at = time.perf_counter()
+                try:
+                    res = await check_one(item["text"], self.tier, self.timeout)
+                except Exception as e:
+                    logging.getLogger("app").error(f"평가 중 오류: {e!r}")
+                    res = ChatResponse(result=None, tier="error")
+                self.records.append({
+                    **item,
+                    "predicted": res.result.risk_level if res.result is not None else NONE_LABEL,
+                    "detected_patterns": res.result.detected_patterns if res.result is not None else [],
+                    "tier": res.tier or "none",
+                    "latency": time.perf_counter() - started_at,
+                })
+
+        tokens_before = ollama_client.eval_tokens
+        prompt_tokens_before = ollama_client.prompt_tokens
+        started_at = time.perf_counter()
+        try:
+            await asyncio.gather(*(one(item) for item in self.items))
+        finally:
+            wall = time.perf_counter() - started_at
+            for task in tasks:
+                task.cancel()
+            if self.tier in ("pipeline", "llm"):
+                await ollama_client.close()
+        return self.report(
+            wall,
+            ollama_client.eval_tokens - tokens_before,
+            ollama_client.prompt_tokens - prompt_tokens_before
+        )
+
+    def report(self, wall: float, eval_tokens: int, prompt_tokens: int) -> dict:
+        labels = list(RISK_LEVELS) + [NONE_LABEL]
+        confusion = {expected: {predicted: 0 for predicted in labels} for expected in RISK_LEVELS}
+        for record in self.records:
+            confusion[record["risk_level"]][record["predicted"]] += 1
+
+        total = len(self.records)
+        correct = sum(confusion[level][level] for level in RISK_LEVELS)
+        decided = sum(1 for record in self.records if record["predicted"] != NONE_LABEL)
+        per_class = {}
+        for level in RISK_LEVELS:
+            support = sum(confusion[level].values())
+            predicted = sum(confusion[expected][level] for expected in RISK_LEVELS)
+            per_class[level] = {
+                "support": support,
+                "precision": round(confusion[level][level] / predicted, 4) if predicted else None,
+                "recall": round(confusion[level][level] / support, 4) if support else None,
+            }
+
+        # 기대한 패턴이 detected_patterns에 그대로 포함된 비율
+        pattern_support = Counter()
+        pattern_found = Counter()
+        for record in self.records:
+            for pattern in record["patterns"]:
+                pattern_support[pattern] += 1
+                if pattern in record["detected_patterns"]:
+                    pattern_found[pattern] += 1
+        patterns = {
+            pattern: {"support": support, "recall": round(pattern_found[pattern] / support, 4)}
+            for pattern, support in pattern_support.most_common()
+        }
+
+        latencies = defaultdict(list)
+        for record in self.records:
+            latencies[record["tier"]].append(record["latency"])
+        tiers = {
+            tier: {
+                "count": len(values),
+                "latency_p50": round(percentile(values, 0.50), 4),
+                "latency_p95": round(percentile(values, 0.95), 4),
+                "latency_mean": round(statistics.fmean(values), 4),
+            }
+            for tier, values in sorted(latencies.items(), key=lambda item: -len(item[1]))
+        }
+
+        return {
+            "tier": self.tier,
+            "items": total,
+            "concurrency": self.concurrency,
+            "wall_time": round(wall, 3),
+            "throughput": round(total / wall, 3) if wall else 0.0,
+            "accuracy": round(correct / total, 4) if total else 0.0,
+            "coverage": round(decided / total, 4) if total else 0.0,
+            "confusion": confusion,
+            "per_class": per_class,
+            "patterns": patterns,
+            "tiers": tiers,
+            "llm": {
+                "prompt_tokens": prompt_tokens,
+                "eval_tokens": eval_tokens,
+                "tokens_per_second": round(eval_tokens / wall, 2) if wall else 0.0,
+            },
+        }
+
+def _width(text: str) -> int:
+    # 한글은 터미널에서 두 칸을 차지
+    return sum(2 if unicodedata.east_asian_width(ch) in ("W", "F") else 1 for ch in text)
+
+def _ljust(text: str, width: int) -> str:
+    return text + " " * max(0, width - _width(text))
+
+def _rjust(text: str, width: int) -> str:
+    return " " * max(0, width - _width(text)) + text
+
+def print_report(report: dict):
+    labels = list(RISK_LEVELS) + [NONE_LABEL]
+    print(f"단계: {report['tier']}  메시지: {report['items']}  동시 처리: {report['concurrency']}")
+    print(f"정확도: {report['accuracy']:.1%}  판별 비율: {report['coverage']:.1%}")
+    print(f"전체 시간: {report['wall_time']:.2f}초  처리량: {report['throughput']:.2f}개/초  "
+          f"생성 토큰: {report['llm']['eval_tokens']} ({report['llm']['tokens_per_second']:.1f}토큰/초)")
+
+    print("\n혼동 행렬 (행: 정답, 열: 예측)")
+    print(_ljust("정답\\예측", 12) + "".join(_rjust(label, 8) for label in labels))
+    for expected, row in report["confusion"].items():
+        print(_ljust(expected, 12) + "".join(_rjust(str(row[label]), 8) for label in labels))
+
+    print("\n위험도별")
+    for level, values in report["per_class"].items():
+        precision = "-" if values["precision"] is None else f"{values['precision']:.1%}"
+        recall = "-" if values["recall"] is None else f"{values['recall']:.1%}"
+        print(f"  {level}: 정밀도 {precision}, 재현율 {recall} ({values['support']}개)")
+
+    if report["patterns"]:
+        print("\n패턴별 재현율")
+        for pattern, values in report["patterns"].items():
+            print(f"  {pattern}: {values['recall']:.1%} ({values['support']}개)")
+
+    print("\n단계별 지연 시간")
+    for tier, values in report["tiers"].items():
+        print(f"  {tier}: {values['count']}개, p50 {values['latency_p50']:.3f}초, "
+              f"p95 {values['latency_p95']:.3f}초, 평균 {values['latency_mean']:.3f}초")
+
+def main():
+    parser = argparse.ArgumentParser(description="사기 탐지 오프라인 평가")
+    parser.add_argument("--corpus", default=None, help="정답이 있는 JSONL 파일 (없으면 프롬프트 예시 사용)")
+    parser.add_argument("--tier", choices=TIERS, default="pipeline", help="평가할 단계")
+    parser.add_argument("--concurrency", type=int, default=CHECK_FRAUD_WORKERS or 1, help="동시에 검사하는 메시지 수")
+    parser.add_argument("--timeout", type=float, default=CHECK_FRAUD_TIMEOUT, help="메시지 한 개의 제한 시간 (초, pipeline)")
+    parser.add_argument("--limit", type=int, default=None, help="앞에서부터 이 개수만 평가")
+    parser.add_argument("--json", default=None, help="결과를 JSON으로 저장할 경로")
+    parser.add_argument("--min-accuracy", type=float, default=None, help="정확도가 이 값보다 낮으면 종료 코드 1 (CI용)")
+    args = parser.parse_args()
+
+    items = load_corpus(args.corpus) if args.corpus else default_corpus()
+    if args.limit is not None:
+        items = items[:args.limit]
+    if not items:
+        parser.error("평가할 메시지가 없습니다")
+    if args.tier == "classifier" and CheckFraudClassifier().model is None:
+        parser.error("CHECK_FRAUD_CLASSIFIER_PATH에 경량 분류기 모델이 필요합니다")
+    # pipeline은 대기열이 가득 차지 않도록 동시 처리 수 제한
+    concurrency = max(1, args.concurrency)
+    if args.tier == "pipeline":
+        concurrency = min(concurrency, CHECK_FRAUD_QUEUE_SIZE)
+
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    report = asyncio.run(Evaluation(items, args.tier, concurrency, args.timeout).run())
+    print_report(report)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+    if args.min_accuracy is not None and report["accuracy"] < args.min_accuracy:
+        print(f"\n정확도 {report['accuracy']:.1%} < 기준 {args.min_accuracy:.1%}", file=sys.stderr)
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -2,7 +2,62 @@ class Config(object):
     # Setting
     WEB_HOST = 'localhost'
     WEB_PORT = 5000
+    WEB_WORKERS = 1  # uvicorn 워커 프로세스 수 (2 이상이면 reload 없이 실행, CHECK_FRAUD_BACKEND를 공유 대기열로 설정)
 
     # Ollama
     OLLAMA_URL = 'http://localhost:11434'
-    OLLAMA_MODEL = 'gemma3:4b'
\ No newline at end of file
+    OLLAMA_URLS = []  # 여러 Ollama 서버 사용 시 주소 목록 (비어 있으면 OLLAMA_URL만 사용)
+    OLLAMA_MODEL = 'gemma3:4b'
+    OLLAMA_STREAM = True  # 스트리밍으로 받아 JSON이 완성되면 바로 생성 중단
+    OLLAMA_OPTIONS = {}  # 모델 옵션 (예: {"temperature": 0})
+    OLLAMA_KEEP_ALIVE = '30m'  # 모델을 메모리에 유지하는 시간
+    OLLAMA_WARMUP = True  # 시작 시 모델 예열, 주기적으로 keep_alive 갱신 (예열 전에는 /health/ready가 503)
+    OLLAMA_WARMUP_TIMEOUT = 120  # 예열(모델 불러오기 포함) 제한 시간 (초)
+    OLLAMA_MODEL_CHECK_INTERVAL = 60  # 모델이 메모리에 있는지 확인하는 주기 (초, OLLAMA_KEEP_ALIVE보다 짧게)
+    OLLAMA_CONNECT_TIMEOUT = 5  # 연결 제한 시간 (초)
+    OLLAMA_READ_TIMEOUT = 30  # 응답(토큰) 사이 대기 제한 시간 (초)
+    OLLAMA_TOTAL_TIMEOUT = 60  # 요청 한 번의 전체 제한 시간 (초)
+    OLLAMA_MAX_CONNECTIONS = 10  # 서버별 커넥션 풀 크기
+    OLLAMA_HEALTH_INTERVAL = 10  # 서버 헬스 체크(/api/tags) 주기 (초)
+    OLLAMA_CIRCUIT_FAILURES = 3  # 연속 실패 시 서킷을 여는 횟수
+    OLLAMA_CIRCUIT_RESET = 30  # 서킷 열림/느린 서버 제외 유지 시간 (초)
+    OLLAMA_SLOW_FACTOR = 3.0  # 다른 서버 응답 시간 중앙값의 몇 배 이상이면 제외할지
+    OLLAMA_HEDGE_PERCENTILE = None  # 응답 시간이 이 백분위수(예: 0.95)를 넘으면 다른 서버에 중복 요청 (None이면 사용 안 함)
+
+    # Fraud check
+    CHECK_FRAUD_WORKERS = 2  # Ollama OLLAMA_NUM_PARALLEL 값에 맞춰 설정
+    CHECK_FRAUD_QUEUE_SIZE = 100  # 대기열이 가득 차면 503 응답
+    CHECK_FRAUD_ADMISSION = True  # 예상 대기 시간이 응답 제한 시간을 넘으면 대기열에 넣지 않고 바로 응답 (키워드 사전 결과 또는 503)
+    CHECK_FRAUD_ADMISSION_MARGIN = 0.8  # 응답 제한 시간 중 대기에 쓸 수 있는 비율
+    CHECK_FRAUD_BACKEND = 'local'  # 대기열 종류: 'local'(프로세스 내부), 'redis', 'sqlite' (여러 프로세스가 공유)
+    CHECK_FRAUD_BACKEND_URL = ''  # redis: 'redis://localhost:6379/0', sqlite: DB 파일 경로
+    CHECK_FRAUD_BACKEND_PREFIX = 'check_fraud'  # redis 키 접두사
+    CHECK_FRAUD_BACKEND_POLL = 0.02  # 공유 대기열 확인 주기 (초, sqlite 및 redis 배치 수집)
+    CHECK_FRAUD_JOURNAL_DIR = ''  # 대기열 저널 디렉터리 (재시작 시 대기 중이던 작업 복구, 비어 있으면 사용 안 함, local 대기열만)
+    CHECK_FRAUD_JOURNAL_FLUSH = 0.05  # 저널을 모아서 디스크에 기록(fsync)하는 주기 (초)
+    CHECK_FRAUD_JOURNAL_SEGMENT_SIZE = 4 * 1024 * 1024  # 저널 세그먼트 크기 (넘으면 남은 작업만 새 세그먼트로 옮김)
+    CHECK_FRAUD_TIMEOUT = 20  # 응답 대기 최대 시간 (초)
+    CHECK_FRAUD_BATCH_SIZE = 4  # 한 번의 LLM 호출로 분석할 최대 메시지 수 (1이면 배치 사용 안 함)
+    CHECK_FRAUD_BATCH_WAIT = 0.02  # 배치를 채우기 위해 기다리는 최대 시간 (초)
+    CHECK_FRAUD_LIVE_DEBOUNCE = 0.3  # 실시간 입력 검사에서 입력이 멈춘 뒤 검사하기까지 대기 시간 (초)
+    CHECK_FRAUD_RESULT_SIZE = 1000  # 응답 제한 시간이 지난 뒤 도착한 결과를 보관하는 최대 개수 (job_id로 조회)
+    CHECK_FRAUD_RESULT_TTL = 300  # 늦게 도착한 결과 보관 시간 (초)
+    CHECK_FRAUD_CACHE_SIZE = 10000  # 결과 캐시 최대 개수 (0이면 캐시 사용 안 함)
+    CHECK_FRAUD_CACHE_TTL = 600  # 결과 캐시 유지 시간 (초)
+    CHECK_FRAUD_CONVERSATION_SIZE = 1000  # 기록을 유지하는 최대 대화 수 (conversation_id)
+    CHECK_FRAUD_CONVERSATION_TTL = 1800  # 이 시간 동안 메시지가 없는 대화는 기록 삭제 (초)
+    CHECK_FRAUD_CONVERSATION_TURNS = 10  # 대화별로 프롬프트에 포함하는 최근 메시지 수
+    CHECK_FRAUD_CONVERSATION_TOKENS = 2000000  # 모든 대화의 Ollama context 토큰 합계 상한 (넘으면 오래된 대화부터 제거, 토큰당 4바이트)
+    CHECK_FRAUD_KEYWORD_LEXICON = None  # 키워드 사전 (None이면 기본 사전 사용, 형식은 check_fraud_keyword.DEFAULT_LEXICON 참고)
+    CHECK_FRAUD_KEYWORD_MIN_CONFIDENCE = 0.9  # 이 확신도 이상인 키워드만 LLM 없이 바로 판별
+    CHECK_FRAUD_FEWSHOT_EXAMPLES = None  # 프롬프트 예시 목록 (None이면 기본 예시 사용, 형식은 check_fraud_examples.DEFAULT_EXAMPLES 참고)
+    CHECK_FRAUD_FEWSHOT_K = 6  # 메시지와 비슷한 예시를 최대 몇 개 넣을지 (0이면 모든 예시 사용)
+    CHECK_FRAUD_FEWSHOT_TOKENS = 800  # 프롬프트에 넣는 예시의 최대 토큰 수 (대략적인 추정치)
+    CHECK_FRAUD_SIMILAR_SIZE = 2000  # 유사 메시지 인덱스 최대 개수 (0이면 사용 안 함, numpy 필요)
+    CHECK_FRAUD_SIMILAR_DIM = 2048  # 문자 n-gram 해싱 벡터 차원
+    CHECK_FRAUD_SIMILAR_THRESHOLD = 0.9  # 이 코사인 유사도 이상이면 이전 결과 재사용
+    CHECK_FRAUD_SIMILAR_MIN_CONFIDENCE = 0.85  # 이 확신도 이상인 LLM 결과만 인덱스에 추가
+    CHECK_FRAUD_VERDICT_LOG = ''  # LLM 판별 결과를 기록할 JSONL 파일 (경량 분류기 학습용, 비어 있으면 기록 안 함)
+    CHECK_FRAUD_CLASSIFIER_PATH = ''  # 경량 분류기 모델(.npz) 경로 (비어 있으면 사용 안 함, numpy 필요)
+    CHECK_FRAUD_CLASSIFIER_SAFE_THRESHOLD = 0.97  # 정상 확률이 이 값 이상이면 LLM 없이 정상으로 판별
+    CHECK_FRAUD_CLASSIFIER_RISK_THRESHOLD = 0.97  # 위험 확률이 이 값 이상이면 LLM 없이 위험으로 판별
\ No newline at end of file
@@ -1,14 +1,46 @@
-from pydantic import BaseModel
+from typing import Literal
+from pydantic import BaseModel, Field
+
+RISK_LEVELS = ("정상", "주의", "위험")
+RECOMMENDED_ACTIONS = ("전송 전 확인", "전송 중단 권고", "없음")
 
 class ChatRequest(BaseModel):
     message: str
+    priority: Literal["interactive", "background"] = "interactive"  # 키보드 전송 전 확인 / 재검사
+    conversation_id: str | None = Field(default=None, max_length=128)  # 같은 대화의 이전 메시지를 함께 고려해 분석
 
 class LLMResponse(BaseModel):
-    risk_level: str  # "정상", "주의", "위험"
-    confidence: float  # 0.0 ~ 1.0
+    risk_level: Literal["정상", "주의", "위험"]
+    confidence: float = Field(ge=0.0, le=1.0)  # 0.0 ~ 1.0
     detected_patterns: list[str]  # 사기 패턴 리스트
     explanation: str  # 사용자에게 제공할 간단한 설명 (최대 50자)
-    recommended_action: str  # "전송 전 확인", "전송 중단 권고", "없음"
+    recommended_action: Literal["전송 전 확인", "전송 중단 권고", "없음"]
+
+class BatchChatRequest(BaseModel):
+    messages: list[str] = Field(..., min_length=1, max_length=100)  # 검사할 메시지 목록 (최대 100개)
+    priority: Literal["interactive", "background"] = "background"
+    stream: bool = False  # True면 끝나는 순서대로 NDJSON으로 응답
 
 class ChatResponse(BaseModel):
-    result: LLMResponse | None = None
\ No newline at end of file
+    result: LLMResponse | None = None
+    tier: str | None = None  # 결과를 만든 단계: "cache", "keyword", "similar", "classifier", "llm", "degraded"(과부하로 결과 없음)
+    job_id: str | None = None  # 제한 시간 안에 결과가 나오지 않은 경우 나중에 결과를 조회할 작업 ID
+    degraded: bool = False  # 과부하로 LLM 대신 간단한 검사 결과를 전달한 경우 True
+
+class LiveCheckRequest(BaseModel):
+    message: str  # 입력 중인 초안
+    id: int | None = None  # 초안 번호 (없으면 서버에서 순서대로 부여)
+
+class LiveCheckResponse(ChatResponse):
+    type: Literal["verdict", "risk_level"] = "verdict"
+    id: int  # 초안 번호
+    message: str
+    risk_level: str | None = None  # type이 "risk_level"인 경우 먼저 확인된 위험도
+    provisional: bool = False  # 최종 결과 전 임시 결과 여부
+
+class BatchChatItem(ChatResponse):
+    index: int  # 요청 messages에서의 위치
+    message: str
+
+class BatchChatResponse(BaseModel):
+    results: list[BatchChatItem]  # 요청 messages와 같은 순서
\ No newline at end of file
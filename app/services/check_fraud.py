@@ -1,19 +1,27 @@
-import re
-import json
-import httpx
 import asyncio
-
-from .check_fraud_queue import CheckFraudQueue
-from .check_fraud_result_dict import CheckFraudResultDict
-from app.schemas.check_fraud import LLMResponse
-
-from app import OLLAMA_URL, OLLAMA_MODEL
-
-find_res = re.compile(r'({\n?\s*"risk_level":\s?"(정상|주의|위험)",\n?\s*"confidence":\s?((\d|\.)+),\n?\s+"detected_patterns":\s?(\[.*\]),\n?\s*"explanation":\s?"(.*)",\n?\s*"recommended_action":\s?"(.*)"\n?})')
-
-async def request_ollama(original_text: str):
-    async with httpx.AsyncClient() as client:
-        prompt = f"""You are an AI expert specializing in detecting financial fraud, investment scams, and phishing within Korean messaging conversations. Your purpose is to analyze conversational context and identify genuine patterns of manipulation and deception. Be accurate and balanced - do not over-classify normal conversations as suspicious. AND PLEASE think step by step before concluding your analysis.  
+from functools import lru_cache
+from typing import Callable
+
+from .check_fraud_queue import CheckFraudQueue, CheckFraudJob, PRIORITIES, job_key
+from .check_fraud_backend import RemoteQueue, RemoteJob, get_queue
+from .check_fraud_inflight import CheckFraudInflightDict
+from .check_fraud_cache import CheckFraudCache
+from .check_fraud_result import CheckFraudResultStore
+from .check_fraud_admission import CheckFraudAdmission
+from .check_fraud_keyword import CheckFraudKeyword
+from .check_fraud_similar import CheckFraudSimilarIndex
+from .check_fraud_classifier import CheckFraudClassifier, CheckFraudVerdictLog
+from .check_fraud_examples import CheckFraudExamples
+from .check_fraud_conversation import CheckFraudConversations, Conversation
+from .check_fraud_text import normalize_message
+from .check_fraud_parse import VERDICT_SCHEMA, batch_schema, parse_verdict, parse_verdicts
+from .ollama_client import ollama_client
+from . import metrics
+from app.schemas.check_fraud import LLMResponse, ChatResponse
+
+from app import LOGGER, CHECK_FRAUD_WORKERS, CHECK_FRAUD_TIMEOUT, CHECK_FRAUD_BATCH_SIZE, CHECK_FRAUD_BATCH_WAIT
+
+PROMPT_INSTRUCTIONS = """You are an AI expert specializing in detecting financial fraud, investment scams, and phishing within Korean messaging conversations. Your purpose is to analyze conversational context and identify genuine patterns of manipulation and deception. Be accurate and balanced - do not over-classify normal conversations as suspicious. AND PLEASE think step by step before concluding your analysis.  
 
             
 CRITICAL: Analyze ONLY the message provided in the ANALYSIS SECTION below. Do NOT confuse it with the examples.
@@ -27,146 +35,487 @@ Consider context and common sense - not every mention of money or urgency is a s
 Be precise with confidence scores based on actual evidence
 
 The JSON object must conform to the following schema:
-{{
+{
   "risk_level": "string", // Must be one of: "정상", "주의", "위험"
   "confidence": "float", // A value between 0.0 and 1.0 indicating the confidence of the risk_level assessment.
   "detected_patterns": "array[string]", // A list of detected scam patterns. Examples: "과도한 수익 보장", "긴급한 입금 요구", "개인정보 요구", "비공개 정보 언급", "의심스러운 링크"
   "explanation": "string", // A brief, clear explanation in Korean for the user (max 50 characters).
   "recommended_action": "string" // Must be one of: "전송 전 확인", "전송 중단 권고", "없음"
-}}
-===== TRAINING EXAMPLES (DO NOT ANALYZE THESE) =====
-
-Example A - ACTUAL SCAM (주의):
-Input: "혹시 말씀해주신 계좌로 새 상품 재주문하고 기존 제품에 대한 비용을 환불해주신다는 거죠?"
-Output: {{"risk_level": "주의", "confidence": 0.75, "detected_patterns": ["환불 요구"], "explanation": "환불을 요구할 경우 사기일 가능성이 있어 주의해야 합니다.", "recommended_action": "전송 중단 권고"}}
-
-Example B - NORMAL FOOD QUESTION (정상):
-Input: "내일 학식 뭐야?"
-Output: {{"risk_level": "정상", "confidence": 0.99, "detected_patterns": [], "explanation": "학교 급식에 대한 일상적인 질문입니다.", "recommended_action": "없음"}}
-
-Example C - NORMAL GAME (정상):
-Input: "롤이나 하자"
-Output: {{"risk_level": "정상", "confidence": 0.99, "detected_patterns": [], "explanation": "게임 제안으로 정상적인 대화입니다.", "recommended_action": "없음"}}
-
-Example D - INVESTMENT SCAM (위험):
-Input: "수익률이 200% 라구요?"
-Output: {{"risk_level": "위험", "confidence": 0.98, "detected_patterns": ["과도한 수익 보장"], "explanation": "비현실적인 수익률을 제안하는 사기 수법에 노출된 상태일 가능성이 높습니다.", "recommended_action": "전송 중단 권고"}}
-
-Example E - NORMAL MESSENGER (주의):
-Input: "무슨 부탁인데?"
-Output: {{"risk_level": "주의", "confidence": 0.75, "detected_patterns": [""], "explanation": "일상적인 대화지만 갑작스런 금전 부탁인 경우 주의가 필요합니다.", "recommended_action": "없음"}}
-
-Example F - MONEY REQUEST (주의):
-Input: "얼마 보내면 돼요?"
-Output: {{"risk_level": "주의", "confidence": 0.75, "detected_patterns": ["직접적인 금전 요구"], "explanation": "직접적인 금전 요구는 사기일 가능성이 높으나 일상 대화일수도 있음.", "recommended_action": "전송 중단 권고"}}
-
-Example G - PERSONAL INFO (위험):
-Input: "카드 정보/인증서만 입력하면 되죠?"
-Output: {{"risk_level": "위험", "confidence": 0.90, "detected_patterns": ["개인 금융 정보 요구"], "explanation": "금융 정보 입력 요구는 매우 위험합니다.", "recommended_action": "전송 중단 권고"}}
-
-Example H - PSYCHOLOGICAL PRESSURE (주의):
-Input: "이거 진짜 맞는 거지?"
-Output: {{"risk_level": "주의", "confidence": 0.83, "detected_patterns": ["심리적 압박"], "explanation": "의심이 든다면 즉시 대화를 중단하세요.", "recommended_action": "전송 중단 권고"}}
+}
+"""
 
-Example I - TRANSFER URGENCY (주의):
-Input: "지금 바로 이체하라고?"
-Output: {{"risk_level": "위험", "confidence": 0.92, "detected_patterns": ["송금 재촉"], "explanation": "급한 송금 요구는 사기의 전형적인 수법입니다.", "recommended_action": "전송 중단 권고"}}
+@lru_cache(maxsize=256)
+def prompt_header(indices: tuple[int, ...]) -> str:
+    """
+    지시문 + 선택한 예시로 프롬프트 앞부분 생성 (같은 예시 조합은 한 번만 생성)
+    """
+    return (
+        PROMPT_INSTRUCTIONS
+        + "===== TRAINING EXAMPLES (DO NOT ANALYZE THESE) =====\n\n"
+        + CheckFraudExamples().render(indices)
+        + "===== END OF EXAMPLES =====\n\n"
+    )
+
+def build_prompt(original_text: str) -> str:
+    """
+    메시지 한 개 분석용 프롬프트 생성 (메시지와 비슷한 예시만 포함)
+    """
+    return prompt_header(CheckFraudExamples().select([original_text])) + f"""===== ACTUAL ANALYSIS TASK =====
 
-Example I - TRANSFER MONEY (위험):
-Input: "너만 믿고 넣는다"
-Output: {{"risk_level": "위험", "confidence": 0.85, "detected_patterns": ["과도한 신용"], "explanation": "상대방에 대한 과도한 신뢰는 사기의 위험 요소입니다.", "recommended_action": "전송 중단 권고"}}
+IMPORTANT: Analyze ONLY this message below. Ignore all examples above.
 
-Example J - ACCOUNT ABUSE (위험):
-Input: "대포통장"
-Output: {{"risk_level": "위험", "confidence": 0.99, "detected_patterns": ["대포통장 언급"], "explanation": "대포통장은 불법 금융거래에 사용됩니다.", "recommended_action": "전송 중단 권고"}}
+Current Message to Analyze:
+"{original_text}"
 
-Example K - PERSONAL INFO LEAK (위험):
-Input: "개인정보유출"
-Output: {{"risk_level": "위험", "confidence": 0.95, "detected_patterns": ["개인정보 유출"], "explanation": "개인정보 유출은 매우 심각한 보안 위험입니다.", "recommended_action": "전송 중단 권고"}}
+Analyze the above message and provide accurate JSON output based on its actual content.
+"""
 
-Example L - STRANGER CONTACT (주의):
-Input: "모르는 사람"
-Output: {{"risk_level": "주의", "confidence": 0.70, "detected_patterns": ["신원 미확인"], "explanation": "모르는 사람과의 거래는 주의가 필요합니다.", "recommended_action": "전송 전 확인"}}
+def build_batch_prompt(original_texts: list[str]) -> str:
+    """
+    메시지 여러 개를 한 번에 분석하는 프롬프트 생성
+    예시 부분(prompt_header)을 공유하므로 메시지마다 다시 prefill하지 않아도 됨
+    """
+    messages = "\n".join(f'{i}. "{text}"' for i, text in enumerate(original_texts, 1))
+    return prompt_header(CheckFraudExamples().select(original_texts)) + f"""===== ACTUAL ANALYSIS TASK =====
 
-Example M - LOAN OFFER (주의):
-Input: "대출이 가능한거에요?"
-Output: {{"risk_level": "주의", "confidence": 0.80, "detected_patterns": ["대출 제안"], "explanation": "대출 제안은 사기일 가능성을 확인해야 합니다.", "recommended_action": "전송 전 확인"}}
+IMPORTANT: Analyze ONLY the numbered messages below. Ignore all examples above. Analyze each message independently.
 
-Example N - SUSPICIOUS LINK (위험):
-Input: "링크에 들어가라고요?"
-Output: {{"risk_level": "위험", "confidence": 0.90, "detected_patterns": ["의심스러운 링크"], "explanation": "모르는 링크 접속 요구는 피싱 시도일 수 있습니다.", "recommended_action": "전송 중단 권고"}}
+Messages to Analyze:
+{messages}
 
-Example O - ACCOUNT ABUSE (위험):
-Input: "대리결제"
-Output: {{"risk_level": "위험", "confidence": 0.99, "detected_patterns": ["대리결제 언급"], "explanation": "대리결제는 사기 가능성이 있습니다.", "recommended_action": "전송 중단 권고"}}
+For this task, your output MUST be a single, valid JSON array of exactly {len(original_texts)} JSON objects instead of a single object.
+The N-th object is the analysis of the N-th message and must conform to the schema above. Do not include any text before or after the array.
+"""
 
-Example P - ILLEGAL LEADING GROUP (위험):
-Input: "오늘 리딩 너무 좋네요"
-Output: {{"risk_level": "위험", "confidence": 0.95, "detected_patterns": ["불법 리딩방 경고"], "explanation": "불법 리딩방이 의심됩니다", "recommended_action": "전송 중단 권고"}}
+def build_conversation_prompt(history: list[str], original_text: str) -> str:
+    """
+    대화 중 메시지 분석용 프롬프트 생성 (이전 메시지를 함께 전달)
+    """
+    earlier = "\n".join(f'{i}. "{text}"' for i, text in enumerate(history, 1)) or "(none)"
+    return prompt_header(CheckFraudExamples().select(history + [original_text])) + f"""===== ACTUAL ANALYSIS TASK =====
 
-Example Q - ILLEGAL LEADING GROUP (위험):
-Input: "믿음은 곧 수익입니다."
-Output: {{"risk_level": "위험", "confidence": 0.83, "detected_patterns": ["불법 리딩방 경고", "과도한 믿음"], "explanation": "불법 리딩방이 의심됩니다", "recommended_action": "전송 중단 권고"}}
+IMPORTANT: Analyze ONLY the current message below. Ignore all examples above.
+The earlier messages of the same conversation are given only as context. Use them to detect multi-turn scams (e.g. building trust first, then asking for an urgent transfer).
 
-Example R - ILLEGAL LEADING GROUP (위험):
-Input: "님만 믿습니다!! 가즈아~!!!"
-Output: {{"risk_level": "주의", "confidence": 0.73, "detected_patterns": ["불법 리딩방 주의", "과도한 믿음"], "explanation": "불법 리딩방이 의심됩니다", "recommended_action": "전송 중단 권고"}}
+Earlier Messages in This Conversation:
+{earlier}
 
-===== END OF EXAMPLES =====
+Current Message to Analyze:
+"{original_text}"
 
-===== ACTUAL ANALYSIS TASK =====
+Analyze the current message in the context of the conversation and provide accurate JSON output.
+"""
 
-IMPORTANT: Analyze ONLY this message below. Ignore all examples above.
+def build_followup_prompt(pending: list[str], original_text: str) -> str:
+    """
+    이전 응답의 context에 이어서 보낼 프롬프트 (새 메시지만 포함)
+    """
+    earlier = ""
+    if pending:
+        earlier = "Messages Sent Since the Last Analysis:\n" + "\n".join(f'- "{text}"' for text in pending) + "\n\n"
+    return f"""===== NEXT MESSAGE IN THE SAME CONVERSATION =====
 
-Current Message to Analyze:
+{earlier}Current Message to Analyze:
 "{original_text}"
 
-Analyze the above message and provide accurate JSON output based on its actual content.
+Analyze ONLY this message, in the context of the earlier messages of this conversation, and provide accurate JSON output.
 """
-        data = {
-            "model": OLLAMA_MODEL,
-            "prompt": prompt,
-            "stream": False
-        }
-
-        response = await client.post(f"{OLLAMA_URL}/api/generate", json=data, timeout=None)
-        return response.json()['response'].replace('\"', '"')
 
-async def process_queue(cfq: CheckFraudQueue, cfrd: CheckFraudResultDict):
+async def request_ollama(original_text: str, on_risk_level: Callable[[str], None] | None = None):
+    return await ollama_client.generate(build_prompt(original_text), format=VERDICT_SCHEMA, on_risk_level=on_risk_level)
+
+async def request_ollama_batch(original_texts: list[str]):
+    return await ollama_client.generate(build_batch_prompt(original_texts), format=batch_schema(len(original_texts)))
+
+async def analyze_message(
+    original_text: str,
+    on_risk_level: Callable[[str], None] | None = None,
+    attempts: int = 3
+) -> LLMResponse | None:
+    """
+    메시지 한 개 분석, 실패 시 None
+    파싱/보정 후에도 검증에 실패한 경우에만 다시 생성 (최대 attempts번)
+    """
+    for attempt in range(attempts):
+        if attempt:
+            metrics.LLM_RETRIES.inc()
+        result = await request_ollama(original_text, on_risk_level=on_risk_level)
+        verdict = parse_verdict(result)
+        if verdict is not None:
+            return verdict
+        metrics.PARSE_FAILURES.inc(kind="single")
+        await asyncio.sleep(0.1)
+    return None
+
+async def analyze_batch(original_texts: list[str]) -> list[LLMResponse] | None:
+    """
+    메시지 여러 개를 한 번의 생성으로 분석
+    응답이 올바른 JSON 배열이 아니거나 개수가 맞지 않으면 None (개별 분석으로 대체)
+    """
+    result = await request_ollama_batch(original_texts)
+    verdicts = parse_verdicts(result, len(original_texts))
+    if verdicts is None:
+        metrics.PARSE_FAILURES.inc(kind="batch")
+    return verdicts
+
+async def analyze_conversation(conversation: Conversation, original_text: str) -> LLMResponse | None:
+    """
+    대화 중 메시지 한 개 분석, 실패 시 None
+    이전 응답의 context가 있으면 새 메시지만 prefill하고,
+    context에 포함된 메시지가 CHECK_FRAUD_CONVERSATION_TURNS개를 넘으면 최근 메시지로 프롬프트를 새로 만듦
+    """
+    store = CheckFraudConversations()
+    async with conversation.lock:
+        verdict = None
+        for attempt in range(3):  # Retry up to 3 times
+            if attempt:
+                metrics.LLM_RETRIES.inc()
+            reuse = (
+                conversation.context is not None
+                and conversation.context_turns + len(conversation.pending) < store.max_turns
+            )
+            if reuse:
+                store.context_reuses += 1
+                prompt = build_followup_prompt(conversation.pending, original_text)
+                context = conversation.context.tolist()
+            else:
+                store.rebuilds += 1
+                prompt = build_conversation_prompt(conversation.history(), original_text)
+                context = None
+            result, new_context, backend = await ollama_client.generate_context(
+                prompt,
+                context=context,
+                format=VERDICT_SCHEMA,
+                backend_url=conversation.backend
+            )
+            verdict = parse_verdict(result)
+            if verdict is not None:
+                break
+            metrics.PARSE_FAILURES.inc(kind="conversation")
+            await asyncio.sleep(0.1)
+
+        if verdict is None:
+            conversation.add_pending(original_text)
+            return None
+        if reuse:
+            conversation.context_turns += len(conversation.pending) + 1
+        else:
+            # 새로 만든 프롬프트에는 최근 메시지(pending 포함)가 모두 들어 있음
+            conversation.context_turns = len(conversation.turns) + 1
+        store.set_context(conversation, new_context)
+        conversation.backend = backend
+        conversation.pending.clear()
+        conversation.turns.append(original_text)
+        return verdict
+
+def lookup_conversation(conversation_id: str, original_text: str) -> ChatResponse | None:
+    """
+    대화 중 메시지는 이전 메시지에 따라 판단이 달라지므로
+    키워드 사전으로 위험이 확실한 경우만 바로 판별 (다음 분석에 포함되도록 기록)
+    """
+    matched = CheckFraudKeyword().check(normalize_message(original_text))
+    if matched is None or matched.risk_level != "위험":
+        return None
+    CheckFraudConversations().get(conversation_id).add_pending(original_text)
+    metrics.VERDICTS.inc(risk_level=matched.risk_level, tier="keyword")
+    return ChatResponse(result=matched, tier="keyword")
+
+def _lookup_exact(key: str) -> ChatResponse | None:
+    cached = CheckFraudCache().get(key)
+    if cached is not None:
+        metrics.VERDICTS.inc(risk_level=cached.risk_level, tier="cache")
+        return ChatResponse(result=cached, tier="cache")
+    matched = CheckFraudKeyword().check(key)
+    if matched is not None:
+        metrics.VERDICTS.inc(risk_level=matched.risk_level, tier="keyword")
+        return ChatResponse(result=matched, tier="keyword")
+    return None
+
+def _lookup_vectorized(keys: list[str]) -> list[ChatResponse | None]:
+    """
+    유사 메시지 -> 경량 분류기 순서로 여러 메시지를 한 번에 조회
+    """
+    results: list[ChatResponse | None] = [None] * len(keys)
+    for i, similar in enumerate(CheckFraudSimilarIndex().lookup_many(keys)):
+        if similar is not None:
+            metrics.VERDICTS.inc(risk_level=similar.risk_level, tier="similar")
+            results[i] = ChatResponse(result=similar, tier="similar")
+    rest = [i for i, res in enumerate(results) if res is None]
+    for i, classified in zip(rest, CheckFraudClassifier().classify_many([keys[i] for i in rest])):
+        if classified is not None:
+            metrics.VERDICTS.inc(risk_level=classified.risk_level, tier="classifier")
+            results[i] = ChatResponse(result=classified, tier="classifier")
+    return results
+
+def lookup_verdict(original_text: str) -> ChatResponse | None:
+    """
+    큐를 거치지 않고 바로 얻을 수 있는 결과 조회 (캐시 -> 키워드 사전 -> 유사 메시지 -> 경량 분류기)
+    """
+    key = normalize_message(original_text)
+    res = _lookup_exact(key)
+    if res is None:
+        res = _lookup_vectorized([key])[0]
+    return res
+
+def degraded_verdict(original_text: str) -> ChatResponse | None:
+    """
+    과부하로 LLM 분석을 받을 수 없을 때 대신 전달할 간단한 결과
+    확신도와 관계없이 키워드 사전에 걸리는 경우만 결과를 만들고, 없으면 None (거절로 집계)
+    """
+    matched = CheckFraudKeyword().match(normalize_message(original_text))
+    if matched is None:
+        CheckFraudAdmission().rejected += 1
+        return None
+    CheckFraudAdmission().degraded += 1
+    metrics.VERDICTS.inc(risk_level=matched.risk_level, tier="degraded")
+    return ChatResponse(result=matched, tier="keyword", degraded=True)
+
+def submit_check(
+    original_text: str,
+    priority: str = "interactive",
+    timeout: float = CHECK_FRAUD_TIMEOUT,
+    conversation_id: str | None = None
+) -> CheckFraudJob:
+    """
+    사기 탐지 작업 등록
+    동일한(정규화 기준) 메시지가 이미 처리 중이면 해당 작업에 합류
+    큐가 가득 찬 경우 asyncio.QueueFull,
+    예상 대기 시간이 timeout을 넘는 경우 CheckFraudOverloaded 발생
+    """
+    inflight = CheckFraudInflightDict()
+    job = inflight.get(job_key(original_text, conversation_id))
+    if job is None:
+        CheckFraudAdmission().check(get_queue().ahead(PRIORITIES[priority]), timeout)
+        job = CheckFraudJob(original_text, priority=priority, timeout=timeout, conversation_id=conversation_id)
+        get_queue().push(job)
+        CheckFraudAdmission().admit()
+        inflight.insert(job)
+    elif job.extend(priority, timeout):
+        # 더 높은 우선순위로 합류한 경우 앞쪽에 다시 삽입 (이전 항목은 큐에서 건너뜀)
+        get_queue().push(job)
+    return job
+
+def submit_batch(
+    original_texts: list[str],
+    priority: str = "background",
+    timeout: float = CHECK_FRAUD_TIMEOUT
+) -> tuple[dict[str, ChatResponse], dict[str, CheckFraudJob]]:
+    """
+    메시지 여러 개를 중복 제거 후 한 번에 등록
+    (정규화된 메시지 -> 바로 얻은 결과), (정규화된 메시지 -> 대기할 작업)으로 나눠서 반환
+    제한 시간 안에 끝나지 않을 것으로 예상되는 메시지는 큐에 넣지 않고 간단한 검사 결과(degraded)로 바로 반환
+    큐에 모두 넣을 수 없으면 아무것도 넣지 않고 asyncio.QueueFull 발생
+    """
+    inflight = CheckFraudInflightDict()
+    ready: dict[str, ChatResponse] = {}
+    jobs: dict[str, CheckFraudJob] = {}
+    new_jobs = []
+    promoted = []
+
+    # 캐시/키워드 확인 후 남은 메시지는 한 번의 행렬 곱으로 유사 메시지 검색/분류
+    misses: dict[str, str] = {}  # 정규화된 메시지 -> 원본 메시지
+    for original_text in original_texts:
+        key = normalize_message(original_text)
+        if key in ready or key in misses:
+            continue
+        res = _lookup_exact(key)
+        if res is not None:
+            ready[key] = res
+        else:
+            misses[key] = original_text
+    for (key, original_text), res in zip(list(misses.items()), _lookup_vectorized(list(misses))):
+        if res is not None:
+            ready[key] = res
+            del misses[key]
+
+    # 처리 중인 작업에 합류하는 메시지는 대기열에 영향이 없으므로 새 작업만 수락 여부 확인
+    cfq = get_queue()
+    new_count = sum(1 for key in misses if inflight.get(key) is None)
+    admitted = CheckFraudAdmission().capacity(cfq.ahead(PRIORITIES[priority]), timeout, new_count)
+    for key, original_text in misses.items():
+        job = inflight.get(key)
+        if job is None:
+            if len(new_jobs) >= admitted:
+                ready[key] = degraded_verdict(original_text) or ChatResponse(result=None, tier="degraded", degraded=True)
+                continue
+            job = CheckFraudJob(original_text, priority=priority, timeout=timeout)
+            new_jobs.append(job)
+        elif job.extend(priority, timeout):
+            promoted.append(job)
+        jobs[key] = job
+
+    cfq.push_many(new_jobs)
+    CheckFraudAdmission().admit(len(new_jobs))
+    for job in new_jobs:
+        inflight.insert(job)
+    for job in promoted:
+        try:
+            cfq.push(job)
+        except asyncio.QueueFull:
+            # 기존 우선순위로 이미 대기 중이므로 무시
+            pass
+    return ready, jobs
+
+def pop_late_result(job_id: str) -> ChatResponse | None:
+    """
+    제한 시간이 지난 뒤 도착한 결과 조회 (한 번만 조회 가능)
+    """
+    return CheckFraudResultStore().pop(job_id)
+
+def pipeline_stats() -> dict:
+    """
+    사기 탐지 파이프라인 상태 (대기열, 늦게 도착한 결과, 과부하 제어, 캐시, 키워드, 유사 메시지, 분류기, 단계별 판별 수, Ollama 서버)
+    """
+    cfq = get_queue()
+    queue_stats = {"depth": cfq.qsize(), "max_size": cfq.maxsize, "expired": cfq.expired}
+    if isinstance(cfq, RemoteQueue):
+        queue_stats.update(cfq.stats())
+    elif cfq.journal is not None:
+        queue_stats["journal"] = cfq.journal.stats()
+    return {
+        "queue": queue_stats,
+        "inflight": len(CheckFraudInflightDict()),
+        "results": CheckFraudResultStore().stats(),
+        "admission": CheckFraudAdmission().stats(),
+        "cache": CheckFraudCache().stats(),
+        "keyword": CheckFraudKeyword().stats(),
+        "similar": CheckFraudSimilarIndex().stats(),
+        "classifier": CheckFraudClassifier().stats(),
+        "conversation": CheckFraudConversations().stats(),
+        "fewshot": {**CheckFraudExamples().stats(), "cached_headers": prompt_header.cache_info().currsize},
+        "tiers": metrics.VERDICTS.totals("tier"),
+        "ollama": ollama_client.stats(),
+    }
+
+async def process_queue(cfq: CheckFraudQueue | RemoteQueue):
     while True:
-        original_text = cfq.pop()
-        if original_text is not None:
+        jobs = await cfq.pop_batch(CHECK_FRAUD_BATCH_SIZE, CHECK_FRAUD_BATCH_WAIT)
+        loop = asyncio.get_running_loop()
+        now = loop.time()
+        pending = []
+        conversations = []
+        for job in jobs:
+            metrics.QUEUE_WAIT.observe(now - job.enqueued_at)
+            if job.conversation_id is not None:
+                conversations.append(job)
+                continue
+            # 대기 중 다른 작업이 같은 메시지를 처리한 경우 캐시 사용
+            cached = CheckFraudCache().get(job.key)
+            if cached is not None:
+                metrics.VERDICTS.inc(risk_level=cached.risk_level, tier="cache")
+                job.set_result(ChatResponse(result=cached, tier="cache"))
+                continue
+            pending.append(job)
+
+        # 대화 중 메시지는 대화별 context를 이어가야 하므로 한 개씩 분석
+        # 공유 대기열의 작업은 같은 대화라도 여러 워커에 나뉘므로 작업에 담긴 이전 메시지로 프롬프트를 새로 만듦
+        for job in conversations:
+            if isinstance(job, RemoteJob):
+                conversation = Conversation.from_history(
+                    job.conversation_id,
+                    job.record.get("history", []),
+                    CheckFraudConversations().max_turns
+                )
+            else:
+                conversation = CheckFraudConversations().get(job.conversation_id)
+            CheckFraudAdmission().start(1)
+            started_at = loop.time()
             try:
-                status = "failed"
-                res = None
-                result_LLMResponse = None
-                for _ in range(3):  # Retry up to 3 times
-                    result = await request_ollama(original_text)
-                    res = find_res.findall(result)
-
-                    if res:
-                        status = "success"
-                        break
-                    await asyncio.sleep(0.1)
-
-                if status == "success":
-                    result_dict = json.loads(res[0][0])
-                    result_LLMResponse = LLMResponse(**result_dict)
-                else:
-                    result_LLMResponse = False
-
-                cfrd.insert(original_text, result_LLMResponse)
+                result_LLMResponse = await analyze_conversation(conversation, job.message)
             except Exception as e:
-                print(f"[ERROR] 큐 처리 중 오류 발생: {e}")
-                # 자세한 오류 출력
-                # import traceback
-                # traceback.print_exc()
-                # handle error (e.g., log or requeue)
-                pass
-        else:
-            await asyncio.sleep(0.1)  # wait before checking again
-
-async def start_processing():
-    """백그라운드 큐 처리 태스크 시작"""
-    task = asyncio.create_task(process_queue(CheckFraudQueue(), CheckFraudResultDict()))
-    return task
\ No newline at end of file
+                LOGGER.error(f"대화 분석 중 오류 발생: {e!r}", exc_info=True)
+                metrics.WORKER_ERRORS.inc()
+                result_LLMResponse = None
+            CheckFraudAdmission().record(loop.time() - started_at, 1)
+            metrics.VERDICTS.inc(
+                risk_level=result_LLMResponse.risk_level if result_LLMResponse is not None else "none",
+                tier="llm"
+            )
+            job.set_result(ChatResponse(result=result_LLMResponse, tier="llm"))
+        if not pending:
+            continue
+
+        results = None
+        CheckFraudAdmission().start(len(pending))
+        started_at = loop.time()
+        try:
+            # 여러 메시지를 한 번에 분석, 실패 시 개별 분석
+            if len(pending) > 1:
+                results = await analyze_batch([job.message for job in pending])
+                if results is None:
+                    metrics.BATCH_FALLBACKS.inc()
+            if results is None and len(pending) == 1:
+                results = [await analyze_message(pending[0].message, on_risk_level=pending[0].set_risk_level)]
+            elif results is None:
+                # 배치 응답이 잘못된 경우 한 워커가 모든 작업의 제한 시간을 넘기지 않도록
+                # 메시지마다 한 번만 생성하고, 기다리는 동안 제한 시간이 지난 작업은 건너뜀
+                results = []
+                for job in pending:
+                    if job.expired:
+                        results.append(None)
+                        continue
+                    results.append(await analyze_message(job.message, on_risk_level=job.set_risk_level, attempts=1))
+        except Exception as e:
+            LOGGER.error(f"큐 처리 중 오류 발생: {e!r}", exc_info=True)
+            metrics.WORKER_ERRORS.inc()
+            results = [None] * len(pending)
+        CheckFraudAdmission().record(loop.time() - started_at, len(pending))
+
+        # 대기 중인 요청에 바로 결과 전달 (실패 시 None)
+        for job, result_LLMResponse in zip(pending, results):
+            if result_LLMResponse is not None:
+                CheckFraudCache().insert(job.key, result_LLMResponse)
+                CheckFraudSimilarIndex().insert(job.key, result_LLMResponse)
+                CheckFraudVerdictLog().append(job.key, result_LLMResponse)
+            metrics.VERDICTS.inc(
+                risk_level=result_LLMResponse.risk_level if result_LLMResponse is not None else "none",
+                tier="llm"
+            )
+            job.set_result(ChatResponse(result=result_LLMResponse, tier="llm"))
+
+def _cache_hit_ratio() -> float:
+    return CheckFraudCache().stats()["hit_ratio"]
+
+metrics.QUEUE_DEPTH.set_function(lambda: get_queue().qsize())
+metrics.QUEUE_EXPIRED.set_function(lambda: get_queue().expired)
+metrics.INFLIGHT.set_function(lambda: len(CheckFraudInflightDict()))
+metrics.CACHE_HITS.set_function(lambda: CheckFraudCache().hits)
+metrics.CACHE_MISSES.set_function(lambda: CheckFraudCache().misses)
+metrics.CACHE_HIT_RATIO.set_function(_cache_hit_ratio)
+metrics.CACHE_SIZE.set_function(lambda: len(CheckFraudCache()))
+metrics.LATE_RESULTS.set_function(lambda: len(CheckFraudResultStore()))
+metrics.ORPHANED_RESULTS.set_function(lambda: CheckFraudResultStore().orphaned)
+metrics.ADMISSION_DECISIONS.set_function(lambda: {
+    ("admitted",): CheckFraudAdmission().admitted,
+    ("degraded",): CheckFraudAdmission().degraded,
+    ("rejected",): CheckFraudAdmission().rejected,
+})
+metrics.CONVERSATIONS.set_function(lambda: len(CheckFraudConversations()))
+metrics.CLASSIFIER_DECISIONS.set_function(lambda: {
+    ("safe",): CheckFraudClassifier().safe,
+    ("risk",): CheckFraudClassifier().risk,
+    ("uncertain",): CheckFraudClassifier().uncertain,
+})
+
+async def start_processing(workers: int = CHECK_FRAUD_WORKERS):
+    """
+    백그라운드 큐 처리 워커 태스크 시작 (workers 개)
+    공유 대기열을 사용하면 전송/결과 수신 태스크도 함께 시작 (workers가 0이면 API 전용 프로세스)
+    """
+    cfq = get_queue()
+    if isinstance(cfq, CheckFraudQueue) and cfq.journal is not None:
+        # 이전 실행에서 처리하지 못한 작업 복구 (같은 메시지로 다시 요청하면 합류)
+        restored = cfq.restore()
+        inflight = CheckFraudInflightDict()
+        for job in restored:
+            if inflight.get(job.key) is None:
+                inflight.insert(job)
+        if restored:
+            LOGGER.info(f"저널에서 사기 탐지 작업 {len(restored)}개 복구")
+    CheckFraudAdmission().concurrency = workers
+    tasks = [asyncio.create_task(process_queue(cfq)) for _ in range(workers)]
+    if isinstance(cfq, RemoteQueue):
+        tasks += cfq.start()
+    elif cfq.journal is not None:
+        tasks.append(cfq.journal.start())
+    return tasks
\ No newline at end of file
@@ -0,0 +1,145 @@
+import math
+import asyncio
+import threading
+
+from app import CHECK_FRAUD_ADMISSION, CHECK_FRAUD_ADMISSION_MARGIN, CHECK_FRAUD_WORKERS
+
+class CheckFraudOverloaded(asyncio.QueueFull):
+    """
+    예상 대기 시간이 요청의 제한 시간을 넘어 대기열에 넣지 않은 경우
+    (asyncio.QueueFull을 처리하는 기존 코드에서는 대기열이 가득 찬 경우와 같이 처리됨)
+    """
+    def __init__(self, predicted_wait: float, budget: float):
+        super().__init__(f"예상 대기 시간 {predicted_wait:.1f}초 > 제한 시간 {budget:.1f}초")
+        self.predicted_wait = predicted_wait
+        self.budget = budget
+
+    @property
+    def retry_after(self) -> int:
+        """
+        대기열이 예상 대기 시간만큼 줄어들 때까지의 시간 (Retry-After 헤더, 초)
+        """
+        return max(1, math.ceil(self.predicted_wait - self.budget))
+
+class CheckFraudAdmission:
+    """
+    LLM 처리 시간과 워커 수로 대기 시간을 예측해 제한 시간 안에 끝나지 않을 작업은 대기열에 넣지 않음
+    (과부하 시 모든 요청이 제한 시간까지 기다렸다가 null을 받는 대신 바로 응답)
+
+    예상 대기 시간 = (앞에 있는 작업 수 + 워커가 처리 중인 작업 수) / 처리량 + LLM 호출 한 번의 시간
+    처리량 = 워커 수 * 호출당 작업 수 / 호출 시간 (호출 시간은 지수 이동 평균)
+    호출 시간에는 Ollama 서버에서 기다린 시간도 포함되므로 워커 수가 Ollama 동시 처리 수보다 많아도 처리량은 맞게 추정됨
+    측정 전(배포 직후)에는 예측하지 않고 모두 허용 (대기열 최대 크기 CHECK_FRAUD_QUEUE_SIZE로만 제한)
+    이 프로세스의 워커가 처리한 작업으로만 추정하므로 공유 대기열의 API 전용 프로세스(workers=0)에서는 항상 허용
+    """
+    _instance = None
+    _lock = threading.Lock()
+
+    ALPHA = 0.2  # 지수 이동 평균 가중치
+    MIN_SAMPLES = 3  # 이만큼 측정한 뒤부터 예상 대기 시간 사용
+
+    def __new__(cls):
+        if cls._instance is None:
+            with cls._lock:
+                if cls._instance is None:
+                    cls._instance = super().__new__(cls)
+                    # 인스턴스 변수들을 여기서 직접 초기화
+                    cls._instance.enabled = CHECK_FRAUD_ADMISSION
+                    cls._instance.margin = CHECK_FRAUD_ADMISSION_MARGIN
+                    cls._instance.concurrency = CHECK_FRAUD_WORKERS  # start_processing에서 실제 워커 수로 설정
+                    cls._instance.call_seconds = 0.0  # LLM 호출 한 번의 시간
+                    cls._instance.jobs_per_call = 1.0  # 호출 한 번에 처리한 작업 수 (배치)
+                    cls._instance.samples = 0
+                    cls._instance.busy = 0  # 워커가 처리 중인 작업 수
+                    cls._instance.admitted = 0
+                    cls._instance.degraded = 0  # 간단한 검사 결과로 대신 응답
+                    cls._instance.rejected = 0  # 503 응답
+        return cls._instance
+
+    def __init__(self):
+        # __init__은 매번 호출될 수 있으므로 아무것도 하지 않음
+        pass
+
+    def start(self, jobs: int):
+        """
+        워커가 작업 jobs개 처리 시작
+        """
+        self.busy += jobs
+
+    def record(self, seconds: float, jobs: int):
+        """
+        워커가 작업 jobs개를 seconds초 동안 처리한 결과 반영
+        """
+        self.busy -= jobs
+        if jobs <= 0:
+            return
+        if self.samples == 0:
+            self.call_seconds = seconds
+            self.jobs_per_call = float(jobs)
+        else:
+            self.call_seconds += self.ALPHA * (seconds - self.call_seconds)
+            self.jobs_per_call += self.ALPHA * (jobs - self.jobs_per_call)
+        self.samples += 1
+
+    @property
+    def throughput(self) -> float:
+        """
+        초당 처리할 수 있는 작업 수 추정치 (측정 전에는 무한대)
+        """
+        if self.samples < self.MIN_SAMPLES or self.call_seconds <= 0 or self.concurrency <= 0:
+            return math.inf
+        return self.concurrency * self.jobs_per_call / self.call_seconds
+
+    def predict_wait(self, ahead: int) -> float:
+        """
+        대기열에서 앞에 작업이 ahead개 있을 때 새 작업의 결과가 나오기까지 예상 시간 (초)
+        측정 전에는 알 수 없으므로 0 (제한 시간 안에 끝나는 것으로 보고 허용)
+        """
+        throughput = self.throughput
+        if throughput == math.inf:
+            return 0.0
+        return (ahead + self.busy) / throughput + self.call_seconds
+
+    def check(self, ahead: int, budget: float):
+        """
+        예상 대기 시간이 budget * margin을 넘으면 CheckFraudOverloaded 발생
+        (대기열에 넣은 뒤 admit 호출)
+        """
+        if not self.enabled:
+            return
+        predicted_wait = self.predict_wait(ahead)
+        if predicted_wait > budget * self.margin:
+            raise CheckFraudOverloaded(predicted_wait, budget)
+
+    def capacity(self, ahead: int, budget: float, limit: int) -> int:
+        """
+        앞에 작업이 ahead개 있을 때 제한 시간 안에 끝날 것으로 예상되는 새 작업 수 (최대 limit개)
+        (대기열에 넣은 뒤 admit 호출)
+        """
+        if not self.enabled:
+            return limit
+        admitted = 0
+        while admitted < limit and self.predict_wait(ahead + admitted) <= budget * self.margin:
+            admitted += 1
+        return admitted
+
+    def admit(self, jobs: int = 1):
+        """
+        수락한 작업을 대기열에 넣은 뒤 집계 (대기열이 가득 차 넣지 못한 작업은 제외)
+        """
+        self.admitted += jobs
+
+    def stats(self) -> dict:
+        throughput = self.throughput
+        return {
+            "enabled": self.enabled,
+            "concurrency": self.concurrency,
+            "call_seconds": round(self.call_seconds, 3),
+            "jobs_per_call": round(self.jobs_per_call, 2),
+            "throughput": None if throughput == math.inf else round(throughput, 2),
+            "samples": self.samples,
+            "busy": self.busy,
+            "admitted": self.admitted,
+            "degraded": self.degraded,
+            "rejected": self.rejected,
+        }
@@ -0,0 +1,458 @@
+"""
+여러 프로세스(uvicorn workers, 별도 LLM 워커)가 함께 쓰는 사기 탐지 대기열
+
+API 프로세스는 작업을 공유 대기열에 넣고, 자기 응답 목록(reply_to)에서 결과를 받아 대기 중인 요청에 전달
+워커 프로세스는 공유 대기열에서 작업을 꺼내 처리한 뒤 결과를 작업의 reply_to로 보냄
+    CHECK_FRAUD_BACKEND = 'redis'   # Redis 호환 서버 (CHECK_FRAUD_BACKEND_URL = 'redis://localhost:6379/0')
+    CHECK_FRAUD_BACKEND = 'sqlite'  # 같은 서버의 프로세스끼리 SQLite 파일 공유 (CHECK_FRAUD_BACKEND_URL = 파일 경로)
+
+대화 중 메시지(conversation_id)는 등록한 프로세스가 대화 기록을 갖고 있고 작업에 이전 메시지를 담아 보냄
+워커는 매번 프롬프트를 새로 만들므로 Ollama context(KV 캐시)는 재사용하지 않음
+API 프로세스가 여러 개면 같은 대화의 요청이 같은 프로세스로 가도록 로드 밸런서에서 conversation_id 기준으로 고정해야 함
+"""
+import abc
+import json
+import time
+import uuid
+import asyncio
+import sqlite3
+import threading
+
+from app import (
+    LOGGER,
+    CHECK_FRAUD_BACKEND,
+    CHECK_FRAUD_BACKEND_URL,
+    CHECK_FRAUD_BACKEND_PREFIX,
+    CHECK_FRAUD_BACKEND_POLL,
+    CHECK_FRAUD_QUEUE_SIZE,
+    CHECK_FRAUD_TIMEOUT
+)
+from app.schemas.check_fraud import ChatResponse
+from .check_fraud_queue import CheckFraudQueue, CheckFraudJob, PRIORITIES, job_key
+from .check_fraud_result import CheckFraudResultStore
+from .check_fraud_cache import CheckFraudCache
+from .check_fraud_similar import CheckFraudSimilarIndex
+from .check_fraud_conversation import CheckFraudConversations
+from .redis_client import RedisConnection
+
+PRIORITY_NAMES = {value: name for name, value in PRIORITIES.items()}
+
+class RemoteJob:
+    """
+    워커 프로세스에서 처리하는 작업 (다른 프로세스가 등록한 CheckFraudJob)
+    set_result는 결과를 등록한 프로세스로 보냄
+    """
+    def __init__(self, queue: "RemoteQueue", record: dict):
+        loop = asyncio.get_running_loop()
+        self._queue = queue
+        self.record = record
+        self.id = record["id"]
+        self.message = record["message"]
+        self.conversation_id = record.get("conversation_id")
+        self.key = job_key(self.message, self.conversation_id)
+        self.priority = record["priority"]
+        # 벽시계 시각을 이벤트 루프 시각으로 변환
+        self.enqueued_at = loop.time() - (time.time() - record["enqueued_at"])
+        self.deadline = record["deadline"]
+        self.started = True
+        self.risk_level: str | None = None
+
+    @property
+    def expired(self) -> bool:
+        return time.time() >= self.deadline
+
+    def set_risk_level(self, risk_level: str):
+        # 먼저 확인된 risk_level은 다른 프로세스로 전달하지 않음
+        self.risk_level = risk_level
+
+    def set_result(self, result: ChatResponse):
+        self._queue.send_result(self.record["reply_to"], self.id, result)
+
+class RemoteQueue(abc.ABC):
+    """
+    공유 대기열 공통 동작 (CheckFraudQueue와 같은 인터페이스)
+    보낼 작업/결과는 모아 두었다가 한 번에 전송하고, 결과는 프로세스마다 하나의 태스크가 받아서 전달
+    하위 클래스는 _push_jobs, _pop_jobs, _push_results, _pop_results, _count_jobs만 구현
+    """
+    _instance = None
+    _lock = threading.Lock()
+
+    DEPTH_INTERVAL = 0.25  # 공유 대기열 길이 확인 주기 (초, 과부하 제어에 사용)
+
+    def __new__(cls):
+        if cls._instance is None:
+            with cls._lock:
+                if cls._instance is None:
+                    cls._instance = super().__new__(cls)
+                    # 인스턴스 변수들을 여기서 직접 초기화
+                    cls._instance.process_id = uuid.uuid4().hex  # 이 프로세스의 응답 목록 이름
+                    cls._instance.maxsize = CHECK_FRAUD_QUEUE_SIZE
+                    cls._instance.expired = 0  # 처리 전에 버린 작업 수
+                    cls._instance.sent = 0
+                    cls._instance.received = 0
+                    cls._instance._pending = {}  # 작업 ID -> 결과를 기다리는 CheckFraudJob
+                    cls._instance._outbox_jobs = []  # 보낼 작업
+                    cls._instance._outbox_results = []  # 보낼 결과 (reply_to, 작업 ID, 결과 JSON)
+                    cls._instance._outbox_event = None
+                    cls._instance._tasks = []
+                    cls._instance._depth = {}  # 우선순위 -> 공유 대기열에 남은 작업 수 (DEPTH_INTERVAL마다 갱신)
+                    cls._instance._init_backend()
+        return cls._instance
+
+    def __init__(self):
+        # __init__은 매번 호출될 수 있으므로 아무것도 하지 않음
+        pass
+
+    def _init_backend(self):
+        pass
+
+    def start(self) -> list[asyncio.Task]:
+        """
+        전송/결과 수신 태스크 시작 (앱 lifespan에서 호출)
+        """
+        if not self._tasks:
+            self._outbox_event = asyncio.Event()
+            loop = asyncio.get_running_loop()
+            self._tasks = [
+                loop.create_task(self._send_loop()),
+                loop.create_task(self._receive_loop()),
+                loop.create_task(self._depth_loop())
+            ]
+            LOGGER.info(f"사기 탐지 공유 대기열 사용: {type(self).__name__} ({self.process_id})")
+        return self._tasks
+
+    async def close(self):
+        for task in self._tasks:
+            task.cancel()
+        self._tasks = []
+
+    # API 프로세스
+    def push(self, item: CheckFraudJob):
+        """
+        공유 대기열에 작업 등록
+        이 프로세스에서 결과를 기다리는 작업이 maxsize개 이상이면 asyncio.QueueFull 발생
+        이미 등록된 작업(우선순위 상향)은 다시 보내지 않음
+        """
+        if item.id in self._pending:
+            return
+        if len(self._pending) >= self.maxsize:
+            raise asyncio.QueueFull
+        self._pending[item.id] = item
+        item.future.add_done_callback(lambda _: self._pending.pop(item.id, None))
+        now = time.time()
+        record = {
+            "id": item.id,
+            "message": item.message,
+            "conversation_id": item.conversation_id,
+            "priority": item.priority,
+            "enqueued_at": now,
+            "deadline": now + (item.deadline - asyncio.get_running_loop().time()),
+            "reply_to": self.process_id,
+        }
+        if item.conversation_id is not None:
+            # 대화 기록은 이 프로세스에만 있으므로 이전 메시지를 작업에 담아 보냄
+            conversation = CheckFraudConversations().get(item.conversation_id)
+            record["history"] = conversation.history()
+            conversation.add_sent(item.message)
+        self._outbox_jobs.append(record)
+        self._wake()
+
+    def push_many(self, items: list[CheckFraudJob]):
+        if len(self._pending) + len(items) > self.maxsize:
+            raise asyncio.QueueFull
+        for item in items:
+            self.push(item)
+
+    def qsize(self) -> int:
+        """
+        이 프로세스에서 등록하고 결과를 기다리는 작업 수
+        """
+        return len(self._pending)
+
+    def ahead(self, priority: int) -> int:
+        """
+        우선순위가 priority 이상인 작업 중 공유 대기열에 남은 수 (마지막으로 확인한 값) + 아직 보내지 않은 수
+        """
+        shared = sum(count for value, count in self._depth.items() if value <= priority)
+        return shared + sum(1 for record in self._outbox_jobs if record["priority"] <= priority)
+
+    # 워커 프로세스
+    async def pop_batch(self, max_size: int, max_wait: float) -> list[RemoteJob]:
+        """
+        공유 대기열에서 최대 max_size개의 작업을 꺼내 반환 (마감 시간이 지난 작업은 버림)
+        """
+        while True:
+            records = await self._pop_jobs(max_size, max_wait)
+            jobs = [RemoteJob(self, record) for record in records]
+            live = [job for job in jobs if not job.expired]
+            self.expired += len(jobs) - len(live)
+            if live:
+                return live
+
+    def send_result(self, reply_to: str, job_id: str, result: ChatResponse):
+        self._outbox_results.append((reply_to, job_id, result.model_dump_json()))
+        self._wake()
+
+    def _wake(self):
+        if self._outbox_event is not None:
+            self._outbox_event.set()
+
+    async def _send_loop(self):
+        while True:
+            await self._outbox_event.wait()
+            self._outbox_event.clear()
+            jobs, self._outbox_jobs = self._outbox_jobs, []
+            results, self._outbox_results = self._outbox_results, []
+            if jobs:
+                try:
+                    await self._push_jobs(jobs)
+                    self.sent += len(jobs)
+                except Exception as e:
+                    LOGGER.error(f"공유 대기열 작업 전송 실패: {e!r}")
+                    # 보내지 못한 작업은 결과를 받을 수 없으므로 바로 실패 처리
+                    for record in jobs:
+                        job = self._pending.pop(record["id"], None)
+                        if job is not None:
+                            job.set_result(ChatResponse(result=None))
+            if results:
+                try:
+                    await self._push_results(results)
+                except Exception as e:
+                    LOGGER.error(f"공유 대기열 결과 전송 실패: {e!r}")
+
+    async def _receive_loop(self):
+        while True:
+            try:
+                results = await self._pop_results()
+            except Exception as e:
+                LOGGER.error(f"공유 대기열 결과 수신 실패: {e!r}")
+                await asyncio.sleep(1)
+                continue
+            for job_id, payload in results:
+                self.received += 1
+                job = self._pending.pop(job_id, None)
+                if job is not None:
+                    res = ChatResponse.model_validate_json(payload)
+                    # 같은 메시지가 다시 오면 공유 대기열을 거치지 않도록 이 프로세스의 캐시에도 저장
+                    # (대화 중 메시지는 워커에서도 캐시하지 않음)
+                    if res.tier == "llm" and res.result is not None and job.conversation_id is None:
+                        CheckFraudCache().insert(job.key, res.result)
+                        CheckFraudSimilarIndex().insert(job.key, res.result)
+                    job.set_result(res)
+                else:
+                    # 기다리던 요청이 모두 떠난 뒤 도착한 결과
+                    CheckFraudResultStore().insert(job_id, ChatResponse.model_validate_json(payload))
+
+    async def _depth_loop(self):
+        while True:
+            try:
+                self._depth = await self._count_jobs()
+            except Exception as e:
+                LOGGER.error(f"공유 대기열 길이 확인 실패: {e!r}")
+            await asyncio.sleep(self.DEPTH_INTERVAL)
+
+    def stats(self) -> dict:
+        return {
+            "backend": CHECK_FRAUD_BACKEND,
+            "process_id": self.process_id,
+            "sent": self.sent,
+            "received": self.received,
+            "shared_depth": sum(self._depth.values()),
+        }
+
+    @abc.abstractmethod
+    async def _push_jobs(self, records: list[dict]):
+        ...
+
+    @abc.abstractmethod
+    async def _pop_jobs(self, max_size: int, max_wait: float) -> list[dict]:
+        ...
+
+    @abc.abstractmethod
+    async def _push_results(self, results: list[tuple[str, str, str]]):
+        ...
+
+    @abc.abstractmethod
+    async def _pop_results(self) -> list[tuple[str, str]]:
+        ...
+
+    @abc.abstractmethod
+    async def _count_jobs(self) -> dict[int, int]:
+        """
+        우선순위 -> 공유 대기열에 남은 작업 수
+        """
+
+class RedisQueue(RemoteQueue):
+    """
+    Redis 호환 서버의 리스트로 구현한 공유 대기열
+    우선순위별 리스트({prefix}:jobs:interactive, ...)를 BRPOP으로 순서대로 확인
+    결과는 등록한 프로세스의 응답 리스트({prefix}:results:{process_id})로 보냄
+    """
+    _instance = None
+
+    def _init_backend(self):
+        url = CHECK_FRAUD_BACKEND_URL or "redis://localhost:6379/0"
+        self._commands = RedisConnection(url)  # 일반 명령
+        self._jobs_conn = RedisConnection(url)  # BRPOP 전용 (워커)
+        self._results_conn = RedisConnection(url)  # BLPOP 전용 (결과 수신)
+        self._job_keys = [f"{CHECK_FRAUD_BACKEND_PREFIX}:jobs:{name}" for name, _ in sorted(PRIORITIES.items(), key=lambda item: item[1])]
+        self._reply_key = f"{CHECK_FRAUD_BACKEND_PREFIX}:results:{self.process_id}"
+        self._jobs_lock = None
+
+    async def close(self):
+        await super().close()
+        for conn in (self._commands, self._jobs_conn, self._results_conn):
+            await conn.close()
+
+    async def _push_jobs(self, records: list[dict]):
+        commands = []
+        for record in records:
+            key = f"{CHECK_FRAUD_BACKEND_PREFIX}:jobs:{PRIORITY_NAMES[record['priority']]}"
+            commands.append(("LPUSH", key, json.dumps(record, ensure_ascii=False)))
+        await self._commands.pipeline(commands)
+
+    async def _pop_jobs(self, max_size: int, max_wait: float) -> list[dict]:
+        # 같은 프로세스의 워커끼리는 BRPOP 연결을 번갈아 사용
+        if self._jobs_lock is None:
+            self._jobs_lock = asyncio.Lock()
+        async with self._jobs_lock:
+            while True:
+                reply = await self._jobs_conn.execute("BRPOP", *self._job_keys, 1)
+                if reply is not None:
+                    break
+        records = [json.loads(reply[1])]
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + max_wait
+        while len(records) < max_size:
+            for key in self._job_keys:
+                items = await self._commands.execute("RPOP", key, max_size - len(records))
+                records.extend(json.loads(item) for item in items or [])
+                if len(records) >= max_size:
+                    break
+            if len(records) >= max_size or loop.time() >= deadline:
+                break
+            await asyncio.sleep(min(CHECK_FRAUD_BACKEND_POLL, max(0.0, deadline - loop.time())))
+        return records
+
+    async def _push_results(self, results: list[tuple[str, str, str]]):
+        commands = []
+        for reply_to, job_id, payload in results:
+            key = f"{CHECK_FRAUD_BACKEND_PREFIX}:results:{reply_to}"
+            commands.append(("RPUSH", key, json.dumps([job_id, payload])))
+            # 결과를 받을 프로세스가 종료된 경우에도 남지 않도록 만료 시간 지정
+            commands.append(("EXPIRE", key, int(CHECK_FRAUD_TIMEOUT) + 60))
+        await self._commands.pipeline(commands)
+
+    async def _pop_results(self) -> list[tuple[str, str]]:
+        reply = await self._results_conn.execute("BLPOP", self._reply_key, 1)
+        if reply is None:
+            return []
+        items = [reply[1]] + (await self._results_conn.execute("LPOP", self._reply_key, 100) or [])
+        return [tuple(json.loads(item)) for item in items]
+
+    async def _count_jobs(self) -> dict[int, int]:
+        counts = await self._commands.pipeline([("LLEN", key) for key in self._job_keys])
+        return {PRIORITIES[key.rsplit(":", 1)[1]]: count for key, count in zip(self._job_keys, counts)}
+
+class SQLiteQueue(RemoteQueue):
+    """
+    SQLite 파일로 구현한 공유 대기열 (같은 서버의 프로세스끼리 사용, 외부 서버 불필요)
+    작업/결과 테이블을 CHECK_FRAUD_BACKEND_POLL초 간격으로 확인 (WAL 모드라 읽기는 쓰기를 막지 않음)
+    꺼내기는 DELETE ... RETURNING 한 문장으로 처리하므로 SQLite 3.35 이상 필요
+    """
+    _instance = None
+
+    def _init_backend(self):
+        self.path = CHECK_FRAUD_BACKEND_URL or "check_fraud_queue.db"
+        self._conn = sqlite3.connect(self.path, timeout=5, isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            "seq INTEGER PRIMARY KEY AUTOINCREMENT, priority INTEGER, deadline REAL, payload TEXT)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS jobs_order ON jobs (priority, deadline)")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS results ("
+            "seq INTEGER PRIMARY KEY AUTOINCREMENT, reply_to TEXT, job_id TEXT, payload TEXT, created_at REAL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS results_reply_to ON results (reply_to)")
+        self._db_lock = threading.Lock()
+
+    def _execute(self, sql: str, params=(), many: bool = False) -> list:
+        with self._db_lock:
+            if many:
+                self._conn.execute("BEGIN")
+                try:
+                    self._conn.executemany(sql, params)
+                except BaseException:
+                    self._conn.execute("ROLLBACK")
+                    raise
+                self._conn.execute("COMMIT")
+                return []
+            return self._conn.execute(sql, params).fetchall()
+
+    async def _push_jobs(self, records: list[dict]):
+        rows = [(record["priority"], record["deadline"], json.dumps(record, ensure_ascii=False)) for record in records]
+        await asyncio.to_thread(self._execute, "INSERT INTO jobs (priority, deadline, payload) VALUES (?, ?, ?)", rows, True)
+
+    def _claim_jobs(self, limit: int) -> list[dict]:
+        if not self._execute("SELECT 1 FROM jobs LIMIT 1"):
+            return []
+        rows = self._execute(
+            "DELETE FROM jobs WHERE seq IN (SELECT seq FROM jobs ORDER BY priority, deadline LIMIT ?) "
+            "RETURNING priority, deadline, payload",
+            (limit,)
+        )
+        return [json.loads(payload) for _, _, payload in sorted(rows)]
+
+    async def _pop_jobs(self, max_size: int, max_wait: float) -> list[dict]:
+        loop = asyncio.get_running_loop()
+        records = []
+        deadline = None
+        while True:
+            records += await asyncio.to_thread(self._claim_jobs, max_size - len(records))
+            if records and deadline is None:
+                deadline = loop.time() + max_wait
+            if len(records) >= max_size or (deadline is not None and loop.time() >= deadline):
+                return records
+            await asyncio.sleep(CHECK_FRAUD_BACKEND_POLL)
+
+    async def _push_results(self, results: list[tuple[str, str, str]]):
+        now = time.time()
+        rows = [(reply_to, job_id, payload, now) for reply_to, job_id, payload in results]
+        await asyncio.to_thread(
+            self._execute,
+            "INSERT INTO results (reply_to, job_id, payload, created_at) VALUES (?, ?, ?, ?)",
+            rows,
+            True
+        )
+        # 결과를 받을 프로세스가 종료된 경우에도 남지 않도록 오래된 결과 삭제
+        await asyncio.to_thread(self._execute, "DELETE FROM results WHERE created_at < ?", (now - CHECK_FRAUD_TIMEOUT - 60,))
+
+    def _claim_results(self) -> list[tuple[str, str]]:
+        if not self._execute("SELECT 1 FROM results WHERE reply_to = ? LIMIT 1", (self.process_id,)):
+            return []
+        rows = self._execute("DELETE FROM results WHERE reply_to = ? RETURNING job_id, payload", (self.process_id,))
+        return [(job_id, payload) for job_id, payload in rows]
+
+    async def _pop_results(self) -> list[tuple[str, str]]:
+        while True:
+            results = await asyncio.to_thread(self._claim_results)
+            if results:
+                return results
+            await asyncio.sleep(CHECK_FRAUD_BACKEND_POLL)
+
+    async def _count_jobs(self) -> dict[int, int]:
+        rows = await asyncio.to_thread(self._execute, "SELECT priority, COUNT(*) FROM jobs GROUP BY priority")
+        return dict(rows)
+
+def get_queue() -> CheckFraudQueue | RemoteQueue:
+    """
+    CHECK_FRAUD_BACKEND 설정에 맞는 대기열 반환 (기본값 'local'은 프로세스 내부 대기열)
+    """
+    if CHECK_FRAUD_BACKEND == "redis":
+        return RedisQueue()
+    if CHECK_FRAUD_BACKEND == "sqlite":
+        return SQLiteQueue()
+    return CheckFraudQueue()
@@ -0,0 +1,88 @@
+import time
+import threading
+from collections import OrderedDict
+
+from app import CHECK_FRAUD_CACHE_SIZE, CHECK_FRAUD_CACHE_TTL
+from app.schemas.check_fraud import LLMResponse
+
+class CheckFraudCache:
+    """
+    사기 탐지 결과 캐시 (정규화된 메시지 -> LLMResponse)
+    LRU 방식으로 최대 CHECK_FRAUD_CACHE_SIZE개 유지, CHECK_FRAUD_CACHE_TTL초 후 만료
+    """
+    _instance = None
+    _lock = threading.Lock()
+    
+    def __new__(cls):
+        if cls._instance is None:
+            with cls._lock:
+                if cls._instance is None:
+                    cls._instance = super().__new__(cls)
+                    # 인스턴스 변수들을 여기서 직접 초기화
+                    cls._instance._cache = OrderedDict()  # key -> (expires_at, LLMResponse)
+                    cls._instance.max_size = CHECK_FRAUD_CACHE_SIZE
+                    cls._instance.ttl = CHECK_FRAUD_CACHE_TTL
+                    cls._instance.hits = 0
+                    cls._instance.misses = 0
+                    cls._instance.evictions = 0
+                    cls._instance.expirations = 0
+        return cls._instance
+    
+    def __init__(self):
+        # __init__은 매번 호출될 수 있으므로 아무것도 하지 않음
+        pass
+
+    def insert(self, key: str, result: LLMResponse):
+        """
+        요소 삽입, 가득 찬 경우 가장 오래 사용되지 않은 요소 제거
+        """
+        if self.max_size <= 0:
+            return
+        self._cache[key] = (time.monotonic() + self.ttl, result)
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.max_size:
+            self._cache.popitem(last=False)
+            self.evictions += 1
+
+    def get(self, key: str) -> LLMResponse | None:
+        """
+        요소 반환 (없거나 만료된 경우 None)
+        """
+        entry = self._cache.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        expires_at, result = entry
+        if expires_at <= time.monotonic():
+            del self._cache[key]
+            self.expirations += 1
+            self.misses += 1
+            return None
+        self._cache.move_to_end(key)
+        self.hits += 1
+        return result
+
+    def clear(self):
+        """
+        모든 요소 제거
+        """
+        self._cache.clear()
+
+    def stats(self) -> dict:
+        """
+        캐시 통계 반환
+        """
+        total = self.hits + self.misses
+        return {
+            "size": len(self._cache),
+            "max_size": self.max_size,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / total if total else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
+    def __len__(self) -> int:
+        return len(self._cache)
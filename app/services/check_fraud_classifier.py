@@ -0,0 +1,219 @@
+import json
+import threading
+
+from app import (
+    LOGGER,
+    CHECK_FRAUD_VERDICT_LOG,
+    CHECK_FRAUD_CLASSIFIER_PATH,
+    CHECK_FRAUD_CLASSIFIER_SAFE_THRESHOLD,
+    CHECK_FRAUD_CLASSIFIER_RISK_THRESHOLD
+)
+from app.schemas.check_fraud import RISK_LEVELS, LLMResponse
+from .check_fraud_features import np, vectorize, char_ngrams, feature_index
+from .check_fraud_text import normalize_message
+
+SAFE = RISK_LEVELS.index("정상")
+RISK = RISK_LEVELS.index("위험")
+
+class LinearModel:
+    """
+    위험도(정상/주의/위험) 소프트맥스 회귀 (문자 n-gram 해싱 벡터, CPU만 사용)
+    학습은 python -m app.bench.train_classifier
+    """
+    def __init__(self, weights, bias):
+        self.weights = weights  # (dim, 클래스 수)
+        self.bias = bias  # (클래스 수,)
+
+    @property
+    def dim(self) -> int:
+        return self.weights.shape[0]
+
+    def predict_proba(self, texts: list[str]):
+        """
+        메시지별 위험도 확률 (len(texts) x 클래스 수, 순서는 RISK_LEVELS)
+        """
+        logits = vectorize(texts, self.dim) @ self.weights + self.bias
+        logits -= logits.max(axis=1, keepdims=True)
+        probs = np.exp(logits)
+        return probs / probs.sum(axis=1, keepdims=True)
+
+    @classmethod
+    def train(
+        cls,
+        texts: list[str],
+        labels: list[int],
+        dim: int = 2048,
+        epochs: int = 500,
+        lr: float = 10.0,
+        l2: float = 1e-4
+    ) -> "LinearModel":
+        """
+        전체 배치 경사 하강법으로 학습 (클래스 불균형은 가중치로 보정)
+        """
+        x = vectorize(texts, dim)
+        y = np.asarray(labels)
+        onehot = np.eye(len(RISK_LEVELS), dtype=np.float32)[y]
+        counts = onehot.sum(axis=0)
+        class_weights = np.where(counts > 0, len(y) / (len(RISK_LEVELS) * np.maximum(counts, 1)), 0.0)
+        sample_weights = class_weights[y].astype(np.float32)[:, None] / len(y)
+
+        model = cls(np.zeros((dim, len(RISK_LEVELS)), dtype=np.float32), np.zeros(len(RISK_LEVELS), dtype=np.float32))
+        for _ in range(epochs):
+            logits = x @ model.weights + model.bias
+            logits -= logits.max(axis=1, keepdims=True)
+            probs = np.exp(logits)
+            probs /= probs.sum(axis=1, keepdims=True)
+            grad = (probs - onehot) * sample_weights
+            model.weights -= lr * (x.T @ grad + l2 * model.weights)
+            model.bias -= lr * grad.sum(axis=0)
+        return model
+
+    def top_features(self, text: str, label: int, k: int = 2) -> list[str]:
+        """
+        메시지의 n-gram(2글자 이상, 띄어쓰기를 넘지 않는 것) 중 label 쪽으로 가장 크게 기여한 것 최대 k개
+        (메시지에서 위치가 겹치는 것은 제외)
+        """
+        normalized = normalize_message(text)
+        scored = []
+        for gram in set(gram for gram in char_ngrams(text) if len(gram) >= 2 and gram in normalized):
+            row = self.weights[feature_index(gram, self.dim)]
+            scored.append((float(row[label] - row.mean()), gram))
+        selected = []
+        spans = []
+        for score, gram in sorted(scored, reverse=True):
+            if len(selected) >= k or score <= 0:
+                break
+            start = normalized.find(gram)
+            if any(start < end and other < start + len(gram) for other, end in spans):
+                continue
+            selected.append(gram)
+            spans.append((start, start + len(gram)))
+        return selected
+
+    def save(self, path: str):
+        np.savez(path, weights=self.weights, bias=self.bias)
+
+    @classmethod
+    def load(cls, path: str) -> "LinearModel":
+        with np.load(path) as data:
+            return cls(data["weights"].astype(np.float32), data["bias"].astype(np.float32))
+
+class CheckFraudClassifier:
+    """
+    확실히 정상/위험인 메시지는 바로 판별하고, 애매한 메시지만 LLM으로 전달
+    """
+    _instance = None
+    _lock = threading.Lock()
+
+    def __new__(cls):
+        if cls._instance is None:
+            with cls._lock:
+                if cls._instance is None:
+                    cls._instance = super().__new__(cls)
+                    # 인스턴스 변수들을 여기서 직접 초기화
+                    cls._instance.model = None
+                    cls._instance.safe_threshold = CHECK_FRAUD_CLASSIFIER_SAFE_THRESHOLD
+                    cls._instance.risk_threshold = CHECK_FRAUD_CLASSIFIER_RISK_THRESHOLD
+                    cls._instance.safe = 0  # 정상으로 판별
+                    cls._instance.risk = 0  # 위험으로 판별
+                    cls._instance.uncertain = 0  # LLM으로 전달
+                    if CHECK_FRAUD_CLASSIFIER_PATH:
+                        cls._instance.load(CHECK_FRAUD_CLASSIFIER_PATH)
+        return cls._instance
+
+    def __init__(self):
+        # __init__은 매번 호출될 수 있으므로 아무것도 하지 않음
+        pass
+
+    def load(self, path: str):
+        """
+        모델 파일(.npz) 불러오기, 실패하면 분류기 단계를 사용하지 않음
+        """
+        if np is None:
+            LOGGER.warning("numpy가 설치되지 않아 경량 분류기를 사용하지 않음")
+            return
+        try:
+            self.model = LinearModel.load(path)
+        except Exception as e:
+            LOGGER.warning(f"경량 분류기 모델을 불러오지 못함: {path} {e!r}")
+            self.model = None
+
+    def classify_many(self, texts: list[str]) -> list[LLMResponse | None]:
+        """
+        여러 메시지를 한 번에 분류, 확률이 임계값을 넘지 못하면 None
+        """
+        if self.model is None or not texts:
+            return [None] * len(texts)
+        results = []
+        for text, probs in zip(texts, self.model.predict_proba(texts)):
+            if probs[SAFE] >= self.safe_threshold:
+                self.safe += 1
+                results.append(LLMResponse(
+                    risk_level="정상",
+                    confidence=round(float(probs[SAFE]), 2),
+                    detected_patterns=[],
+                    explanation="일상적인 대화로 판단됩니다.",
+                    recommended_action="없음",
+                ))
+            elif probs[RISK] >= self.risk_threshold:
+                self.risk += 1
+                results.append(LLMResponse(
+                    risk_level="위험",
+                    confidence=round(float(probs[RISK]), 2),
+                    # 다른 단계와 같이 판단 근거를 채움 (위험 쪽으로 가장 크게 기여한 표현)
+                    detected_patterns=[
+                        f"사기 의심 표현 '{gram}'" for gram in self.model.top_features(text, RISK)
+                    ] or ["사기 의심 표현"],
+                    explanation="사기 메시지에서 자주 보이는 표현이 있습니다.",
+                    recommended_action="전송 중단 권고",
+                ))
+            else:
+                self.uncertain += 1
+                results.append(None)
+        return results
+
+    def classify(self, text: str) -> LLMResponse | None:
+        return self.classify_many([text])[0]
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.model is not None,
+            "safe_threshold": self.safe_threshold,
+            "risk_threshold": self.risk_threshold,
+            "safe": self.safe,
+            "risk": self.risk,
+            "uncertain": self.uncertain,
+        }
+
+class CheckFraudVerdictLog:
+    """
+    LLM 판별 결과를 JSONL 파일에 한 줄씩 기록 (경량 분류기 학습 데이터)
+    """
+    _instance = None
+    _lock = threading.Lock()
+
+    def __new__(cls):
+        if cls._instance is None:
+            with cls._lock:
+                if cls._instance is None:
+                    cls._instance = super().__new__(cls)
+                    # 인스턴스 변수들을 여기서 직접 초기화
+                    cls._instance.path = CHECK_FRAUD_VERDICT_LOG
+                    cls._instance._file = None
+                    cls._instance.written = 0
+        return cls._instance
+
+    def __init__(self):
+        # __init__은 매번 호출될 수 있으므로 아무것도 하지 않음
+        pass
+
+    def append(self, message: str, result: LLMResponse):
+        if not self.path:
+            return
+        try:
+            if self._file is None:
+                self._file = open(self.path, "a", encoding="utf-8", buffering=1)
+            self._file.write(json.dumps({"message": message, **result.model_dump()}, ensure_ascii=False) + "\n")
+            self.written += 1
+        except OSError as e:
+            LOGGER.warning(f"판별 결과 기록 실패: {e!r}")
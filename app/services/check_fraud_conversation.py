@@ -0,0 +1,167 @@
+import time
+import asyncio
+import threading
+from array import array
+from collections import OrderedDict, deque
+
+from app import (
+    CHECK_FRAUD_CONVERSATION_SIZE,
+    CHECK_FRAUD_CONVERSATION_TTL,
+    CHECK_FRAUD_CONVERSATION_TURNS,
+    CHECK_FRAUD_CONVERSATION_TOKENS
+)
+
+class Conversation:
+    """
+    대화 하나의 최근 메시지와 Ollama context
+    """
+    def __init__(self, conversation_id: str, max_turns: int):
+        self.id = conversation_id
+        self.turns = deque(maxlen=max_turns)  # 최근 메시지 (프롬프트를 새로 만들 때 사용)
+        self.pending: list[str] = []  # context에 아직 포함되지 않은 메시지 (LLM 없이 판별된 메시지)
+        self.context: array | None = None  # 마지막 응답의 context (토큰당 4바이트, list[int]는 약 36바이트)
+        self.context_turns = 0  # context에 포함된 메시지 수
+        self.backend: str | None = None  # context를 만든 Ollama 서버 (KV 캐시 재사용)
+        self.lock = asyncio.Lock()  # 같은 대화의 메시지는 한 번에 하나씩 분석
+        self.last_used = time.monotonic()
+
+    def add_pending(self, message: str):
+        """
+        LLM을 거치지 않고 판별된 메시지를 다음 분석에 포함하도록 기록
+        최근 max_turns개만 유지 (그보다 많이 쌓이면 다음 분석에서 프롬프트를 새로 만듦)
+        """
+        self.turns.append(message)
+        self.pending.append(message)
+        del self.pending[:-self.turns.maxlen]
+
+    def add_sent(self, message: str):
+        """
+        공유 대기열로 보낸 메시지 기록
+        워커는 작업에 담긴 이전 메시지로 매번 프롬프트를 새로 만들므로 context와 pending은 사용하지 않음
+        """
+        self.turns.append(message)
+        self.pending.clear()
+
+    @classmethod
+    def from_history(cls, conversation_id: str, history: list[str], max_turns: int) -> "Conversation":
+        """
+        다른 프로세스가 보낸 이전 메시지로 만든 임시 대화 (저장하지 않음)
+        """
+        conversation = cls(conversation_id, max_turns)
+        conversation.turns.extend(history)
+        return conversation
+
+    def history(self) -> list[str]:
+        """
+        현재 메시지 이전의 최근 메시지 (최대 max_turns개)
+        """
+        return list(self.turns)
+
+class CheckFraudConversations:
+    """
+    conversation_id -> Conversation
+    LRU 방식으로 최대 CHECK_FRAUD_CONVERSATION_SIZE개 유지,
+    CHECK_FRAUD_CONVERSATION_TTL초 동안 사용하지 않은 대화는 제거
+    긴 대화 몇 개가 메모리를 차지하지 않도록 context 토큰 합계가 CHECK_FRAUD_CONVERSATION_TOKENS를 넘으면
+    가장 오래 사용하지 않은 대화부터 제거
+    """
+    _instance = None
+    _lock = threading.Lock()
+
+    def __new__(cls):
+        if cls._instance is None:
+            with cls._lock:
+                if cls._instance is None:
+                    cls._instance = super().__new__(cls)
+                    # 인스턴스 변수들을 여기서 직접 초기화
+                    cls._instance._conversations = OrderedDict()
+                    cls._instance.max_size = CHECK_FRAUD_CONVERSATION_SIZE
+                    cls._instance.ttl = CHECK_FRAUD_CONVERSATION_TTL
+                    cls._instance.max_turns = CHECK_FRAUD_CONVERSATION_TURNS
+                    cls._instance.max_tokens = CHECK_FRAUD_CONVERSATION_TOKENS
+                    cls._instance.tokens = 0  # 모든 대화의 context 토큰 합계
+                    cls._instance.created = 0
+                    cls._instance.evictions = 0
+                    cls._instance.expirations = 0
+                    cls._instance.context_reuses = 0  # 이전 context에 이어서 분석한 횟수
+                    cls._instance.rebuilds = 0  # 프롬프트 전체를 새로 만든 횟수
+        return cls._instance
+
+    def __init__(self):
+        # __init__은 매번 호출될 수 있으므로 아무것도 하지 않음
+        pass
+
+    def get(self, conversation_id: str) -> Conversation:
+        """
+        대화 반환 (없거나 만료된 경우 새로 생성)
+        """
+        self._expire()
+        conversation = self._conversations.get(conversation_id)
+        if conversation is None:
+            conversation = Conversation(conversation_id, self.max_turns)
+            self._conversations[conversation_id] = conversation
+            self.created += 1
+            while len(self._conversations) > self.max_size:
+                self._pop_oldest()
+                self.evictions += 1
+        self._conversations.move_to_end(conversation_id)
+        conversation.last_used = time.monotonic()
+        return conversation
+
+    def _expire(self):
+        """
+        오래 사용하지 않은 대화 제거 (가장 오래된 것부터 확인)
+        """
+        cutoff = time.monotonic() - self.ttl
+        while self._conversations:
+            conversation = next(iter(self._conversations.values()))
+            if conversation.last_used > cutoff:
+                break
+            self._pop_oldest()
+            self.expirations += 1
+
+    def _pop_oldest(self):
+        _, conversation = self._conversations.popitem(last=False)
+        if conversation.context is not None:
+            self.tokens -= len(conversation.context)
+
+    def set_context(self, conversation: Conversation, context: list[int] | None):
+        """
+        마지막 응답의 context 저장, 토큰 합계가 상한을 넘으면 다른 대화를 오래된 것부터 제거
+        이 대화 하나만으로 상한을 넘으면 context를 저장하지 않음 (다음 분석에서 프롬프트를 새로 만듦)
+        """
+        # 분석 중 제거된 대화는 토큰 합계에서 이미 빠졌고 다시 사용되지 않으므로 저장하지 않음
+        tracked = self._conversations.get(conversation.id) is conversation
+        if tracked and conversation.context is not None:
+            self.tokens -= len(conversation.context)
+        if context is None or not tracked or len(context) > self.max_tokens:
+            conversation.context = None
+            return
+        conversation.context = array("i", context)
+        self.tokens += len(conversation.context)
+        while self.tokens > self.max_tokens and self._conversations:
+            if next(iter(self._conversations.values())) is conversation:
+                break
+            self._pop_oldest()
+            self.evictions += 1
+
+    def remove(self, conversation_id: str):
+        conversation = self._conversations.pop(conversation_id, None)
+        if conversation is not None and conversation.context is not None:
+            self.tokens -= len(conversation.context)
+
+    def __len__(self):
+        return len(self._conversations)
+
+    def stats(self) -> dict:
+        return {
+            "size": len(self._conversations),
+            "max_size": self.max_size,
+            "tokens": self.tokens,
+            "max_tokens": self.max_tokens,
+            "created": self.created,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "context_reuses": self.context_reuses,
+            "rebuilds": self.rebuilds,
+        }
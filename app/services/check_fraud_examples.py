@@ -0,0 +1,323 @@
+import json
+import math
+import threading
+
+from app import CHECK_FRAUD_FEWSHOT_EXAMPLES, CHECK_FRAUD_FEWSHOT_K, CHECK_FRAUD_FEWSHOT_TOKENS
+from .check_fraud_features import char_ngrams
+
+# 기본 few-shot 예시 (output은 모델이 따라야 할 응답 형식)
+DEFAULT_EXAMPLES = [
+    {
+        "name": "A",
+        "title": "ACTUAL SCAM (주의)",
+        "input": "혹시 말씀해주신 계좌로 새 상품 재주문하고 기존 제품에 대한 비용을 환불해주신다는 거죠?",
+        "output": {
+            "risk_level": "주의",
+            "confidence": 0.75,
+            "detected_patterns": ["환불 요구"],
+            "explanation": "환불을 요구할 경우 사기일 가능성이 있어 주의해야 합니다.",
+            "recommended_action": "전송 중단 권고",
+        },
+    },
+    {
+        "name": "B",
+        "title": "NORMAL FOOD QUESTION (정상)",
+        "input": "내일 학식 뭐야?",
+        "output": {
+            "risk_level": "정상",
+            "confidence": 0.99,
+            "detected_patterns": [],
+            "explanation": "학교 급식에 대한 일상적인 질문입니다.",
+            "recommended_action": "없음",
+        },
+    },
+    {
+        "name": "C",
+        "title": "NORMAL GAME (정상)",
+        "input": "롤이나 하자",
+        "output": {
+            "risk_level": "정상",
+            "confidence": 0.99,
+            "detected_patterns": [],
+            "explanation": "게임 제안으로 정상적인 대화입니다.",
+            "recommended_action": "없음",
+        },
+    },
+    {
+        "name": "D",
+        "title": "INVESTMENT SCAM (위험)",
+        "input": "수익률이 200% 라구요?",
+        "output": {
+            "risk_level": "위험",
+            "confidence": 0.98,
+            "detected_patterns": ["과도한 수익 보장"],
+            "explanation": "비현실적인 수익률을 제안하는 사기 수법에 노출된 상태일 가능성이 높습니다.",
+            "recommended_action": "전송 중단 권고",
+        },
+    },
+    {
+        "name": "E",
+        "title": "NORMAL MESSENGER (주의)",
+        "input": "무슨 부탁인데?",
+        "output": {
+            "risk_level": "주의",
+            "confidence": 0.75,
+            "detected_patterns": [""],
+            "explanation": "일상적인 대화지만 갑작스런 금전 부탁인 경우 주의가 필요합니다.",
+            "recommended_action": "없음",
+        },
+    },
+    {
+        "name": "F",
+        "title": "MONEY REQUEST (주의)",
+        "input": "얼마 보내면 돼요?",
+        "output": {
+            "risk_level": "주의",
+            "confidence": 0.75,
+            "detected_patterns": ["직접적인 금전 요구"],
+            "explanation": "직접적인 금전 요구는 사기일 가능성이 높으나 일상 대화일수도 있음.",
+            "recommended_action": "전송 중단 권고",
+        },
+    },
+    {
+        "name": "G",
+        "title": "PERSONAL INFO (위험)",
+        "input": "카드 정보/인증서만 입력하면 되죠?",
+        "output": {
+            "risk_level": "위험",
+            "confidence": 0.9,
+            "detected_patterns": ["개인 금융 정보 요구"],
+            "explanation": "금융 정보 입력 요구는 매우 위험합니다.",
+            "recommended_action": "전송 중단 권고",
+        },
+    },
+    {
+        "name": "H",
+        "title": "PSYCHOLOGICAL PRESSURE (주의)",
+        "input": "이거 진짜 맞는 거지?",
+        "output": {
+            "risk_level": "주의",
+            "confidence": 0.83,
+            "detected_patterns": ["심리적 압박"],
+            "explanation": "의심이 든다면 즉시 대화를 중단하세요.",
+            "recommended_action": "전송 중단 권고",
+        },
+    },
+    {
+        "name": "I",
+        "title": "TRANSFER URGENCY (주의)",
+        "input": "지금 바로 이체하라고?",
+        "output": {
+            "risk_level": "위험",
+            "confidence": 0.92,
+            "detected_patterns": ["송금 재촉"],
+            "explanation": "급한 송금 요구는 사기의 전형적인 수법입니다.",
+            "recommended_action": "전송 중단 권고",
+        },
+    },
+    {
+        "name": "I",
+        "title": "TRANSFER MONEY (위험)",
+        "input": "너만 믿고 넣는다",
+        "output": {
+            "risk_level": "위험",
+            "confidence": 0.85,
+            "detected_patterns": ["과도한 신용"],
+            "explanation": "상대방에 대한 과도한 신뢰는 사기의 위험 요소입니다.",
+            "recommended_action": "전송 중단 권고",
+        },
+    },
+    {
+        "name": "J",
+        "title": "ACCOUNT ABUSE (위험)",
+        "input": "대포통장",
+        "output": {
+            "risk_level": "위험",
+            "confidence": 0.99,
+            "detected_patterns": ["대포통장 언급"],
+            "explanation": "대포통장은 불법 금융거래에 사용됩니다.",
+            "recommended_action": "전송 중단 권고",
+        },
+    },
+    {
+        "name": "K",
+        "title": "PERSONAL INFO LEAK (위험)",
+        "input": "개인정보유출",
+        "output": {
+            "risk_level": "위험",
+            "confidence": 0.95,
+            "detected_patterns": ["개인정보 유출"],
+            "explanation": "개인정보 유출은 매우 심각한 보안 위험입니다.",
+            "recommended_action": "전송 중단 권고",
+        },
+    },
+    {
+        "name": "L",
+        "title": "STRANGER CONTACT (주의)",
+        "input": "모르는 사람",
+        "output": {
+            "risk_level": "주의",
+            "confidence": 0.7,
+            "detected_patterns": ["신원 미확인"],
+            "explanation": "모르는 사람과의 거래는 주의가 필요합니다.",
+            "recommended_action": "전송 전 확인",
+        },
+    },
+    {
+        "name": "M",
+        "title": "LOAN OFFER (주의)",
+        "input": "대출이 가능한거에요?",
+        "output": {
+            "risk_level": "주의",
+            "confidence": 0.8,
+            "detected_patterns": ["대출 제안"],
+            "explanation": "대출 제안은 사기일 가능성을 확인해야 합니다.",
+            "recommended_action": "전송 전 확인",
+        },
+    },
+    {
+        "name": "N",
+        "title": "SUSPICIOUS LINK (위험)",
+        "input": "링크에 들어가라고요?",
+        "output": {
+            "risk_level": "위험",
+            "confidence": 0.9,
+            "detected_patterns": ["의심스러운 링크"],
+            "explanation": "모르는 링크 접속 요구는 피싱 시도일 수 있습니다.",
+            "recommended_action": "전송 중단 권고",
+        },
+    },
+    {
+        "name": "O",
+        "title": "ACCOUNT ABUSE (위험)",
+        "input": "대리결제",
+        "output": {
+            "risk_level": "위험",
+            "confidence": 0.99,
+            "detected_patterns": ["대리결제 언급"],
+            "explanation": "대리결제는 사기 가능성이 있습니다.",
+            "recommended_action": "전송 중단 권고",
+        },
+    },
+    {
+        "name": "P",
+        "title": "ILLEGAL LEADING GROUP (위험)",
+        "input": "오늘 리딩 너무 좋네요",
+        "output": {
+            "risk_level": "위험",
+            "confidence": 0.95,
+            "detected_patterns": ["불법 리딩방 경고"],
+            "explanation": "불법 리딩방이 의심됩니다",
+            "recommended_action": "전송 중단 권고",
+        },
+    },
+    {
+        "name": "Q",
+        "title": "ILLEGAL LEADING GROUP (위험)",
+        "input": "믿음은 곧 수익입니다.",
+        "output": {
+            "risk_level": "위험",
+            "confidence": 0.83,
+            "detected_patterns": ["불법 리딩방 경고", "과도한 믿음"],
+            "explanation": "불법 리딩방이 의심됩니다",
+            "recommended_action": "전송 중단 권고",
+        },
+    },
+    {
+        "name": "R",
+        "title": "ILLEGAL LEADING GROUP (위험)",
+        "input": "님만 믿습니다!! 가즈아~!!!",
+        "output": {
+            "risk_level": "주의",
+            "confidence": 0.73,
+            "detected_patterns": ["불법 리딩방 주의", "과도한 믿음"],
+            "explanation": "불법 리딩방이 의심됩니다",
+            "recommended_action": "전송 중단 권고",
+        },
+    },
+]
+
+def estimate_tokens(text: str) -> int:
+    """
+    대략적인 토큰 수 (한글 등 비ASCII 문자는 글자당 1개, ASCII는 4글자당 1개)
+    """
+    ascii_chars = sum(1 for ch in text if ch.isascii())
+    return (len(text) - ascii_chars) + math.ceil(ascii_chars / 4)
+
+def render_example(example: dict) -> str:
+    output = json.dumps(example["output"], ensure_ascii=False)
+    return f'Example {example["name"]} - {example["title"]}:\nInput: "{example["input"]}"\nOutput: {output}\n\n'
+
+class CheckFraudExamples:
+    """
+    few-shot 예시 목록에서 메시지와 비슷한 예시를 골라 프롬프트 크기를 줄임
+    문자 n-gram 집합의 코사인 유사도 순으로 최대 CHECK_FRAUD_FEWSHOT_K개,
+    CHECK_FRAUD_FEWSHOT_TOKENS 토큰 안에서 선택
+    """
+    _instance = None
+    _lock = threading.Lock()
+    
+    def __new__(cls):
+        if cls._instance is None:
+            with cls._lock:
+                if cls._instance is None:
+                    cls._instance = super().__new__(cls)
+                    # 인스턴스 변수들을 여기서 직접 초기화
+                    cls._instance.examples = CHECK_FRAUD_FEWSHOT_EXAMPLES or DEFAULT_EXAMPLES
+                    cls._instance.k = CHECK_FRAUD_FEWSHOT_K
+                    cls._instance.token_budget = CHECK_FRAUD_FEWSHOT_TOKENS
+                    # 예시별로 미리 계산해두는 값
+                    cls._instance._rendered = [render_example(example) for example in cls._instance.examples]
+                    cls._instance._tokens = [estimate_tokens(text) for text in cls._instance._rendered]
+                    cls._instance._ngrams = [set(char_ngrams(example["input"])) for example in cls._instance.examples]
+        return cls._instance
+    
+    def __init__(self):
+        # __init__은 매번 호출될 수 있으므로 아무것도 하지 않음
+        pass
+
+    def _score(self, index: int, ngrams: set[str]) -> float:
+        example_ngrams = self._ngrams[index]
+        if not example_ngrams or not ngrams:
+            return 0.0
+        return len(example_ngrams & ngrams) / math.sqrt(len(example_ngrams) * len(ngrams))
+
+    def select(self, texts: list[str]) -> tuple[int, ...]:
+        """
+        메시지(여러 개면 그중 가장 비슷한 메시지 기준)와 비슷한 예시 번호를 예시 목록 순서로 반환
+        위험도(정상/주의/위험)마다 가장 비슷한 예시를 먼저 넣어 한쪽으로 치우치지 않게 함
+        k가 0이면 모든 예시 사용
+        """
+        if not self.k:
+            return tuple(range(len(self.examples)))
+        message_ngrams = [set(char_ngrams(text)) for text in texts]
+        scores = [max((self._score(i, ngrams) for ngrams in message_ngrams), default=0.0) for i in range(len(self.examples))]
+        ranked = sorted(range(len(self.examples)), key=lambda i: scores[i], reverse=True)
+
+        # 위험도별 최고 점수 예시 -> 나머지 점수 순
+        first = {}
+        for i in ranked:
+            first.setdefault(self.examples[i]["output"]["risk_level"], i)
+        order = list(first.values()) + [i for i in ranked if i not in first.values()]
+
+        selected = []
+        budget = self.token_budget
+        for i in order:
+            if len(selected) >= self.k:
+                break
+            if self._tokens[i] > budget:
+                continue
+            selected.append(i)
+            budget -= self._tokens[i]
+        return tuple(sorted(selected))
+
+    def render(self, indices: tuple[int, ...]) -> str:
+        return "".join(self._rendered[i] for i in indices)
+
+    def stats(self) -> dict:
+        return {
+            "examples": len(self.examples),
+            "k": self.k,
+            "token_budget": self.token_budget,
+            "tokens_all": sum(self._tokens),
+        }
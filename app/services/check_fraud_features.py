@@ -0,0 +1,35 @@
+import zlib
+
+try:
+    import numpy as np
+except ImportError:  # numpy가 없으면 유사도/분류기 단계는 사용하지 않음
+    np = None
+
+from .check_fraud_text import normalize_message
+
+NGRAM_SIZES = (1, 2, 3)
+
+def char_ngrams(text: str) -> list[str]:
+    """
+    공백을 제거한 메시지의 문자 n-gram 목록 (1~3글자)
+    """
+    text = "".join(normalize_message(text).split())
+    return [text[i:i + n] for n in NGRAM_SIZES for i in range(len(text) - n + 1)]
+
+def feature_index(gram: str, dim: int) -> int:
+    """
+    n-gram의 해싱 벡터 위치 (프로세스마다 값이 달라지지 않도록 crc32 해시 사용)
+    """
+    return zlib.crc32(gram.encode()) % dim
+
+def vectorize(texts: list[str], dim: int):
+    """
+    문자 n-gram을 dim 차원으로 해싱한 벡터 행렬 (len(texts) x dim, 행마다 L2 정규화)
+    """
+    matrix = np.zeros((len(texts), dim), dtype=np.float32)
+    for row, text in enumerate(texts):
+        for gram in char_ngrams(text):
+            matrix[row, feature_index(gram, dim)] += 1.0
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
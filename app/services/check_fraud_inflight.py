@@ -0,0 +1,50 @@
+import threading
+
+from .check_fraud_queue import CheckFraudJob
+
+class CheckFraudInflightDict:
+    """
+    처리 중인 사기 탐지 작업 (정규화된 메시지 -> 작업)
+    같은 메시지가 동시에 들어오면 새로 큐에 넣지 않고 기존 작업의 결과를 함께 받음
+    """
+    _instance = None
+    _lock = threading.Lock()
+    
+    def __new__(cls):
+        if cls._instance is None:
+            with cls._lock:
+                if cls._instance is None:
+                    cls._instance = super().__new__(cls)
+                    # 인스턴스 변수들을 여기서 직접 초기화
+                    cls._instance._jobs = {}
+        return cls._instance
+    
+    def __init__(self):
+        # __init__은 매번 호출될 수 있으므로 아무것도 하지 않음
+        pass
+
+    def insert(self, job: CheckFraudJob):
+        """
+        요소 삽입, 작업이 끝나면(결과/취소) 자동으로 제거
+        """
+        self._jobs[job.key] = job
+        job.future.add_done_callback(lambda _: self.remove(job))
+
+    def get(self, key: str) -> CheckFraudJob | None:
+        """
+        아직 끝나지 않은 작업 반환
+        """
+        job = self._jobs.get(key)
+        if job is not None and not job.future.done():
+            return job
+        return None
+
+    def remove(self, job: CheckFraudJob):
+        """
+        요소 제거 (같은 키로 새 작업이 등록된 경우 유지)
+        """
+        if self._jobs.get(job.key) is job:
+            del self._jobs[job.key]
+
+    def __len__(self) -> int:
+        return len(self._jobs)
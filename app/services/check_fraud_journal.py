@@ -0,0 +1,167 @@
+import os
+import json
+import time
+import asyncio
+import threading
+
+from app import LOGGER
+
+class CheckFraudJournal:
+    """
+    사기 탐지 대기열 저널 (재시작/장애 시 대기 중이던 작업 복구용)
+    작업 등록("push")과 완료("done")를 세그먼트 파일에 한 줄씩 추가 기록
+    기록은 메모리에 모았다가 flush_interval마다 한 번에 쓰고 fsync (group commit)하므로
+    요청 처리 중에는 디스크를 기다리지 않음 (장애 시 마지막 flush_interval 동안의 기록은 잃을 수 있음)
+    세그먼트가 segment_size를 넘으면 남은 작업만 새 세그먼트에 옮기고 이전 세그먼트 삭제 (compaction)
+    """
+    def __init__(self, directory: str, flush_interval: float = 0.05, segment_size: int = 4 * 1024 * 1024):
+        self.directory = directory
+        self.flush_interval = flush_interval
+        self.segment_size = segment_size
+        self._live: dict[str, dict] = {}  # 완료되지 않은 작업 ID -> push 기록
+        self._buffer: list[str] = []
+        self._event: asyncio.Event | None = None
+        self._task: asyncio.Task | None = None
+        self._file = None
+        self._segment = 0
+        self._segment_bytes = 0
+        self._snapshot_bytes = 0  # 세그먼트 앞부분에 옮겨 적은 작업 크기 (세그먼트 교체 기준에서 제외)
+        self._write_lock = threading.Lock()
+        self.appended = 0
+        self.flushes = 0
+        self.flush_seconds = 0.0
+        self.compactions = 0
+        self.replayed = 0
+        os.makedirs(directory, exist_ok=True)
+
+    def _segments(self) -> list[int]:
+        return sorted(int(name[:-4]) for name in os.listdir(self.directory) if name.endswith(".log") and name[:-4].isdigit())
+
+    def _path(self, segment: int) -> str:
+        return os.path.join(self.directory, f"{segment:08d}.log")
+
+    def replay(self) -> list[dict]:
+        """
+        세그먼트를 순서대로 읽어 완료되지 않았고 마감 시간이 지나지 않은 작업의 push 기록 반환
+        (마지막 줄이 기록 도중 잘린 경우 무시)
+        """
+        live: dict[str, dict] = {}
+        for segment in self._segments():
+            with open(self._path(segment), encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        continue
+                    if record.get("op") == "push":
+                        live[record["id"]] = record
+                    elif record.get("op") == "done":
+                        live.pop(record["id"], None)
+        now = time.time()
+        records = [record for record in live.values() if record["deadline"] > now]
+        self.replayed = len(records)
+        return records
+
+    def start(self) -> asyncio.Task:
+        """
+        새 세그먼트에 남은 작업을 옮겨 적고(이전 세그먼트 삭제) 기록 태스크 시작
+        replay 결과를 대기열에 다시 넣은 뒤 호출
+        """
+        old_segments = self._segments()
+        self._open_segment((old_segments[-1] + 1) if old_segments else 0)
+        self._compact(old_segments, list(self._live.values()))
+        # 복구한 작업은 방금 모두 옮겨 적었으므로 버퍼는 비움
+        self._buffer = []
+        self._event = asyncio.Event()
+        self._task = asyncio.get_running_loop().create_task(self._flush_loop())
+        return self._task
+
+    def __contains__(self, job_id: str) -> bool:
+        return job_id in self._live
+
+    def record_push(self, record: dict):
+        if record["id"] in self._live:
+            return
+        record = {"op": "push", **record}
+        self._live[record["id"]] = record
+        self._append(record)
+
+    def record_done(self, job_id: str):
+        if self._live.pop(job_id, None) is not None:
+            self._append({"op": "done", "id": job_id})
+
+    def _append(self, record: dict):
+        self._buffer.append(json.dumps(record, ensure_ascii=False) + "\n")
+        self.appended += 1
+        if self._event is not None:
+            self._event.set()
+
+    async def _flush_loop(self):
+        try:
+            while True:
+                await self._event.wait()
+                # 잠시 모았다가 한 번에 기록
+                await asyncio.sleep(self.flush_interval)
+                self._event.clear()
+                await self._flush()
+        finally:
+            # 종료 시 남은 기록 저장
+            if self._buffer:
+                self._write("".join(self._buffer))
+                self._buffer = []
+
+    async def _flush(self):
+        data, self._buffer = "".join(self._buffer), []
+        if data:
+            started_at = time.perf_counter()
+            await asyncio.to_thread(self._write, data)
+            self.flushes += 1
+            self.flush_seconds += time.perf_counter() - started_at
+        if self._segment_bytes - self._snapshot_bytes >= self.segment_size:
+            # 현재까지 남은 작업만 새 세그먼트에 옮기고 이전 세그먼트 삭제
+            old_segments = self._segments()
+            self._open_segment(self._segment + 1)
+            await asyncio.to_thread(self._compact, old_segments, list(self._live.values()))
+
+    def _write(self, data: str):
+        encoded = data.encode()
+        with self._write_lock:
+            self._file.write(encoded)
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._segment_bytes += len(encoded)
+
+    def _open_segment(self, segment: int):
+        if self._file is not None:
+            self._file.close()
+        self._segment = segment
+        self._segment_bytes = 0
+        self._file = open(self._path(segment), "ab")
+
+    def _compact(self, old_segments: list[int], live: list[dict]):
+        now = time.time()
+        snapshot = "".join(json.dumps(record, ensure_ascii=False) + "\n" for record in live if record["deadline"] > now)
+        self._write(snapshot)
+        self._snapshot_bytes = len(snapshot.encode())
+        for segment in old_segments:
+            if segment != self._segment:
+                try:
+                    os.remove(self._path(segment))
+                except OSError as e:
+                    LOGGER.warning(f"저널 세그먼트 삭제 실패: {segment} {e!r}")
+        if old_segments:
+            self.compactions += 1
+
+    def stats(self) -> dict:
+        return {
+            "directory": self.directory,
+            "segment": self._segment,
+            "segment_bytes": self._segment_bytes,
+            "live": len(self._live),
+            "pending_records": len(self._buffer),
+            "appended": self.appended,
+            "flushes": self.flushes,
+            "avg_flush_seconds": self.flush_seconds / self.flushes if self.flushes else 0.0,
+            "compactions": self.compactions,
+            "replayed": self.replayed,
+        }
@@ -0,0 +1,248 @@
+import threading
+from collections import deque
+
+from app import CHECK_FRAUD_KEYWORD_LEXICON, CHECK_FRAUD_KEYWORD_MIN_CONFIDENCE
+from app.schemas.check_fraud import LLMResponse
+
+# 기본 키워드 사전 (request_ollama 프롬프트 예시 기반)
+# pattern은 공백을 제거한 상태로 비교함
+DEFAULT_LEXICON = [
+    {
+        "pattern": "대포통장",
+        "risk_level": "위험",
+        "confidence": 0.99,
+        "detected_pattern": "대포통장 언급",
+        "explanation": "대포통장은 불법 금융거래에 사용됩니다.",
+        "recommended_action": "전송 중단 권고",
+    },
+    {
+        "pattern": "대포폰",
+        "risk_level": "위험",
+        "confidence": 0.95,
+        "detected_pattern": "대포폰 언급",
+        "explanation": "대포폰은 불법 거래에 사용됩니다.",
+        "recommended_action": "전송 중단 권고",
+    },
+    {
+        "pattern": "대리결제",
+        "risk_level": "위험",
+        "confidence": 0.99,
+        "detected_pattern": "대리결제 언급",
+        "explanation": "대리결제는 사기 가능성이 있습니다.",
+        "recommended_action": "전송 중단 권고",
+    },
+    {
+        "pattern": "개인정보유출",
+        "risk_level": "위험",
+        "confidence": 0.95,
+        "detected_pattern": "개인정보 유출",
+        "explanation": "개인정보 유출은 매우 심각한 보안 위험입니다.",
+        "recommended_action": "전송 중단 권고",
+    },
+    {
+        "pattern": "리딩방",
+        "risk_level": "위험",
+        "confidence": 0.95,
+        "detected_pattern": "불법 리딩방 경고",
+        "explanation": "불법 리딩방이 의심됩니다",
+        "recommended_action": "전송 중단 권고",
+    },
+    {
+        "pattern": "안전계좌",
+        "risk_level": "위험",
+        "confidence": 0.95,
+        "detected_pattern": "안전계좌 이체 요구",
+        "explanation": "안전계좌 이체 요구는 전형적인 보이스피싱입니다.",
+        "recommended_action": "전송 중단 권고",
+    },
+    {
+        "pattern": "원금보장",
+        "risk_level": "위험",
+        "confidence": 0.92,
+        "detected_pattern": "과도한 수익 보장",
+        "explanation": "원금과 수익을 보장하는 투자는 사기일 가능성이 높습니다.",
+        "recommended_action": "전송 중단 권고",
+    },
+    # 아래 항목은 확신도가 CHECK_FRAUD_KEYWORD_MIN_CONFIDENCE보다 낮아 평소에는 LLM으로 전달되고,
+    # 과부하로 LLM 분석을 받을 수 없을 때만 간단한 결과로 사용됨
+    {
+        "pattern": "인증번호",
+        "risk_level": "주의",
+        "confidence": 0.7,
+        "detected_pattern": "개인정보 요구",
+        "explanation": "인증번호는 다른 사람에게 알려주면 안 됩니다.",
+        "recommended_action": "전송 전 확인",
+    },
+    {
+        "pattern": "이체",
+        "risk_level": "주의",
+        "confidence": 0.5,
+        "detected_pattern": "긴급한 입금 요구",
+        "explanation": "이체 요청은 상대방을 확인한 뒤 진행하세요.",
+        "recommended_action": "전송 전 확인",
+    },
+    {
+        "pattern": "송금",
+        "risk_level": "주의",
+        "confidence": 0.5,
+        "detected_pattern": "긴급한 입금 요구",
+        "explanation": "송금 요청은 상대방을 확인한 뒤 진행하세요.",
+        "recommended_action": "전송 전 확인",
+    },
+    {
+        "pattern": "수익률",
+        "risk_level": "주의",
+        "confidence": 0.6,
+        "detected_pattern": "과도한 수익 보장",
+        "explanation": "높은 수익률을 내세우는 투자 권유는 주의하세요.",
+        "recommended_action": "전송 전 확인",
+    },
+    {
+        "pattern": "비밀번호",
+        "risk_level": "주의",
+        "confidence": 0.7,
+        "detected_pattern": "개인정보 요구",
+        "explanation": "비밀번호는 다른 사람에게 알려주면 안 됩니다.",
+        "recommended_action": "전송 전 확인",
+    },
+    {
+        "pattern": "http",
+        "risk_level": "주의",
+        "confidence": 0.5,
+        "detected_pattern": "의심스러운 링크",
+        "explanation": "모르는 링크는 열기 전에 확인하세요.",
+        "recommended_action": "전송 전 확인",
+    },
+]
+
+RISK_ORDER = {"정상": 0, "주의": 1, "위험": 2}
+
+class KeywordMatcher:
+    """
+    아호-코라식(Aho-Corasick) 다중 패턴 매칭
+    메시지 길이에 선형인 시간으로 사전의 모든 패턴을 한 번에 검색
+    """
+    def __init__(self, lexicon: list[dict]):
+        self.entries = []
+        self._goto: list[dict[str, int]] = [{}]
+        self._fail: list[int] = [0]
+        self._output: list[list[int]] = [[]]
+
+        for entry in lexicon:
+            pattern = "".join(entry["pattern"].split())
+            if not pattern:
+                continue
+            self.entries.append(entry)
+            self._add(pattern, len(self.entries) - 1)
+        self._build()
+
+    def _add(self, pattern: str, index: int):
+        node = 0
+        for ch in pattern.lower():
+            nxt = self._goto[node].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[node][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+            node = nxt
+        self._output[node].append(index)
+
+    def _build(self):
+        """
+        실패 링크 계산 (BFS)
+        """
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, nxt in self._goto[node].items():
+                queue.append(nxt)
+                fail = self._fail[node]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[nxt] = self._goto[fail].get(ch, 0)
+                self._output[nxt] = self._output[nxt] + self._output[self._fail[nxt]]
+
+    def find(self, text: str) -> list[dict]:
+        """
+        메시지에 포함된 모든 사전 항목 반환 (공백/대소문자 무시, 중복 제거)
+        """
+        found = []
+        seen = set()
+        node = 0
+        for ch in text:
+            if ch.isspace():
+                continue
+            ch = ch.lower()
+            while node and ch not in self._goto[node]:
+                node = self._fail[node]
+            node = self._goto[node].get(ch, 0)
+            for index in self._output[node]:
+                if index not in seen:
+                    seen.add(index)
+                    found.append(self.entries[index])
+        return found
+
+class CheckFraudKeyword:
+    """
+    키워드 사전 기반 빠른 판별 (LLM 호출 전 단계)
+    """
+    _instance = None
+    _lock = threading.Lock()
+    
+    def __new__(cls):
+        if cls._instance is None:
+            with cls._lock:
+                if cls._instance is None:
+                    cls._instance = super().__new__(cls)
+                    # 인스턴스 변수들을 여기서 직접 초기화
+                    cls._instance._matcher = KeywordMatcher(CHECK_FRAUD_KEYWORD_LEXICON or DEFAULT_LEXICON)
+                    cls._instance.min_confidence = CHECK_FRAUD_KEYWORD_MIN_CONFIDENCE
+                    cls._instance.hits = 0
+                    cls._instance.misses = 0
+        return cls._instance
+    
+    def __init__(self):
+        # __init__은 매번 호출될 수 있으므로 아무것도 하지 않음
+        pass
+
+    def check(self, text: str) -> LLMResponse | None:
+        """
+        확신도가 높은 키워드가 포함된 경우 바로 결과 반환, 아니면 None
+        """
+        result = self.match(text, self.min_confidence)
+        if result is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return result
+
+    def match(self, text: str, min_confidence: float = 0.0) -> LLMResponse | None:
+        """
+        확신도가 min_confidence 이상인 키워드로 결과 구성 (통계에 포함하지 않음)
+        """
+        found = [entry for entry in self._matcher.find(text) if entry["confidence"] >= min_confidence]
+        if not found:
+            return None
+
+        # 가장 위험도/확신도가 높은 항목 기준으로 결과 구성
+        found.sort(key=lambda entry: (RISK_ORDER.get(entry["risk_level"], 0), entry["confidence"]), reverse=True)
+        top = found[0]
+        return LLMResponse(
+            risk_level=top["risk_level"],
+            confidence=top["confidence"],
+            detected_patterns=list(dict.fromkeys(entry["detected_pattern"] for entry in found)),
+            explanation=top["explanation"],
+            recommended_action=top["recommended_action"],
+        )
+
+    def stats(self) -> dict:
+        """
+        키워드 판별 통계 반환
+        """
+        return {
+            "patterns": len(self._matcher.entries),
+            "hits": self.hits,
+            "misses": self.misses,
+        }
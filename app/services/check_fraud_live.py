@@ -0,0 +1,141 @@
+import asyncio
+from collections import OrderedDict
+from typing import Awaitable, Callable
+
+from app import LOGGER, CHECK_FRAUD_TIMEOUT, CHECK_FRAUD_LIVE_DEBOUNCE
+from app.schemas.check_fraud import ChatResponse, LiveCheckResponse
+from .check_fraud import lookup_verdict, submit_check, degraded_verdict
+from .check_fraud_admission import CheckFraudOverloaded
+from .check_fraud_text import normalize_message
+from . import metrics
+
+# 초안 비교 시 무시하는 끝부분 문자 (입력 중인 공백/문장부호)
+TRAILING_CHARS = " .,!?~…ㅋㅎ"
+
+def draft_key(draft: str) -> str:
+    """
+    입력 중인 초안 비교용 키 (끝의 공백/문장부호 무시)
+    """
+    return normalize_message(draft).rstrip(TRAILING_CHARS)
+
+class LiveCheckSession:
+    """
+    실시간 입력 검사 세션 (연결 하나당 하나)
+    새 초안이 들어오면 이전 초안 검사를 취소하고, 입력이 멈춘 뒤(디바운스) 검사
+    위험도 먼저 알림(risk_level)은 메시지 한 개를 분석하는 경우만 전달됨
+    (워커가 여러 메시지를 배치로 묶어 분석하면 스트리밍 중 메시지별 위험도를 알 수 없어 최종 결과만 전달)
+    """
+    MAX_VERDICTS = 32  # 세션별로 기억하는 초안 결과 수
+
+    def __init__(self, send: Callable[[dict], Awaitable[None]]):
+        self._send = send
+        self._task: asyncio.Task | None = None
+        self._last_id = 0
+        self._verdicts: OrderedDict[str, ChatResponse] = OrderedDict()  # draft_key -> 결과
+        self._closed = False  # 연결이 끊겨 더 이상 전송하지 않음
+
+    def update(self, draft: str, draft_id: int | None = None):
+        """
+        새 초안 수신, 진행 중인 이전 초안 검사는 취소 (큐에 있으면 LLM에 전달되지 않음)
+        """
+        self._last_id = draft_id if draft_id is not None else self._last_id + 1
+        if self._task is not None:
+            self._task.cancel()
+        self._task = asyncio.create_task(self._check(draft, self._last_id))
+
+    async def close(self):
+        """
+        진행 중인 검사를 취소하고 끝날 때까지 대기
+        """
+        self._closed = True
+        task, self._task = self._task, None
+        if task is not None:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+    async def _emit(self, response: LiveCheckResponse):
+        """
+        결과 전송 (연결이 끊긴 경우 무시, 검사 태스크에서 예외가 처리되지 않은 채 남지 않도록)
+        """
+        if self._closed:
+            return
+        try:
+            await self._send(response.model_dump(mode="json"))
+        except Exception as e:
+            LOGGER.debug(f"실시간 검사 결과 전송 실패: {e!r}")
+            self._closed = True
+
+    def _remember(self, key: str, res: ChatResponse):
+        self._verdicts[key] = res
+        self._verdicts.move_to_end(key)
+        while len(self._verdicts) > self.MAX_VERDICTS:
+            self._verdicts.popitem(last=False)
+
+    def _prefix_verdict(self, key: str) -> ChatResponse | None:
+        """
+        현재 초안의 앞부분(이미 검사한 초안) 중 가장 긴 것의 결과
+        """
+        best = None
+        for prefix, res in self._verdicts.items():
+            if res.result is not None and key.startswith(prefix) and (best is None or len(prefix) > len(best[0])):
+                best = (prefix, res)
+        return best[1] if best else None
+
+    async def _check(self, draft: str, draft_id: int):
+        key = draft_key(draft)
+        if not key:
+            return
+
+        # 끝의 공백/문장부호만 바뀐 초안은 이전 결과 재사용
+        reused = self._verdicts.get(key)
+        if reused is not None:
+            await self._emit(LiveCheckResponse(id=draft_id, message=draft, result=reused.result, tier=reused.tier))
+            return
+
+        # 앞부분이 같은 이전 결과를 임시로 먼저 전달
+        prefix = self._prefix_verdict(key)
+        if prefix is not None:
+            await self._emit(LiveCheckResponse(
+                id=draft_id, message=draft, result=prefix.result, tier=prefix.tier, provisional=True
+            ))
+
+        # 입력이 멈출 때까지 대기 (그 사이 새 초안이 오면 이 태스크는 취소됨)
+        await asyncio.sleep(CHECK_FRAUD_LIVE_DEBOUNCE)
+
+        res = lookup_verdict(draft)
+        if res is None:
+            res = await self._wait_llm(draft, draft_id)
+        if res.result is not None and not res.degraded:
+            self._remember(key, res)
+        await self._emit(LiveCheckResponse(
+            id=draft_id, message=draft, result=res.result, tier=res.tier, degraded=res.degraded
+        ))
+
+    async def _wait_llm(self, draft: str, draft_id: int) -> ChatResponse:
+        try:
+            job = submit_check(draft, priority="interactive", timeout=CHECK_FRAUD_TIMEOUT)
+        except CheckFraudOverloaded:
+            return degraded_verdict(draft) or ChatResponse(result=None, tier="degraded", degraded=True)
+        except asyncio.QueueFull:
+            metrics.QUEUE_REJECTED.inc(endpoint="live")
+            return ChatResponse(result=None)
+
+        waiter = asyncio.create_task(job.wait(CHECK_FRAUD_TIMEOUT))
+        early = asyncio.create_task(job.risk_level_event.wait())
+        try:
+            # 스트리밍 중 risk_level이 먼저 나오면 바로 전달
+            done, _ = await asyncio.wait({waiter, early}, return_when=asyncio.FIRST_COMPLETED)
+            if early in done and waiter not in done:
+                await self._emit(LiveCheckResponse(
+                    type="risk_level", id=draft_id, message=draft, risk_level=job.risk_level, provisional=True
+                ))
+            return await waiter
+        except asyncio.TimeoutError:
+            metrics.TIMEOUTS.inc(endpoint="live")
+            return ChatResponse(result=None)
+        finally:
+            waiter.cancel()
+            early.cancel()
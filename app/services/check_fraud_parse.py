@@ -0,0 +1,152 @@
+import re
+import json
+from pydantic import ValidationError
+
+from app.schemas.check_fraud import LLMResponse, RISK_LEVELS, RECOMMENDED_ACTIONS
+
+# Ollama structured output(format)에 넘기는 JSON 스키마
+VERDICT_SCHEMA = LLMResponse.model_json_schema()
+
+def batch_schema(size: int) -> dict:
+    """
+    메시지 size개 분석 결과 배열의 JSON 스키마
+    """
+    return {"type": "array", "items": VERDICT_SCHEMA, "minItems": size, "maxItems": size}
+
+_code_fence = re.compile(r'```(?:json)?')
+_trailing_comma = re.compile(r',\s*([}\]])')
+_decoder = json.JSONDecoder()
+_risk_level = re.compile(r'"risk_level"\s*:\s*"\s*(정상|주의|위험)')
+
+def extract_json(text: str, start_char: str = '{'):
+    """
+    LLM 응답에서 첫 JSON 값(start_char로 시작) 추출
+    코드 블록, 앞뒤 설명 문구, 마지막 쉼표 등은 무시, 실패 시 None
+    """
+    text = _code_fence.sub('', text)
+    start = text.find(start_char)
+    if start == -1:
+        return None
+    for candidate in (text[start:], _trailing_comma.sub(r'\1', text[start:])):
+        try:
+            value, _ = _decoder.raw_decode(candidate)
+            return value
+        except ValueError:
+            continue
+    return None
+
+def find_risk_level(text: str) -> str | None:
+    """
+    생성 중인 응답에서 risk_level 값이 나왔으면 반환
+    """
+    match = _risk_level.search(text)
+    return match.group(1) if match else None
+
+class JSONStreamScanner:
+    """
+    스트리밍 응답을 조금씩 받아 최상위 JSON 값(객체/배열)이 닫히는 시점 감지
+    문자열 내부의 괄호와 이스케이프 문자는 무시
+    """
+    def __init__(self):
+        self.text = ""
+        self.complete = False
+        self._depth = 0
+        self._started = False
+        self._in_string = False
+        self._escape = False
+
+    def feed(self, chunk: str) -> bool:
+        """
+        응답 조각 추가, 최상위 JSON 값이 완성되면 True
+        완성 이후에 들어온 문자는 버림
+        """
+        if self.complete:
+            return True
+        for i, ch in enumerate(chunk):
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == '\\':
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+            elif ch == '"':
+                self._in_string = self._started
+            elif ch in '{[':
+                self._started = True
+                self._depth += 1
+            elif ch in '}]' and self._started:
+                self._depth -= 1
+                if self._depth == 0:
+                    self.text += chunk[:i + 1]
+                    self.complete = True
+                    return True
+        self.text += chunk
+        return False
+
+def repair_verdict(item: dict) -> dict:
+    """
+    스키마와 조금 다른 응답 보정 (공백, 문자열 숫자, 백분율, 누락된 리스트 등)
+    """
+    item = dict(item)
+    risk_level = str(item.get("risk_level", "")).strip()
+    for level in RISK_LEVELS:
+        if level in risk_level:
+            item["risk_level"] = level
+            break
+    try:
+        confidence = float(str(item.get("confidence", "")).strip().rstrip('%'))
+        if 1.0 < confidence <= 100.0:
+            confidence /= 100.0
+        item["confidence"] = min(max(confidence, 0.0), 1.0)
+    except ValueError:
+        pass
+    patterns = item.get("detected_patterns")
+    if patterns is None:
+        item["detected_patterns"] = []
+    elif isinstance(patterns, str):
+        item["detected_patterns"] = [patterns] if patterns else []
+    elif isinstance(patterns, list):
+        item["detected_patterns"] = [str(pattern) for pattern in patterns]
+    if not isinstance(item.get("explanation"), str):
+        item["explanation"] = str(item.get("explanation") or "")
+    action = str(item.get("recommended_action", "")).strip()
+    for candidate in RECOMMENDED_ACTIONS:
+        if candidate in action:
+            item["recommended_action"] = candidate
+            break
+    return item
+
+def validate_verdict(item) -> LLMResponse | None:
+    """
+    LLMResponse 검증, 실패 시 보정 후 한 번 더 검증
+    """
+    if not isinstance(item, dict):
+        return None
+    try:
+        return LLMResponse.model_validate(item)
+    except ValidationError:
+        pass
+    try:
+        return LLMResponse.model_validate(repair_verdict(item))
+    except ValidationError:
+        return None
+
+def parse_verdict(text: str) -> LLMResponse | None:
+    """
+    메시지 한 개 분석 응답 파싱, 실패 시 None
+    """
+    return validate_verdict(extract_json(text, '{'))
+
+def parse_verdicts(text: str, size: int) -> list[LLMResponse] | None:
+    """
+    메시지 여러 개 분석 응답(JSON 배열) 파싱
+    배열이 아니거나 개수가 맞지 않거나 하나라도 검증에 실패하면 None
+    """
+    items = extract_json(text, '[')
+    if not isinstance(items, list) or len(items) != size:
+        return None
+    results = [validate_verdict(item) for item in items]
+    if any(result is None for result in results):
+        return None
+    return results
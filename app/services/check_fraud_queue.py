@@ -1,7 +1,118 @@
-
+import time
+import uuid
+import heapq
+import asyncio
+import itertools
 import threading
 
+from app import (
+    CHECK_FRAUD_QUEUE_SIZE,
+    CHECK_FRAUD_TIMEOUT,
+    CHECK_FRAUD_JOURNAL_DIR,
+    CHECK_FRAUD_JOURNAL_FLUSH,
+    CHECK_FRAUD_JOURNAL_SEGMENT_SIZE
+)
+from .check_fraud_text import normalize_message
+from .check_fraud_journal import CheckFraudJournal
+from .check_fraud_result import CheckFraudResultStore
+
+# 우선순위 (숫자가 작을수록 먼저 처리)
+PRIORITIES = {
+    "interactive": 0,  # 키보드 전송 전 확인
+    "background": 1,  # 대화 기록 재검사 등
+}
+
+def job_key(message: str, conversation_id: str | None = None) -> str:
+    """
+    같은 작업으로 합칠 기준 (대화 중 메시지는 같은 대화 안에서만 합침)
+    """
+    key = normalize_message(message)
+    if conversation_id is None:
+        return key
+    return f"{conversation_id}\n{key}"
+
+class CheckFraudJob:
+    """
+    사기 탐지 작업
+    결과는 process_queue에서 future로 바로 전달됨
+    같은 메시지를 기다리는 여러 요청이 하나의 작업을 공유할 수 있음
+    """
+    def __init__(
+        self,
+        message: str,
+        priority: str = "interactive",
+        timeout: float = CHECK_FRAUD_TIMEOUT,
+        conversation_id: str | None = None
+    ):
+        loop = asyncio.get_running_loop()
+        self.id = uuid.uuid4().hex
+        self.message = message
+        self.conversation_id = conversation_id  # 있으면 이전 메시지를 함께 고려해 분석
+        self.key = job_key(message, conversation_id)
+        self.future: asyncio.Future = loop.create_future()
+        self.waiters = 0
+        self.priority = PRIORITIES[priority]
+        self.enqueued_at = loop.time()
+        self.deadline = self.enqueued_at + timeout
+        self.started = False  # 워커가 처리를 시작했는지 여부
+        # 스트리밍 중 risk_level이 먼저 확인되면 설정됨 (explanation 생성 전)
+        self.risk_level: str | None = None
+        self.risk_level_event = asyncio.Event()
+
+    async def wait(self, timeout: float):
+        """
+        결과 대기, 시간 초과 시 asyncio.TimeoutError 발생
+        기다리는 요청이 모두 떠나면 작업 취소 (워커가 건너뜀)
+        """
+        self.waiters += 1
+        try:
+            return await asyncio.wait_for(asyncio.shield(self.future), timeout=timeout)
+        finally:
+            self.waiters -= 1
+            if self.waiters == 0 and not self.future.done():
+                self.future.cancel()
+
+    @property
+    def expired(self) -> bool:
+        """
+        기다리는 요청이 없거나 마감 시간이 지난 작업인지 확인
+        """
+        return self.future.done() or asyncio.get_running_loop().time() >= self.deadline
+
+    def extend(self, priority: str, timeout: float) -> bool:
+        """
+        같은 메시지로 합류한 요청에 맞춰 마감 시간 연장 및 우선순위 상향
+        우선순위가 올라간 경우 True (큐에 다시 넣어야 함)
+        """
+        self.deadline = max(self.deadline, asyncio.get_running_loop().time() + timeout)
+        if PRIORITIES[priority] < self.priority and not self.started:
+            self.priority = PRIORITIES[priority]
+            return True
+        return False
+
+    def set_risk_level(self, risk_level: str):
+        """
+        최종 결과 전에 확인된 risk_level 전달
+        """
+        self.risk_level = risk_level
+        self.risk_level_event.set()
+
+    def set_result(self, result):
+        """
+        대기 중인 요청에 결과 전달
+        기다리던 요청이 모두 떠난 경우 job_id로 나중에 조회할 수 있도록 보관
+        """
+        if not self.future.done():
+            self.future.set_result(result)
+        elif self.future.cancelled():
+            CheckFraudResultStore().insert(self.id, result)
+
 class CheckFraudQueue:
+    """
+    사기 탐지 작업 대기열
+    (우선순위, 마감 시간) 순서의 힙으로 관리, 삽입/삭제 O(log n)
+    마감 시간이 지났거나 기다리는 요청이 없는 작업은 워커에 전달하지 않고 버림
+    """
     _instance = None
     _lock = threading.Lock()
     
@@ -11,31 +122,169 @@ class CheckFraudQueue:
                 if cls._instance is None:
                     cls._instance = super().__new__(cls)
                     # 인스턴스 변수들을 여기서 직접 초기화
-                    cls._instance._queue = []
+                    cls._instance._heap = []  # (priority, deadline, seq, job)
+                    cls._instance._counter = itertools.count()
+                    cls._instance._not_empty = asyncio.Event()
+                    cls._instance.maxsize = CHECK_FRAUD_QUEUE_SIZE
+                    cls._instance.expired = 0  # 처리 전에 버린 작업 수
+                    cls._instance.journal = None
+                    if CHECK_FRAUD_JOURNAL_DIR:
+                        cls._instance.journal = CheckFraudJournal(
+                            CHECK_FRAUD_JOURNAL_DIR,
+                            flush_interval=CHECK_FRAUD_JOURNAL_FLUSH,
+                            segment_size=CHECK_FRAUD_JOURNAL_SEGMENT_SIZE
+                        )
         return cls._instance
     
     def __init__(self):
         # __init__은 매번 호출될 수 있으므로 아무것도 하지 않음
         pass
 
-    def push(self, item):
+    def push(self, item: CheckFraudJob):
         """
         큐에 요소 삽입
+        큐가 가득 찬 경우 asyncio.QueueFull 발생
         """
-        self._queue.append(item)
+        if len(self._heap) >= self.maxsize:
+            self._purge()
+            if len(self._heap) >= self.maxsize:
+                raise asyncio.QueueFull
+        heapq.heappush(self._heap, (item.priority, item.deadline, next(self._counter), item))
+        self._not_empty.set()
+        if self.journal is not None:
+            self._journal_push(item)
 
-    def get_all(self):
+    def _journal_push(self, item: CheckFraudJob):
         """
-        큐에 있는 모든 요소 반환
+        저널에 작업 등록 기록, 결과가 나오거나 취소/만료되면 완료 기록
         """
-        return self._queue.copy()  # 원본 큐를 보호하기 위해 복사본 반환
-    
-    def pop(self):
+        if item.id in self.journal:
+            return
+        now = time.time()
+        self.journal.record_push({
+            "id": item.id,
+            "message": item.message,
+            "conversation_id": item.conversation_id,
+            "priority": item.priority,
+            "deadline": now + (item.deadline - asyncio.get_running_loop().time()),
+        })
+        item.future.add_done_callback(lambda _: self.journal.record_done(item.id))
+
+    def restore(self) -> list[CheckFraudJob]:
+        """
+        저널에서 완료되지 않은 작업을 복구해 다시 대기열에 넣고 반환 (시작 시 한 번 호출)
+        """
+        if self.journal is None:
+            return []
+        jobs = []
+        now = time.time()
+        for record in self.journal.replay():
+            priority = next(name for name, value in PRIORITIES.items() if value == record["priority"])
+            job = CheckFraudJob(
+                record["message"],
+                priority=priority,
+                timeout=record["deadline"] - now,
+                conversation_id=record.get("conversation_id")
+            )
+            job.id = record["id"]
+            heapq.heappush(self._heap, (job.priority, job.deadline, next(self._counter), job))
+            self._journal_push(job)
+            jobs.append(job)
+        if jobs:
+            self._not_empty.set()
+        return jobs
+
+    def push_many(self, items: list[CheckFraudJob]):
+        """
+        여러 요소를 한 번에 삽입
+        모두 넣을 수 없으면 아무것도 넣지 않고 asyncio.QueueFull 발생
+        """
+        if len(self._heap) + len(items) > self.maxsize:
+            self._purge()
+            if len(self._heap) + len(items) > self.maxsize:
+                raise asyncio.QueueFull
+        for item in items:
+            self.push(item)
+
+    def _purge(self):
+        """
+        만료되었거나 이미 처리 중인 요소 제거 (큐가 가득 찼을 때만 호출)
+        """
+        live = []
+        for entry in self._heap:
+            job = entry[3]
+            if job.started:
+                continue
+            if job.expired:
+                self._drop(job)
+                continue
+            live.append(entry)
+        heapq.heapify(live)
+        self._heap = live
+
+    def _drop(self, job: CheckFraudJob):
+        self.expired += 1
+        if not job.future.done():
+            job.future.cancel()
+
+    def qsize(self) -> int:
+        """
+        큐에 대기 중인 요소 개수 반환
+        """
+        return len(self._heap)
+
+    def ahead(self, priority: int) -> int:
+        """
+        우선순위가 priority인 새 작업보다 먼저 처리될 작업 수
+        (대기열 크기가 CHECK_FRAUD_QUEUE_SIZE로 제한되므로 전체를 확인)
+        """
+        return sum(1 for entry in self._heap if entry[0] <= priority and not entry[3].started)
+
+    def _pop_nowait(self) -> CheckFraudJob | None:
+        """
+        처리할 수 있는 가장 앞선 요소 반환 (없으면 None)
+        """
+        while self._heap:
+            job = heapq.heappop(self._heap)[3]
+            if job.started:
+                # 우선순위 상향으로 다시 넣은 작업의 이전 항목
+                continue
+            if job.expired:
+                self._drop(job)
+                continue
+            job.started = True
+            return job
+        self._not_empty.clear()
+        return None
+
+    async def pop(self) -> CheckFraudJob:
+        """
+        큐에서 가장 앞선 요소 제거 및 반환 (비어있으면 대기)
+        """
+        while True:
+            job = self._pop_nowait()
+            if job is not None:
+                return job
+            await self._not_empty.wait()
+
+    async def pop_batch(self, max_size: int, max_wait: float) -> list[CheckFraudJob]:
         """
-        큐에서 가장 오래된 요소 제거 및 반환
+        큐에서 최대 max_size개의 요소를 꺼내 반환
+        첫 요소가 들어올 때까지 대기한 뒤, 최대 max_wait초 동안 추가 요소를 모음
         """
-        if self._queue:
-            item = self._queue.pop(0)
-            return item
-        else:
-            return None
\ No newline at end of file
+        items = [await self.pop()]
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + max_wait
+        while len(items) < max_size:
+            job = self._pop_nowait()
+            if job is not None:
+                items.append(job)
+                continue
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            try:
+                await asyncio.wait_for(self._not_empty.wait(), timeout=remaining)
+            except asyncio.TimeoutError:
+                break
+        return items
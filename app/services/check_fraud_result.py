@@ -0,0 +1,103 @@
+import time
+import asyncio
+import threading
+from collections import OrderedDict
+
+from app import CHECK_FRAUD_RESULT_SIZE, CHECK_FRAUD_RESULT_TTL
+from app.schemas.check_fraud import ChatResponse
+
+class CheckFraudResultStore:
+    """
+    기다리던 요청이 모두 떠난 뒤(타임아웃/연결 종료) 도착한 결과 (작업 ID -> (만료 시각, 결과))
+    응답에 포함된 job_id로 나중에 한 번 조회할 수 있음
+    최대 CHECK_FRAUD_RESULT_SIZE개, CHECK_FRAUD_RESULT_TTL초 동안만 유지
+    유지 시간이 모두 같으므로 삽입 순서가 곧 만료 순서 -> 앞에서부터 만료된 것만 제거 (전체를 훑지 않음)
+    """
+    _instance = None
+    _lock = threading.Lock()
+
+    def __new__(cls):
+        if cls._instance is None:
+            with cls._lock:
+                if cls._instance is None:
+                    cls._instance = super().__new__(cls)
+                    # 인스턴스 변수들을 여기서 직접 초기화
+                    cls._instance._results = OrderedDict()
+                    cls._instance.max_size = CHECK_FRAUD_RESULT_SIZE
+                    cls._instance.ttl = CHECK_FRAUD_RESULT_TTL
+                    cls._instance._timer = None  # 가장 오래된 결과가 만료될 때 실행되는 정리 타이머
+                    cls._instance.stored = 0
+                    cls._instance.fetched = 0
+                    cls._instance.orphaned = 0  # 조회되지 않고 만료/밀려난 결과 수
+        return cls._instance
+
+    def __init__(self):
+        # __init__은 매번 호출될 수 있으므로 아무것도 하지 않음
+        pass
+
+    def insert(self, job_id: str, result: ChatResponse):
+        if self.max_size <= 0:
+            self.orphaned += 1
+            return
+        self._expire()
+        self._results[job_id] = (time.monotonic() + self.ttl, result)
+        self._results.move_to_end(job_id)
+        self.stored += 1
+        while len(self._results) > self.max_size:
+            self._results.popitem(last=False)
+            self.orphaned += 1
+        self._schedule()
+
+    def pop(self, job_id: str) -> ChatResponse | None:
+        """
+        결과 반환 후 삭제 (없거나 만료된 경우 None)
+        """
+        self._expire()
+        item = self._results.pop(job_id, None)
+        if item is None:
+            return None
+        self.fetched += 1
+        return item[1]
+
+    def _expire(self):
+        """
+        만료된 결과 제거 (가장 오래된 것부터 확인)
+        """
+        now = time.monotonic()
+        while self._results:
+            expires_at, _ = next(iter(self._results.values()))
+            if expires_at > now:
+                break
+            self._results.popitem(last=False)
+            self.orphaned += 1
+
+    def _schedule(self):
+        """
+        요청이 없어도 메모리가 남지 않도록 가장 오래된 결과의 만료 시각에 정리 (타이머는 하나만 유지)
+        """
+        if self._timer is not None or not self._results:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        expires_at, _ = next(iter(self._results.values()))
+        self._timer = loop.call_later(max(0.0, expires_at - time.monotonic()), self._sweep)
+
+    def _sweep(self):
+        self._timer = None
+        self._expire()
+        self._schedule()
+
+    def __len__(self) -> int:
+        return len(self._results)
+
+    def stats(self) -> dict:
+        return {
+            "size": len(self._results),
+            "max_size": self.max_size,
+            "ttl": self.ttl,
+            "stored": self.stored,
+            "fetched": self.fetched,
+            "orphaned": self.orphaned,
+        }
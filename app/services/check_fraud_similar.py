@@ -0,0 +1,128 @@
+import time
+import threading
+
+from app import (
+    LOGGER,
+    CHECK_FRAUD_CACHE_TTL,
+    CHECK_FRAUD_SIMILAR_SIZE,
+    CHECK_FRAUD_SIMILAR_DIM,
+    CHECK_FRAUD_SIMILAR_THRESHOLD,
+    CHECK_FRAUD_SIMILAR_MIN_CONFIDENCE
+)
+from app.schemas.check_fraud import LLMResponse
+from .check_fraud_features import np, vectorize
+
+class CheckFraudSimilarIndex:
+    """
+    이전에 LLM이 판별한 메시지의 벡터 인덱스
+    새 메시지와 코사인 유사도가 CHECK_FRAUD_SIMILAR_THRESHOLD 이상인 결과가 있으면 재사용
+    최대 CHECK_FRAUD_SIMILAR_SIZE개 유지, 가득 차면 만료된 항목 또는 가장 오래 사용되지 않은 항목 교체
+    같은 메시지는 유사도가 1이므로 캐시와 같은 CHECK_FRAUD_CACHE_TTL초가 지나면 검색에서 제외
+    """
+    _instance = None
+    _lock = threading.Lock()
+    
+    def __new__(cls):
+        if cls._instance is None:
+            with cls._lock:
+                if cls._instance is None:
+                    cls._instance = super().__new__(cls)
+                    # 인스턴스 변수들을 여기서 직접 초기화
+                    cls._instance.enabled = np is not None and CHECK_FRAUD_SIMILAR_SIZE > 0
+                    if np is None and CHECK_FRAUD_SIMILAR_SIZE > 0:
+                        LOGGER.warning("numpy가 설치되지 않아 유사 메시지 재사용을 사용하지 않음")
+                    cls._instance.capacity = CHECK_FRAUD_SIMILAR_SIZE
+                    cls._instance.dim = CHECK_FRAUD_SIMILAR_DIM
+                    cls._instance.threshold = CHECK_FRAUD_SIMILAR_THRESHOLD
+                    cls._instance.min_confidence = CHECK_FRAUD_SIMILAR_MIN_CONFIDENCE
+                    cls._instance.ttl = CHECK_FRAUD_CACHE_TTL
+                    cls._instance._keys = {}  # 메시지 -> 행 번호
+                    cls._instance._row_keys = []  # 행 번호 -> 메시지
+                    cls._instance._verdicts = []  # 행 번호 -> LLMResponse
+                    if cls._instance.enabled:
+                        cls._instance._matrix = np.zeros((cls._instance.capacity, cls._instance.dim), dtype=np.float32)
+                        cls._instance._last_used = np.zeros(cls._instance.capacity, dtype=np.int64)
+                        cls._instance._expires_at = np.zeros(cls._instance.capacity, dtype=np.float64)  # time.monotonic 기준
+                    cls._instance._clock = 0
+                    cls._instance.hits = 0
+                    cls._instance.misses = 0
+                    cls._instance.evictions = 0
+                    cls._instance.expirations = 0
+        return cls._instance
+    
+    def __init__(self):
+        # __init__은 매번 호출될 수 있으므로 아무것도 하지 않음
+        pass
+
+    def _tick(self) -> int:
+        self._clock += 1
+        return self._clock
+
+    def insert(self, key: str, result: LLMResponse):
+        """
+        확신도가 높은 결과만 인덱스에 추가
+        """
+        if not self.enabled or result.confidence < self.min_confidence:
+            return
+        now = time.monotonic()
+        row = self._keys.get(key)
+        if row is None:
+            if len(self._verdicts) < self.capacity:
+                row = len(self._verdicts)
+                self._verdicts.append(None)
+                self._row_keys.append(key)
+            else:
+                # 만료된 행이 있으면 그 행을, 없으면 가장 오래 사용되지 않은 행 교체
+                expired = np.flatnonzero(self._expires_at <= now)
+                if len(expired):
+                    row = int(expired[0])
+                    self.expirations += 1
+                else:
+                    row = int(np.argmin(self._last_used))
+                    self.evictions += 1
+                del self._keys[self._row_keys[row]]
+                self._row_keys[row] = key
+            self._keys[key] = row
+            self._matrix[row] = vectorize([key], self.dim)[0]
+        self._verdicts[row] = result
+        self._last_used[row] = self._tick()
+        self._expires_at[row] = now + self.ttl
+
+    def lookup_many(self, keys: list[str]) -> list[LLMResponse | None]:
+        """
+        여러 메시지를 한 번의 행렬 곱으로 검색, 유사한 결과가 없으면 None
+        """
+        if not self.enabled or not keys or not self._verdicts:
+            self.misses += len(keys)
+            return [None] * len(keys)
+        size = len(self._verdicts)
+        scores = vectorize(keys, self.dim) @ self._matrix[:size].T  # (len(keys), size)
+        # 만료된 행은 선택되지 않도록 제외
+        scores[:, self._expires_at[:size] <= time.monotonic()] = -np.inf
+        best = np.argmax(scores, axis=1)
+        results = []
+        for i, row in enumerate(best):
+            if scores[i, row] >= self.threshold:
+                self.hits += 1
+                self._last_used[row] = self._tick()
+                results.append(self._verdicts[row])
+            else:
+                self.misses += 1
+                results.append(None)
+        return results
+
+    def lookup(self, key: str) -> LLMResponse | None:
+        return self.lookup_many([key])[0]
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "size": len(self._verdicts),
+            "capacity": self.capacity,
+            "threshold": self.threshold,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
@@ -0,0 +1,12 @@
+import re
+import unicodedata
+
+_whitespace = re.compile(r'\s+')
+
+def normalize_message(original_text: str) -> str:
+    """
+    메시지 비교용 정규화
+    유니코드 NFC 정규화, 앞뒤 공백 제거, 연속 공백을 하나로 축약
+    """
+    text = unicodedata.normalize("NFC", original_text)
+    return _whitespace.sub(" ", text).strip()
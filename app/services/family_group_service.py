@@ -11,6 +11,7 @@ from app.schemas.family_group import (
     FamilyGroupInfoResponse,
     FamilyMember
 )
+from app.services import metrics
 
 class FamilyGroupService:
     def __init__(self):
@@ -440,3 +441,11 @@ class FamilyGroupService:
 
 # 싱글톤 서비스 인스턴스
 family_group_service = FamilyGroupService()
+
+# 모니터링 지표 (/metrics 수집 시점에 계산)
+metrics.FAMILY_PENDING_GROUPS.set_function(lambda: len(family_group_service.pending_groups))
+metrics.FAMILY_ACTIVE_TIMERS.set_function(
+    lambda: sum(1 for timer in family_group_service.group_timers.values() if not timer.done())
+)
+metrics.FAMILY_GROUPS.set_function(lambda: len(family_group_service.groups))
+metrics.FAMILY_USERS.set_function(lambda: len(family_group_service.user_groups))
\ No newline at end of file
@@ -0,0 +1,177 @@
+import math
+import threading
+from typing import Callable
+
+class Metric:
+    """
+    Prometheus 텍스트 형식으로 내보내는 지표 (prometheus_client 없이 사용)
+    """
+    type = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self._values: dict[tuple, float] = {}
+        self._lock = threading.Lock()
+        REGISTRY.register(self)
+
+    def _key(self, labels: dict) -> tuple:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def _labels(self, key: tuple, extra: dict | None = None) -> str:
+        pairs = list(zip(self.labelnames, key)) + list((extra or {}).items())
+        if not pairs:
+            return ""
+        escaped = (str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, value in pairs)
+        return "{" + ",".join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + "}"
+
+    def samples(self) -> list[str]:
+        return [f"{self.name}{self._labels(key)} {_format(value)}" for key, value in sorted(self._values.items())]
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type}"]
+        lines.extend(self.samples())
+        return "\n".join(lines)
+
+class Counter(Metric):
+    type = "counter"
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def totals(self, labelname: str) -> dict[str, float]:
+        """
+        라벨 하나 기준으로 합산한 값 (예: 단계별 판별 수)
+        """
+        index = self.labelnames.index(labelname)
+        totals: dict[str, float] = {}
+        with self._lock:
+            for key, value in self._values.items():
+                totals[key[index]] = totals.get(key[index], 0.0) + value
+        return totals
+
+class CallbackMetric(Metric):
+    """
+    수집 시점에 함수로 값을 읽는 지표
+    """
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._function: Callable[[], float | dict[tuple, float]] | None = None
+
+    def set_function(self, function: Callable[[], float | dict[tuple, float]]):
+        """
+        수집 시점에 값을 계산하는 함수 지정
+        라벨이 있으면 (라벨 값 튜플 -> 값) dict 반환
+        """
+        self._function = function
+
+    def samples(self) -> list[str]:
+        if self._function is not None:
+            value = self._function()
+            self._values = value if isinstance(value, dict) else {(): value}
+        return super().samples()
+
+class Gauge(CallbackMetric):
+    type = "gauge"
+
+    def set(self, value: float, **labels):
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+class CounterFunction(CallbackMetric):
+    """
+    다른 객체가 이미 세고 있는 누적 값(캐시 적중 수 등)을 카운터로 내보냄
+    함수는 줄어들지 않는 값을 반환해야 함 (프로세스 재시작 시 0으로 돌아가는 것은 Prometheus가 처리)
+    """
+    type = "counter"
+
+class Histogram(Metric):
+    type = "histogram"
+    DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0)
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        self._counts: dict[tuple, list[int]] = {}
+        self._sums: dict[tuple, float] = {}
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            counts = self._counts.setdefault(key, [0] * len(self.buckets))
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+            self._sums[key] = self._sums.get(key, 0.0) + value
+
+    def samples(self) -> list[str]:
+        lines = []
+        for key, counts in sorted(self._counts.items()):
+            for bound, count in zip(self.buckets, counts):
+                le = "+Inf" if bound == math.inf else _format(bound)
+                lines.append(f"{self.name}_bucket{self._labels(key, {'le': le})} {count}")
+            lines.append(f"{self.name}_sum{self._labels(key)} {_format(self._sums[key])}")
+            lines.append(f"{self.name}_count{self._labels(key)} {counts[-1]}")
+        return lines
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics: list[Metric] = []
+
+    def register(self, metric: Metric):
+        self._metrics.append(metric)
+
+    def render(self) -> str:
+        """
+        등록된 모든 지표를 Prometheus 텍스트 형식으로 반환
+        """
+        return "\n".join(metric.render() for metric in self._metrics) + "\n"
+
+def _format(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+REGISTRY = MetricsRegistry()
+
+# 사기 탐지 파이프라인
+QUEUE_DEPTH = Gauge("fraud_queue_depth", "Number of fraud checks waiting in the queue")
+QUEUE_WAIT = Histogram("fraud_queue_wait_seconds", "Time a fraud check waited in the queue before a worker took it")
+QUEUE_REJECTED = Counter("fraud_queue_rejected_total", "Fraud checks rejected because the queue was full", ("endpoint",))
+QUEUE_EXPIRED = CounterFunction("fraud_queue_expired_total", "Queued fraud checks dropped because their deadline passed")
+INFLIGHT = Gauge("fraud_inflight_checks", "Distinct messages currently being checked")
+MODEL_WARM = Gauge("ollama_model_warm", "Whether the model is loaded and warmed up on the Ollama backend (1) or not (0)", ("backend",))
+LLM_LATENCY = Histogram("fraud_llm_request_seconds", "Latency of Ollama generate calls", ("backend",))
+LLM_ERRORS = Counter("fraud_llm_errors_total", "Failed Ollama generate calls", ("backend",))
+LLM_RETRIES = Counter("fraud_llm_retries_total", "Extra Ollama generations caused by unparseable replies")
+PARSE_FAILURES = Counter("fraud_parse_failures_total", "LLM replies that failed JSON parsing/validation", ("kind",))
+BATCH_FALLBACKS = Counter("fraud_batch_fallbacks_total", "Micro-batches that fell back to per-message generation")
+WORKER_ERRORS = Counter("fraud_worker_errors_total", "Unexpected errors in process_queue")
+VERDICTS = Counter("fraud_verdicts_total", "Fraud verdicts produced by the pipeline", ("risk_level", "tier"))
+TIMEOUTS = Counter("fraud_check_timeouts_total", "Fraud checks answered with result null after the deadline", ("endpoint",))
+CACHE_HITS = CounterFunction("fraud_cache_hits_total", "Verdict cache hits")
+CACHE_MISSES = CounterFunction("fraud_cache_misses_total", "Verdict cache misses")
+CACHE_HIT_RATIO = Gauge("fraud_cache_hit_ratio", "Verdict cache hit ratio")
+CACHE_SIZE = Gauge("fraud_cache_entries", "Entries in the verdict cache")
+LATE_RESULTS = Gauge("fraud_late_results", "Results kept for callers that timed out, waiting to be fetched by job_id")
+ORPHANED_RESULTS = CounterFunction("fraud_orphaned_results_total", "Late results that expired or were evicted without being fetched")
+ADMISSION_DECISIONS = CounterFunction("fraud_admission_decisions_total", "Admission control outcomes for new LLM jobs (admitted, degraded to a rule-based verdict, rejected)", ("outcome",))
+CONVERSATIONS = Gauge("fraud_conversations", "Conversations whose history/context is retained")
+CLASSIFIER_DECISIONS = CounterFunction("fraud_classifier_decisions_total", "Tier-1 classifier outcomes (safe/risk answered locally, uncertain forwarded to the LLM)", ("outcome",))
+
+# 가족 그룹
+FAMILY_PENDING_GROUPS = Gauge("family_pending_groups", "Family groups waiting for completion")
+FAMILY_ACTIVE_TIMERS = Gauge("family_active_timers", "Running family group expiry timers")
+FAMILY_GROUPS = Gauge("family_groups", "Completed family groups")
+FAMILY_USERS = Gauge("family_users", "Users that belong to a family group")
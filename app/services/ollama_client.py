@@ -0,0 +1,383 @@
+import json
+import time
+import httpx
+import random
+import asyncio
+import statistics
+from collections import deque
+from typing import Callable
+
+from app import (
+    OLLAMA_URL,
+    OLLAMA_URLS,
+    OLLAMA_MODEL,
+    OLLAMA_STREAM,
+    OLLAMA_OPTIONS,
+    OLLAMA_KEEP_ALIVE,
+    OLLAMA_CONNECT_TIMEOUT,
+    OLLAMA_READ_TIMEOUT,
+    OLLAMA_TOTAL_TIMEOUT,
+    OLLAMA_MAX_CONNECTIONS,
+    OLLAMA_HEALTH_INTERVAL,
+    OLLAMA_CIRCUIT_FAILURES,
+    OLLAMA_CIRCUIT_RESET,
+    OLLAMA_SLOW_FACTOR,
+    OLLAMA_HEDGE_PERCENTILE,
+    LOGGER
+)
+from .check_fraud_parse import JSONStreamScanner, find_risk_level
+from . import metrics
+
+class OllamaBackend:
+    """
+    Ollama 서버 한 대의 상태
+    처리 중인 요청 수, 헬스 체크 결과, 서킷 브레이커, 응답 시간(EWMA)을 관리
+    """
+    def __init__(self, url: str):
+        self.url = url
+        self.client: httpx.AsyncClient | None = None
+        self.outstanding = 0
+        self.healthy = True
+        self.failures = 0  # 연속 실패 횟수
+        self.opened_at: float | None = None  # 서킷이 열린 시각
+        self.half_open_trial = False  # 서킷 반개방 상태에서 시험 요청 진행 중
+        self.ejected_until = 0.0  # 느린 서버로 판단되어 제외된 기한
+        self.latency: float | None = None  # 응답 시간 EWMA (초)
+        self.warm: bool | None = None  # 모델이 메모리에 올라가 있는지 (None이면 확인 전, ollama_model에서 관리)
+        self.requests = 0
+        self.errors = 0
+
+    def start(self):
+        if self.client is None:
+            self.client = httpx.AsyncClient(
+                base_url=self.url,
+                timeout=httpx.Timeout(OLLAMA_READ_TIMEOUT, connect=OLLAMA_CONNECT_TIMEOUT),
+                limits=httpx.Limits(
+                    max_connections=OLLAMA_MAX_CONNECTIONS,
+                    max_keepalive_connections=OLLAMA_MAX_CONNECTIONS
+                )
+            )
+
+    async def close(self):
+        if self.client is not None:
+            await self.client.aclose()
+            self.client = None
+
+    @property
+    def circuit(self) -> str:
+        """서킷 상태: closed, open, half_open"""
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at < OLLAMA_CIRCUIT_RESET:
+            return "open"
+        return "half_open"
+
+    def available(self) -> bool:
+        """요청을 보낼 수 있는 상태인지 확인"""
+        if not self.healthy or self.ejected_until > time.monotonic():
+            return False
+        circuit = self.circuit
+        if circuit == "open":
+            return False
+        if circuit == "half_open":
+            return not self.half_open_trial
+        return True
+
+    def record_success(self, latency: float):
+        self.requests += 1
+        self.failures = 0
+        self.opened_at = None
+        self.half_open_trial = False
+        self.latency = latency if self.latency is None else self.latency * 0.8 + latency * 0.2
+
+    def record_failure(self):
+        self.requests += 1
+        self.errors += 1
+        self.failures += 1
+        self.half_open_trial = False
+        circuit = self.circuit
+        if circuit == "half_open" or (circuit == "closed" and self.failures >= OLLAMA_CIRCUIT_FAILURES):
+            self.opened_at = time.monotonic()
+            LOGGER.warning(f"Ollama 서킷 열림: {self.url} (연속 실패 {self.failures}회)")
+
+    def stats(self) -> dict:
+        return {
+            "url": self.url,
+            "healthy": self.healthy,
+            "warm": self.warm,
+            "circuit": self.circuit,
+            "ejected": self.ejected_until > time.monotonic(),
+            "outstanding": self.outstanding,
+            "latency": self.latency,
+            "requests": self.requests,
+            "errors": self.errors,
+        }
+
+class OllamaClient:
+    """
+    Ollama API 클라이언트
+    앱 lifespan 동안 서버별 커넥션 풀(keep-alive)을 유지하고 모든 워커가 공유
+    여러 서버(OLLAMA_URLS) 중 처리 중인 요청이 가장 적은 서버로 분배
+    """
+    def __init__(self):
+        self.backends = [OllamaBackend(url) for url in (OLLAMA_URLS or [OLLAMA_URL])]
+        self.model = OLLAMA_MODEL
+        self.options = OLLAMA_OPTIONS
+        self.keep_alive = OLLAMA_KEEP_ALIVE
+        self.stream = OLLAMA_STREAM
+        self.total_timeout = OLLAMA_TOTAL_TIMEOUT
+        self.hedge_percentile = OLLAMA_HEDGE_PERCENTILE
+        self.hedged = 0
+        self.prompt_tokens = 0  # prefill한 토큰 수 (응답에 prompt_eval_count가 있는 경우만)
+        self.eval_tokens = 0  # 생성한 토큰 수 (완료 전에 중단하면 받은 스트리밍 청크 수)
+        self._latencies = deque(maxlen=200)  # 최근 응답 시간 (헤징 기준)
+        self._health_task: asyncio.Task | None = None
+
+    def start(self):
+        """커넥션 풀 생성 및 헬스 체크 시작"""
+        for backend in self.backends:
+            backend.start()
+        if self._health_task is None and len(self.backends) > 1:
+            self._health_task = asyncio.get_running_loop().create_task(self._health_loop())
+        LOGGER.info(f"Ollama 클라이언트 시작: {', '.join(b.url for b in self.backends)} ({self.model})")
+
+    async def close(self):
+        """헬스 체크 중단 및 커넥션 풀 종료"""
+        if self._health_task is not None:
+            self._health_task.cancel()
+            self._health_task = None
+        for backend in self.backends:
+            await backend.close()
+
+    async def _health_loop(self):
+        while True:
+            await asyncio.gather(*(self.probe(backend) for backend in self.backends))
+            self._eject_slow()
+            await asyncio.sleep(OLLAMA_HEALTH_INTERVAL)
+
+    async def probe(self, backend: OllamaBackend) -> bool:
+        """/api/tags 호출로 서버 상태 확인"""
+        backend.start()
+        try:
+            response = await backend.client.get("/api/tags", timeout=OLLAMA_CONNECT_TIMEOUT)
+            healthy = response.status_code == 200
+        except httpx.HTTPError:
+            healthy = False
+        if healthy != backend.healthy:
+            LOGGER.warning(f"Ollama 서버 상태 변경: {backend.url} -> {'정상' if healthy else '응답 없음'}")
+        backend.healthy = healthy
+        return healthy
+
+    def _eject_slow(self):
+        """다른 서버들 응답 시간 중앙값의 OLLAMA_SLOW_FACTOR배 이상 느린 서버를 일정 시간 제외"""
+        latencies = {b: b.latency for b in self.backends if b.latency is not None and b.healthy}
+        if len(latencies) < 2:
+            return
+        for backend, latency in latencies.items():
+            # 자기 자신을 포함하면 서버가 두 대일 때 중앙값이 느린 쪽으로 끌려가 제외되지 않음
+            median = statistics.median(other for b, other in latencies.items() if b is not backend)
+            if latency > median * OLLAMA_SLOW_FACTOR:
+                backend.ejected_until = time.monotonic() + OLLAMA_CIRCUIT_RESET
+                # 다시 들어왔을 때 새로 측정하도록 초기화
+                backend.latency = None
+                LOGGER.warning(f"느린 Ollama 서버 제외: {backend.url}")
+
+    def _pick(self, exclude: OllamaBackend | None = None, prefer: str | None = None) -> OllamaBackend | None:
+        """처리 중인 요청이 가장 적은 서버 선택 (사용 가능한 서버가 없으면 전체 중에서 선택)"""
+        for backend in self.backends:
+            # 이전 대화의 KV 캐시가 남아 있을 수 있는 서버 우선
+            if backend.url == prefer and backend.available():
+                return backend
+        candidates = [b for b in self.backends if b is not exclude and b.available()]
+        if not candidates:
+            if exclude is not None:
+                return None
+            candidates = self.backends
+        # 모델을 다시 불러오는 중인 서버는 다른 서버가 있으면 제외
+        warm = [b for b in candidates if b.warm is not False]
+        if warm:
+            candidates = warm
+        least = min(b.outstanding for b in candidates)
+        return random.choice([b for b in candidates if b.outstanding == least])
+
+    def _payload(self, prompt: str, format: dict | None, context: list[int] | None = None) -> dict:
+        data = {
+            "model": self.model,
+            "prompt": prompt,
+            "stream": self.stream,
+            "keep_alive": self.keep_alive
+        }
+        if self.options:
+            data["options"] = self.options
+        # 스키마를 지정하면 Ollama가 해당 형식의 JSON만 생성
+        if format is not None:
+            data["format"] = format
+        # 이전 응답의 context를 넘기면 이어서 생성 (이전 토큰은 다시 prefill하지 않음)
+        if context is not None:
+            data["context"] = context
+        return data
+
+    def _hedge_delay(self) -> float | None:
+        """헤징 요청을 보내기까지 기다릴 시간 (최근 응답 시간의 백분위수)"""
+        if self.hedge_percentile is None or len(self.backends) < 2 or len(self._latencies) < 20:
+            return None
+        latencies = sorted(self._latencies)
+        return latencies[min(int(len(latencies) * self.hedge_percentile), len(latencies) - 1)]
+
+    async def generate(
+        self,
+        prompt: str,
+        format: dict | None = None,
+        on_risk_level: Callable[[str], None] | None = None
+    ) -> str:
+        """
+        /api/generate 호출, 생성된 텍스트 반환
+        전체 소요 시간이 total_timeout을 넘으면 asyncio.TimeoutError 발생
+        헤징을 켜면 첫 요청이 느릴 때 다른 서버에도 보내고 먼저 끝난 결과 사용
+        """
+        data = self._payload(prompt, format)
+        notify = None
+        if on_risk_level is not None:
+            # 헤징으로 두 요청이 동시에 진행되어도 한 번만 알림
+            notified = []
+            def notify(risk_level: str):
+                if not notified:
+                    notified.append(risk_level)
+                    on_risk_level(risk_level)
+
+        primary = self._pick()
+        delay = self._hedge_delay()
+        if delay is None:
+            return (await self._call(primary, data, notify))[0]
+
+        first = asyncio.create_task(self._call(primary, data, notify))
+        tasks = {first}
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=delay)
+            secondary = None if done else self._pick(exclude=primary)
+            if secondary is None:
+                return (await first)[0]
+
+            self.hedged += 1
+            tasks.add(asyncio.create_task(self._call(secondary, data, notify)))
+            error = None
+            while tasks:
+                done, tasks = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()[0]
+                    error = error or task.exception()
+            raise error
+        finally:
+            # 호출한 쪽이 취소된 경우에도 남은 요청을 취소 (처리 중인 요청 수와 스트림이 남지 않도록)
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+
+    async def generate_context(
+        self,
+        prompt: str,
+        context: list[int] | None = None,
+        format: dict | None = None,
+        backend_url: str | None = None
+    ) -> tuple[str, list[int] | None, str]:
+        """
+        이전 응답의 context에 이어서 /api/generate 호출
+        (생성된 텍스트, 다음 호출에 넘길 context, 처리한 서버 주소) 반환
+        KV 캐시를 재사용할 수 있도록 가능하면 backend_url 서버로 보냄 (헤징 사용 안 함)
+        """
+        backend = self._pick(prefer=backend_url)
+        text, new_context = await self._call(backend, self._payload(prompt, format, context), None, keep_context=True)
+        return text, new_context, backend.url
+
+    async def _call(
+        self,
+        backend: OllamaBackend,
+        data: dict,
+        on_risk_level: Callable[[str], None] | None,
+        keep_context: bool = False
+    ) -> tuple[str, list[int] | None]:
+        backend.start()
+        trial = backend.circuit == "half_open"
+        if trial:
+            backend.half_open_trial = True
+        backend.outstanding += 1
+        started_at = time.monotonic()
+        try:
+            result = await asyncio.wait_for(
+                self._generate(backend.client, data, on_risk_level, keep_context),
+                timeout=self.total_timeout
+            )
+        except Exception:
+            backend.record_failure()
+            metrics.LLM_ERRORS.inc(backend=backend.url)
+            raise
+        finally:
+            backend.outstanding -= 1
+            # 시험 요청이 취소된 경우(헤징에서 진 요청, 워커 종료) CancelledError는 위에서 잡히지 않으므로
+            # 여기서 해제하지 않으면 서버가 다시 선택되지 않음 (서킷은 반개방 상태로 두고 다음 요청이 시험)
+            if trial:
+                backend.half_open_trial = False
+        latency = time.monotonic() - started_at
+        backend.record_success(latency)
+        metrics.LLM_LATENCY.observe(latency, backend=backend.url)
+        self._latencies.append(latency)
+        return result
+
+    async def _generate(
+        self,
+        client: httpx.AsyncClient,
+        data: dict,
+        on_risk_level: Callable[[str], None] | None,
+        keep_context: bool = False
+    ) -> tuple[str, list[int] | None]:
+        """
+        (생성된 텍스트, context) 반환
+        context는 마지막 청크에만 있으므로 keep_context가 아니면 JSON이 완성되는 즉시 중단하고 None
+        """
+        if not data["stream"]:
+            response = await client.post("/api/generate", json=data)
+            response.raise_for_status()
+            body = response.json()
+            self.prompt_tokens += body.get("prompt_eval_count", 0)
+            self.eval_tokens += body.get("eval_count", 0)
+            return body['response'], body.get("context")
+
+        # NDJSON 토큰 스트림을 받다가 JSON이 완성되면 연결을 닫아 생성 중단
+        scanner = JSONStreamScanner()
+        risk_level = None
+        context = None
+        chunks = 0
+        async with client.stream("POST", "/api/generate", json=data) as response:
+            response.raise_for_status()
+            async for line in response.aiter_lines():
+                if not line:
+                    continue
+                chunk = json.loads(line)
+                complete = scanner.feed(chunk.get("response", ""))
+                if chunk.get("done"):
+                    context = chunk.get("context")
+                    self.prompt_tokens += chunk.get("prompt_eval_count", 0)
+                    chunks = chunk.get("eval_count", chunks)
+                    break
+                # 스트리밍 청크 하나가 토큰 하나
+                chunks += 1
+                if complete and not keep_context:
+                    break
+                # risk_level이 나오면 explanation 생성 전이라도 먼저 알림
+                if on_risk_level is not None and risk_level is None:
+                    risk_level = find_risk_level(scanner.text)
+                    if risk_level is not None:
+                        on_risk_level(risk_level)
+        self.eval_tokens += chunks
+        return scanner.text, context
+
+    def stats(self) -> dict:
+        return {
+            "backends": [backend.stats() for backend in self.backends],
+            "hedged": self.hedged,
+            "prompt_tokens": self.prompt_tokens,
+            "eval_tokens": self.eval_tokens,
+        }
+
+ollama_client = OllamaClient()
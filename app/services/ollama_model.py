@@ -0,0 +1,161 @@
+import time
+import httpx
+import asyncio
+
+from app import (
+    LOGGER,
+    OLLAMA_WARMUP,
+    OLLAMA_WARMUP_TIMEOUT,
+    OLLAMA_MODEL_CHECK_INTERVAL
+)
+from .ollama_client import OllamaClient, OllamaBackend, ollama_client
+from .check_fraud import build_prompt
+from .check_fraud_parse import VERDICT_SCHEMA
+from . import metrics
+
+# 예열에 사용할 메시지
+WARMUP_MESSAGE = "안녕하세요"
+
+class OllamaModelManager:
+    """
+    Ollama 서버별 모델 상태 관리
+    시작 시 예열 생성으로 모델을 메모리에 올리고 프롬프트 앞부분의 KV 캐시를 채움
+    OLLAMA_MODEL_CHECK_INTERVAL마다 /api/ps로 모델이 올라가 있는지 확인해
+    올라가 있으면 keep_alive를 갱신하고, 내려간 경우(유휴 해제, 다른 모델로 교체 등) 다시 예열
+    """
+    RETRY_INTERVAL = 5  # 예열에 실패한 서버를 다시 확인하는 주기 (초)
+
+    def __init__(self, client: OllamaClient):
+        self.client = client
+        self.enabled = OLLAMA_WARMUP
+        self.interval = OLLAMA_MODEL_CHECK_INTERVAL
+        self.timeout = OLLAMA_WARMUP_TIMEOUT
+        self.warmups = 0
+        self.unloads = 0  # 예열된 모델이 내려간 것을 발견한 횟수
+        self.warmup_seconds: dict[str, float] = {}  # 서버별 마지막 예열 시간
+        self._task: asyncio.Task | None = None
+
+    def start(self) -> asyncio.Task | None:
+        """
+        예열 및 상태 확인 태스크 시작 (앱 lifespan에서 호출, 예열이 끝날 때까지 기다리지 않음)
+        """
+        if not self.enabled:
+            return None
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+        return self._task
+
+    def ready(self) -> bool:
+        """
+        모델이 올라가 있는 서버가 하나라도 있는지 확인 (예열을 사용하지 않으면 항상 True)
+        """
+        return not self.enabled or any(backend.warm for backend in self.client.backends)
+
+    async def _run(self):
+        await asyncio.gather(*(self.warm_up(backend) for backend in self.client.backends))
+        while True:
+            # 예열하지 못한 서버가 있으면 더 자주 다시 시도
+            cold = any(not backend.warm for backend in self.client.backends)
+            await asyncio.sleep(min(self.interval, self.RETRY_INTERVAL) if cold else self.interval)
+            await asyncio.gather(*(self.check(backend) for backend in self.client.backends))
+
+    def _is_model(self, name: str) -> bool:
+        return name == self.client.model or name == f"{self.client.model}:latest"
+
+    async def warm_up(self, backend: OllamaBackend) -> bool:
+        """
+        짧은 생성으로 모델을 불러오고 프롬프트 앞부분 prefill (응답은 사용하지 않음)
+        실제 요청과 같은 방식으로 고른 예시(CHECK_FRAUD_FEWSHOT_K개, 토큰 예산 안)를 넣은 프롬프트 사용
+        예시는 메시지마다 달라지므로 실제 요청이 다시 사용할 수 있는 KV 캐시는 모든 프롬프트에 공통인 지시문 부분
+        """
+        backend.start()
+        data = {
+            "model": self.client.model,
+            "prompt": build_prompt(WARMUP_MESSAGE),
+            "stream": False,
+            "keep_alive": self.client.keep_alive,
+            "format": VERDICT_SCHEMA,
+            "options": {**self.client.options, "num_predict": 1},
+        }
+        started_at = time.monotonic()
+        try:
+            response = await backend.client.post("/api/generate", json=data, timeout=self.timeout)
+            response.raise_for_status()
+        except httpx.HTTPError as e:
+            LOGGER.warning(f"Ollama 모델 예열 실패: {backend.url} {self.client.model} {e!r}")
+            backend.warm = False
+            return False
+        elapsed = time.monotonic() - started_at
+        backend.warm = True
+        self.warmups += 1
+        self.warmup_seconds[backend.url] = elapsed
+        LOGGER.info(f"Ollama 모델 예열 완료: {backend.url} {self.client.model} ({elapsed:.1f}초)")
+        return True
+
+    async def check(self, backend: OllamaBackend):
+        """
+        모델이 올라가 있으면 keep_alive 갱신, 내려갔으면 다시 예열
+        /api/ps를 지원하지 않는 서버는 keep_alive 갱신 요청의 응답으로 판단
+        """
+        backend.start()
+        try:
+            response = await backend.client.get("/api/ps", timeout=self.timeout)
+            if response.status_code == 404:
+                loaded = None
+            else:
+                response.raise_for_status()
+                loaded = any(
+                    self._is_model(model.get("name", "")) or self._is_model(model.get("model", ""))
+                    for model in response.json().get("models", [])
+                )
+        except (httpx.HTTPError, ValueError) as e:
+            LOGGER.warning(f"Ollama 모델 상태 확인 실패: {backend.url} {e!r}")
+            backend.warm = False
+            return
+
+        if loaded is False:
+            if backend.warm:
+                self.unloads += 1
+                LOGGER.warning(f"Ollama 모델이 메모리에서 내려감: {backend.url} {self.client.model}, 다시 예열")
+            backend.warm = False
+            await self.warm_up(backend)
+            return
+
+        # 프롬프트 없이 호출하면 생성 없이 keep_alive만 갱신 (내려가 있었다면 다시 불러옴)
+        try:
+            response = await backend.client.post(
+                "/api/generate",
+                json={"model": self.client.model, "keep_alive": self.client.keep_alive},
+                timeout=self.timeout
+            )
+            response.raise_for_status()
+        except httpx.HTTPError as e:
+            LOGGER.warning(f"Ollama keep_alive 갱신 실패: {backend.url} {e!r}")
+            backend.warm = False
+            return
+        if not backend.warm:
+            await self.warm_up(backend)
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "ready": self.ready(),
+            "model": self.client.model,
+            "keep_alive": self.client.keep_alive,
+            "warmups": self.warmups,
+            "unloads": self.unloads,
+            "backends": [
+                {
+                    "url": backend.url,
+                    "warm": backend.warm,
+                    "warmup_seconds": self.warmup_seconds.get(backend.url),
+                }
+                for backend in self.client.backends
+            ],
+        }
+
+model_manager = OllamaModelManager(ollama_client)
+
+metrics.MODEL_WARM.set_function(lambda: {
+    (backend.url,): 1 if backend.warm else 0 for backend in model_manager.client.backends
+})
@@ -0,0 +1,100 @@
+import asyncio
+from urllib.parse import urlparse
+
+class RedisError(Exception):
+    """Redis가 반환한 오류 응답"""
+
+class RedisConnection:
+    """
+    RESP 프로토콜로 통신하는 최소한의 Redis 클라이언트 (redis 패키지 없이 사용)
+    명령은 한 번에 하나씩 처리하고, 여러 명령은 pipeline으로 한 번에 전송
+    블로킹 명령(BRPOP 등)은 별도 연결에서 사용해야 함
+    """
+    def __init__(self, url: str = "redis://localhost:6379/0"):
+        parsed = urlparse(url)
+        self.host = parsed.hostname or "localhost"
+        self.port = parsed.port or 6379
+        self.password = parsed.password
+        self.db = int(parsed.path.lstrip("/") or 0)
+        self._reader: asyncio.StreamReader | None = None
+        self._writer: asyncio.StreamWriter | None = None
+        self._lock = asyncio.Lock()
+
+    async def _connect(self):
+        self._reader, self._writer = await asyncio.open_connection(self.host, self.port)
+        if self.password:
+            await self._roundtrip([("AUTH", self.password)])
+        if self.db:
+            await self._roundtrip([("SELECT", self.db)])
+
+    async def close(self):
+        if self._writer is not None:
+            self._writer.close()
+            try:
+                await self._writer.wait_closed()
+            except (ConnectionError, OSError):
+                pass
+        self._reader = self._writer = None
+
+    async def execute(self, *args):
+        """
+        명령 한 개 실행 후 응답 반환
+        """
+        return (await self.pipeline([args]))[0]
+
+    async def pipeline(self, commands: list[tuple]) -> list:
+        """
+        여러 명령을 한 번에 보내고 응답을 순서대로 반환
+        응답을 다 읽기 전에 취소되거나 연결이 끊기면 연결을 닫음 (다음 호출 때 다시 연결)
+        """
+        async with self._lock:
+            if self._writer is None:
+                await self._connect()
+            try:
+                return await self._roundtrip(commands)
+            except BaseException:
+                await self.close()
+                raise
+
+    async def _roundtrip(self, commands: list[tuple]) -> list:
+        self._writer.write(b"".join(encode_command(command) for command in commands))
+        await self._writer.drain()
+        replies = [await read_reply(self._reader) for _ in commands]
+        for reply in replies:
+            if isinstance(reply, RedisError):
+                raise reply
+        return replies
+
+def encode_command(args: tuple) -> bytes:
+    parts = [b"*%d\r\n" % len(args)]
+    for arg in args:
+        if not isinstance(arg, bytes):
+            arg = str(arg).encode()
+        parts.append(b"$%d\r\n%s\r\n" % (len(arg), arg))
+    return b"".join(parts)
+
+async def read_reply(reader: asyncio.StreamReader):
+    """
+    RESP 응답 한 개 읽기 (bulk string은 bytes, 오류는 RedisError 객체로 반환)
+    """
+    line = await reader.readline()
+    if not line:
+        raise ConnectionError("Redis 연결이 끊어짐")
+    kind, body = line[:1], line[1:-2]
+    if kind == b"+":
+        return body.decode()
+    if kind == b"-":
+        return RedisError(body.decode())
+    if kind == b":":
+        return int(body)
+    if kind == b"$":
+        size = int(body)
+        if size < 0:
+            return None
+        return (await reader.readexactly(size + 2))[:-2]
+    if kind == b"*":
+        size = int(body)
+        if size < 0:
+            return None
+        return [await read_reply(reader) for _ in range(size)]
+    raise ConnectionError(f"알 수 없는 Redis 응답: {line!r}")
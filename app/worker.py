@@ -0,0 +1,42 @@
+"""
+LLM 워커만 실행하는 프로세스 (API 서버와 따로 확장할 때 사용)
+
+CHECK_FRAUD_BACKEND를 'redis' 또는 'sqlite'로 설정하고, API 서버는 CHECK_FRAUD_WORKERS = 0으로 실행
+    python -m app.worker --workers 2
+"""
+import asyncio
+import argparse
+
+from app import LOGGER, CHECK_FRAUD_BACKEND, CHECK_FRAUD_WORKERS
+from app.services.check_fraud import start_processing
+from app.services.ollama_client import ollama_client
+from app.services.ollama_model import model_manager
+
+async def run(workers: int):
+    ollama_client.start()
+    warmup = model_manager.start()
+    tasks = await start_processing(workers)
+    if warmup is not None:
+        tasks.append(warmup)
+    LOGGER.info(f"사기 탐지 워커 {workers}개 시작 ({CHECK_FRAUD_BACKEND})")
+    try:
+        await asyncio.gather(*tasks)
+    finally:
+        for task in tasks:
+            task.cancel()
+        await ollama_client.close()
+
+def main():
+    parser = argparse.ArgumentParser(description="사기 탐지 워커")
+    parser.add_argument("--workers", type=int, default=CHECK_FRAUD_WORKERS or 1, help="동시에 처리하는 작업 수")
+    args = parser.parse_args()
+
+    if CHECK_FRAUD_BACKEND == "local":
+        parser.error("CHECK_FRAUD_BACKEND가 'local'이면 API 서버 프로세스 안에서만 처리할 수 있습니다")
+    try:
+        asyncio.run(run(args.workers))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()